@@ -1,16 +1,23 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import hashlib
+import json
 import os
 import re
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
 
 import click
 import deepl
 import polib
 
+from extract_messages import extract, write_pot
+
 # Project root = auto_translate.py's directory
 ROOT = Path(__file__).resolve().parent
 
@@ -25,20 +32,17 @@ SKIP_DIRS = {
 
 def python_sources(root: Path) -> list[str]:
     files = []
-    for p in root.rglob("*.py"):
-        # Skip unwanted dirs
-        parts = set(p.parts)
-        if parts & SKIP_DIRS:
-            continue
-        files.append(str(p))
+    for dirpath, dirnames, filenames in os.walk(root):
+        # Skip unwanted dirs without descending into them
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        files.extend(
+            os.path.join(dirpath, f)
+            for f in sorted(filenames)
+            if f.endswith(".py")
+        )
     return files
 
 
-def run_checked(cmd: list[str]) -> None:
-    click.echo(f"→ {' '.join(cmd)}")
-    subprocess.run(cmd, check=True)
-
-
 # --------------------------------------------------------------------
 # Config
 # --------------------------------------------------------------------
@@ -56,23 +60,23 @@ PY_FILES = [
 # Emoji/symbol prefix splitter (keep emoji/symbols untouched)
 LEADING_SYMBOLS_RE = re.compile(r"^([\W_]+)(.*)$", flags=re.UNICODE)
 
-# Preserve Mustache {{name}} and Python {name} placeholders via XML tags for DeepL
-MUSTACHE_RE = re.compile(r"{{\s*([^{}]+?)\s*}}")
-FORMAT_RE = re.compile(r"{\s*([a-zA-Z0-9_]+)\s*}")
-
-# 🔒 Words that must never be translated (brand/library/CLI tokens)
-# matching is case sensitive.
-PROTECTED_WORDS = {
-    "Whisper",
-    "openai-whisper",
-    "OpenAI",
-    "DeepL",
-    "ffmpeg",
-    "ffprobe",
-    "SRT",
-    "CLI",
-    "pip",
-}
+# Preserve Mustache {{name}} and Python {name} placeholders via XML tags
+# for DeepL, as (tag, pattern); they are tried before glossary terms, so
+# "{pip}" stays one placeholder.
+PLACEHOLDER_PATTERNS = (
+    ("m", r"{{\s*[^{}]+?\s*}}"),
+    ("ph", r"{\s*[a-zA-Z0-9_]+\s*}"),
+)
+TAG_RE = re.compile(r'<(m|ph|term) id="(\d+)"\s*/>')
+
+# 🔒 Words that must never be translated (brand/library/CLI tokens), one
+# per line; matching is case sensitive.
+GLOSSARY = BASE / "glossary.txt"
+
+# DeepL takes at most 50 texts per request and 128 KiB per request body;
+# the byte budget leaves room for the other parameters.
+BATCH_TEXTS = 50
+BATCH_BYTES = 120 * 1024
 
 # Map to DeepL codes
 DEEPL_LANG_MAP = {
@@ -106,72 +110,107 @@ def split_leading_symbols(s: str) -> tuple[str, str]:
     return m.group(1), m.group(2)
 
 
-def protect_placeholders_to_xml(text: str):
+def load_glossary(path: Path) -> list[str]:
+    """Terms of a glossary file: one per line, '#' lines are comments."""
+    terms = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        term = line.strip()
+        if term and not term.startswith("#"):
+            terms.append(term)
+    return terms
+
+
+def trie_pattern(
+    terms: Iterable[str], whole_words: bool = False
+) -> str:
     """
-    Replace placeholders with XML tags for DeepL tag_handling="xml".
-    - {{name}} -> <m id="0"/>
-    - {name}   -> <ph id="1"/>
-    Returns (xml_text, restore_map) where restore_map maps the xml tag back to the original token.
+    Regex matching any of ``terms``, factored into a prefix trie so each
+    position is rejected after one character instead of one attempt per
+    term. Longer terms are preferred, shorter ones are backtracked to.
+    With ``whole_words`` a term must not follow a word character; the
+    check sits after the first character so the pattern still starts
+    with a literal.
     """
-    restore: dict[str, str] = {}
-    idx = 0
-
-    def repl_mustache(m):
-        nonlocal idx
-        orig = m.group(0)
-        tag = f'<m id="{idx}"/>'
-        restore[tag] = orig
-        idx += 1
-        return tag
-
-    def repl_format(m):
-        nonlocal idx
-        orig = m.group(0)
-        tag = f'<ph id="{idx}"/>'
-        restore[tag] = orig
-        idx += 1
-        return tag
-
-    text = MUSTACHE_RE.sub(repl_mustache, text)
-    text = FORMAT_RE.sub(repl_format, text)
-    return text, restore
-
-
-def protect_terms(
-    text: str, start_index: int = 0
-) -> tuple[str, dict[str, str], int]:
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # a term ends here
+
+    def build(node: dict, lead: str = "") -> str:
+        branches = [
+            re.escape(ch) + lead + build(child)
+            for ch, child in sorted(node.items())
+            if ch
+        ]
+        if not branches:
+            return ""
+        body = (
+            branches[0]
+            if len(branches) == 1
+            else "(?:" + "|".join(branches) + ")"
+        )
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie, r"(?<!\w.)" if whole_words else "")
+
+
+class Protector:
     """
-    Replace PROTECTED_WORDS with <term id="N"/> placeholders.
-    Returns (protected_text, restore_map, next_index).
-    - Uses literal replacement; replaces ALL occurrences.
-    - Index continues from start_index so it doesn't clash with other tags.
+    Swaps placeholders and glossary terms for XML tags DeepL leaves
+    alone, in a single scan with one compiled regex. With
+    ``whole_words``, terms only match on word boundaries ("pip" but not
+    "pipeline").
     """
-    restore: dict[str, str] = {}
-    idx = start_index
-
-    # Sort by length desc to avoid partial overlaps (e.g., 'pip' before 'pipx' issues)
-    for word in sorted(PROTECTED_WORDS, key=len, reverse=True):
-        # Replace repeatedly for all occurrences
-        search_pos = 0
-        while True:
-            at = text.find(word, search_pos)
-            if at == -1:
-                break
-            tag = f'<term id="{idx}"/>'
-            restore[tag] = word
-            text = text[:at] + tag + text[at + len(word) :]  # noqa E203
-            search_pos = at + len(tag)
-            idx += 1
-    return text, restore, idx
+
+    def __init__(
+        self, terms: Iterable[str] = (), whole_words: bool = True
+    ):
+        alternatives = [
+            f"(?P<{tag}>{pattern})"
+            for tag, pattern in PLACEHOLDER_PATTERNS
+        ]
+        terms = [t for t in terms if t]
+        if terms:
+            words = trie_pattern(terms, whole_words)
+            if whole_words:
+                words = rf"(?:{words})(?!\w)"
+            alternatives.append(f"(?P<term>{words})")
+        # Every match starts with "{" or a term's first character; saying
+        # so up front lets the regex engine skip to those positions.
+        first = sorted({"{"} | {t[0] for t in terms})
+        self.regex = re.compile(
+            "(?=["
+            + "".join(map(re.escape, first))
+            + "])(?:"
+            + "|".join(alternatives)
+            + ")"
+        )
+
+    def protect(self, text: str) -> tuple[str, dict[str, str]]:
+        """
+        Returns (xml_text, restore_map) where restore_map maps each tag
+        ('<ph id="0"/>', '<term id="1"/>', ...) back to what it replaced.
+        """
+        restore: dict[str, str] = {}
+
+        def tag(m: re.Match) -> str:
+            xml = f'<{m.lastgroup} id="{len(restore)}"/>'
+            restore[xml] = m.group(0)
+            return xml
+
+        return self.regex.sub(tag, text), restore
 
 
 def restore_from_map(text: str, restore_map: dict[str, str]) -> str:
-    # Replace longer tags first just in case
-    for tag, orig in sorted(
-        restore_map.items(), key=lambda kv: -len(kv[0])
-    ):
-        text = text.replace(tag, orig)
-    return text
+    """Put back what each tag replaced, in one pass; DeepL sometimes
+    returns '<ph id="0" />' for '<ph id="0"/>'."""
+
+    def original(m: re.Match) -> str:
+        return restore_map.get(f'<{m[1]} id="{m[2]}"/>', m.group(0))
+
+    return TAG_RE.sub(original, text)
 
 
 def needs_translation(entry: polib.POEntry) -> bool:
@@ -183,6 +222,509 @@ def map_lang_to_deepl(code: str) -> str:
     return DEEPL_LANG_MAP.get(c, c.upper())
 
 
+class PendingEntry(NamedTuple):
+    """A PO entry on its way to DeepL, with what is needed to put its
+    translation back together."""
+
+    entry: polib.POEntry
+    prefix: str
+    xml: str
+    restore: dict[str, str]
+
+
+def mark_translated(entry: polib.POEntry, msgstr: str) -> None:
+    entry.msgstr = msgstr
+    if "fuzzy" in entry.flags:
+        entry.flags.remove("fuzzy")
+
+
+def prepare_entry(
+    entry: polib.POEntry, protector: Protector
+) -> PendingEntry | None:
+    """
+    Protect placeholders and terms of an entry that needs DeepL.
+    Entries with nothing to translate are settled here and return None.
+    """
+    if not needs_translation(entry):
+        return None
+
+    msgid = entry.msgid
+    if not msgid or not msgid.strip():
+        return None
+
+    prefix, rest = split_leading_symbols(msgid)
+
+    # Only symbols/whitespace? Mirror source.
+    if not rest.strip():
+        mark_translated(entry, msgid)
+        return None
+
+    # Protect placeholders and brand terms
+    xml_in, restore = protector.protect(rest)
+    return PendingEntry(entry, prefix, xml_in, restore)
+
+
+def finish_entry(pending: PendingEntry, xml_out: str) -> None:
+    # Restore brand terms and placeholders
+    translated = restore_from_map(xml_out, pending.restore)
+    mark_translated(pending.entry, f"{pending.prefix}{translated}")
+
+
+def request_size(xml: str) -> int:
+    """Bytes ``xml`` adds to the JSON request body."""
+    return len(json.dumps(xml)) + 1
+
+
+def batches(
+    pending: list[PendingEntry],
+    max_texts: int = BATCH_TEXTS,
+    max_bytes: int = BATCH_BYTES,
+) -> Iterator[list[PendingEntry]]:
+    """
+    Group entries, in order, into batches DeepL accepts in one request.
+    An entry too large for any batch goes out on its own.
+    """
+    batch: list[PendingEntry] = []
+    size = 0
+    for p in pending:
+        n = request_size(p.xml)
+        if batch and (len(batch) >= max_texts or size + n > max_bytes):
+            yield batch
+            batch, size = [], 0
+        batch.append(p)
+        size += n
+    if batch:
+        yield batch
+
+
+def with_retries(call, attempts: int = 3):
+    """Run ``call()``, retrying with light backoff; the last error is
+    raised."""
+    for attempt in range(attempts):
+        try:
+            return call()
+        except Exception:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.6 * (attempt + 1))
+
+
+class RateLimiter:
+    """
+    Spaces calls at least ``1 / per_second`` apart across all threads,
+    so the locales translated in parallel share one request budget.
+    """
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next)
+            self._next = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+
+def translate_entries(
+    translator,
+    pending: list[PendingEntry],
+    src_deepl: str,
+    tgt_deepl: str,
+    lang: str,
+    limiter: RateLimiter | None = None,
+) -> tuple[int, int]:
+    """
+    Translate ``pending`` in batched requests. A batch that still fails
+    after retries is redone entry by entry, so one bad string only costs
+    its own translation. Returns the number of requests made and of
+    entries left untranslated.
+    """
+    requests = failed = 0
+
+    def translate(texts: list[str]):
+        nonlocal requests
+        if limiter is not None:
+            limiter.wait()
+        requests += 1
+        results = translator.translate_text(
+            texts,
+            source_lang=src_deepl,
+            target_lang=tgt_deepl,
+            tag_handling="xml",
+        )
+        if len(results) != len(texts):
+            raise RuntimeError(
+                f"DeepL returned {len(results)} texts for {len(texts)}"
+            )
+        return results
+
+    for batch in batches(pending):
+        try:
+            results = with_retries(
+                lambda: translate([p.xml for p in batch])
+            )
+        except Exception as e:
+            click.echo(
+                f"⚠️ DeepL batch of {len(batch)} failed [{lang}]: {e};"
+                " retrying entry by entry"
+            )
+        else:
+            for p, result in zip(batch, results):
+                finish_entry(p, str(result))
+            continue
+
+        for p in batch:
+            try:
+                (result,) = with_retries(lambda: translate([p.xml]))
+            except Exception as e:
+                msgid = p.entry.msgid
+                failed += 1
+                click.echo(
+                    f"⚠️ DeepL translation failed for '{msgid[:60]}…' [{lang}]: {e}"
+                )
+                if not (p.entry.msgstr and p.entry.fuzzy):
+                    p.entry.msgstr = msgid  # degrade gracefully
+                # else keep msgmerge's draft. Either way it stays fuzzy:
+                # the .mo falls back to the msgid and the next run
+                # retries it.
+                if "fuzzy" not in p.entry.flags:
+                    p.entry.flags.append("fuzzy")
+            else:
+                finish_entry(p, str(result))
+    return requests, failed
+
+
+# --------------------------------------------------------------------
+# Translation memory
+# --------------------------------------------------------------------
+# Sentence punctuation a reused translation takes over from the msgid.
+# '?' is not among them: a question can need marks at both ends ("¿…?").
+TRAILING_PUNCT = ".:!…"
+
+
+def normalize(text: str) -> str:
+    """``text`` with case, spacing and trailing punctuation folded."""
+    return " ".join(text.casefold().split()).rstrip(
+        TRAILING_PUNCT + " "
+    )
+
+
+def _tail(text: str) -> str:
+    """Trailing sentence punctuation of ``text``."""
+    return text[len(text.rstrip(TRAILING_PUNCT)) :]  # noqa: E203
+
+
+def _capital(text: str) -> bool | None:
+    """Whether the first letter of ``text`` is a capital (None: none)."""
+    return next((c.isupper() for c in text if c.isalpha()), None)
+
+
+def adapt(msgstr: str, source: str, text: str) -> str:
+    """
+    Carry ``source``'s translation over to ``text``, a msgid that only
+    differs from it in case, spacing or trailing punctuation: the
+    translation ends in ``text``'s punctuation and starts with a capital
+    if ``text`` does.
+    """
+    if _tail(text) != _tail(source):
+        body = msgstr.rstrip()
+        space = msgstr[len(body) :]  # noqa: E203
+        msgstr = body.rstrip(TRAILING_PUNCT) + _tail(text) + space
+    capital = _capital(text)
+    if capital is not None and capital != _capital(source):
+        for k, c in enumerate(msgstr):
+            if c.isalpha():
+                c = c.upper() if capital else c.lower()
+                return msgstr[:k] + c + msgstr[k + 1 :]  # noqa: E203
+    return msgstr
+
+
+class TranslationMemory:
+    """
+    Translations already in the catalogs, per target language.
+
+    A string is reused when an earlier one has the same text, symbol
+    prefix and spacing aside, or differs from it only in case or
+    trailing punctuation and carries the same placeholders and protected
+    terms. Both are dictionary lookups. Strings that are merely similar
+    ("Enable"/"Disable", "10 files"/"19 files") are never reused.
+    """
+
+    def __init__(self, protector: Protector):
+        self.protector = protector
+        self._exact: dict[str, dict[str, str]] = {}
+        self._near: dict[str, dict[str, tuple[str, str]]] = {}
+
+    @classmethod
+    def from_catalogs(
+        cls, base: Path, protector: Protector
+    ) -> TranslationMemory:
+        """Index every translated, non-fuzzy entry under ``base``."""
+        memory = cls(protector)
+        for po_path in sorted(base.glob(f"*/{LC}/*.po")):
+            lang = po_path.parent.parent.name
+            try:
+                po = polib.pofile(str(po_path))
+            except OSError as e:  # polib's syntax errors are IOErrors
+                click.echo(f"⚠️ Not reusing {po_path}: {e}", err=True)
+                continue
+            # obsolete entries too: they hold the msgids that changed
+            for entry in po:
+                if entry.msgstr and not entry.fuzzy:
+                    memory.add(lang, entry.msgid, entry.msgstr)
+        return memory
+
+    @staticmethod
+    def _key(msgid: str) -> tuple[str, str]:
+        """``(symbol prefix, text with spacing folded)``"""
+        prefix, rest = split_leading_symbols(msgid)
+        return prefix, " ".join(rest.split())
+
+    def add(self, lang: str, msgid: str, msgstr: str) -> None:
+        prefix, rest = self._key(msgid)
+        if not rest or not msgstr:
+            return
+        if prefix and msgstr.startswith(prefix):
+            msgstr = msgstr[len(prefix) :]  # noqa: E203
+        exact = self._exact.setdefault(lang, {})
+        if rest in exact:
+            return
+        exact[rest] = msgstr
+        self._near.setdefault(lang, {}).setdefault(
+            normalize(rest), (rest, msgstr)
+        )
+
+    def __len__(self) -> int:
+        return sum(map(len, self._exact.values()))
+
+    def _protected(self, text: str) -> list[str]:
+        return sorted(self.protector.protect(text)[1].values())
+
+    def lookup(self, lang: str, msgid: str) -> str | None:
+        """An earlier translation of the same text as ``msgid``, adapted
+        to ``msgid``'s symbol prefix, capital and punctuation."""
+        prefix, rest = self._key(msgid)
+        if not rest:
+            return None
+        hit = self._exact.get(lang, {}).get(rest)
+        if hit is not None:
+            return prefix + hit
+        near = self._near.get(lang, {}).get(normalize(rest))
+        if near is None:
+            return None
+        source, msgstr = near
+        if self._protected(source) != self._protected(rest):
+            return None  # "{Name}" is not "{name}"
+        return prefix + adapt(msgstr, source, rest)
+
+
+# --------------------------------------------------------------------
+# Incremental build
+# --------------------------------------------------------------------
+# Content hashes of what each stage last ran on. A stage whose inputs
+# hash the same is skipped; outputs are swapped in atomically and only
+# when their bytes change, so unchanged files keep their mtimes.
+MANIFEST = BASE / ".build-manifest.json"
+MANIFEST_VERSION = 1
+
+# Parsed messages per source file, keyed by size/mtime and content hash
+EXTRACT_CACHE = BASE / ".extract-cache.json"
+
+# Lines stamped with the current time; ignored when deciding whether a
+# regenerated POT actually changed.
+POT_VOLATILE_RE = re.compile(rb'^"POT-Creation-Date:.*$', re.MULTILINE)
+
+
+def file_digest(path: Path) -> str | None:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def part_path(path: Path) -> Path:
+    return path.with_name(path.name + ".part")
+
+
+def load_manifest() -> dict:
+    try:
+        data = json.loads(MANIFEST.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data
+
+
+def save_manifest(data: dict) -> None:
+    data["version"] = MANIFEST_VERSION
+    tmp = part_path(MANIFEST)
+    tmp.write_text(
+        json.dumps(data, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+    os.replace(tmp, MANIFEST)
+
+
+def replace_if_changed(tmp: Path, dest: Path, ignore=None) -> bool:
+    """
+    Move ``tmp`` over ``dest`` unless the two have the same bytes (after
+    removing matches of the ``ignore`` regex). Returns True if ``dest``
+    was replaced.
+    """
+    new = tmp.read_bytes()
+    try:
+        old = dest.read_bytes()
+    except FileNotFoundError:
+        old = None
+    if old is not None:
+        if ignore is not None:
+            same = ignore.sub(b"", old) == ignore.sub(b"", new)
+        else:
+            same = old == new
+        if same:
+            tmp.unlink()
+            return False
+    os.replace(tmp, dest)
+    return True
+
+
+def lang_paths(lang: str) -> tuple[Path, Path]:
+    lang_dir = BASE / lang / LC
+    return lang_dir / "messages.po", lang_dir / "messages.mo"
+
+
+def lang_state(lang: str, pot_hash: str | None) -> dict:
+    """What a locale's catalog was built from, as kept in the manifest."""
+    po_path, mo_path = lang_paths(lang)
+    return {
+        "pot": pot_hash,
+        "po": file_digest(po_path),
+        "mo": file_digest(mo_path),
+    }
+
+
+class LangResult(NamedTuple):
+    translated: int  # strings sent to DeepL
+    reused: int  # strings filled from the translation memory
+    requests: int  # DeepL API calls
+    incomplete: int = 0  # strings DeepL failed on, left for a rerun
+
+
+def update_language(
+    lang: str,
+    translator,
+    src_deepl: str,
+    protector: Protector,
+    memory: TranslationMemory | None = None,
+    limiter: RateLimiter | None = None,
+) -> LangResult:
+    """
+    Merge the POT into one locale's catalog, fill what is missing from
+    the translation memory, translate the rest and compile it.
+    """
+    po_path, mo_path = lang_paths(lang)
+    po_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = part_path(po_path)
+
+    # 2) Ensure PO exists, then merge with POT
+    if not po_path.exists():
+        click.echo(f"📄 [{lang}] Creating new catalog")
+        run(
+            [
+                "msginit",
+                "--no-translator",
+                "--locale",
+                lang,
+                "--input",
+                str(POT),
+                "--output-file",
+                str(tmp),
+            ]
+        )
+    else:
+        click.echo(f"🔄 [{lang}] Merging POT into {po_path}")
+        run(
+            [
+                "msgmerge",
+                "--quiet",
+                "--output-file",
+                str(tmp),
+                str(po_path),
+                str(POT),
+            ]
+        )
+    replace_if_changed(tmp, po_path)
+
+    # 3) Translate missing/fuzzy entries
+    po = polib.pofile(str(po_path))
+    tgt_deepl = map_lang_to_deepl(lang)
+
+    pending = [
+        p for e in po if (p := prepare_entry(e, protector)) is not None
+    ]
+    send = []
+    for p in pending:
+        hit = memory.lookup(lang, p.entry.msgid) if memory else None
+        if hit is not None:
+            mark_translated(p.entry, hit)
+        else:
+            send.append(p)
+    reused = len(pending) - len(send)
+    click.echo(
+        f"🌍 [{lang}] Translating {len(send)} missing strings"
+        f" ({reused} from translation memory)"
+    )
+    requests, failed = translate_entries(
+        translator, send, src_deepl, tgt_deepl, lang, limiter
+    )
+
+    po.save(str(tmp))
+    if replace_if_changed(tmp, po_path):
+        click.echo(f"✅ [{lang}] Saved {po_path}")
+
+    # 4) Compile .mo
+    tmp = part_path(mo_path)
+    po.save_as_mofile(str(tmp))
+    if replace_if_changed(tmp, mo_path):
+        click.echo(f"📦 [{lang}] Compiled {mo_path}")
+    return LangResult(len(send), reused, requests, failed)
+
+
+def update_pot(sources: list[str], manifest: dict, force: bool) -> str:
+    """
+    Regenerate the POT unless the sources are the ones it was last built
+    from. Returns the POT's hash.
+    """
+    extraction = extract(sources, ROOT, EXTRACT_CACHE)
+    digest = extraction.digest()
+    pot_hash = file_digest(POT)
+    if (
+        not force
+        and pot_hash is not None
+        and manifest.get("sources") == digest
+        and manifest.get("pot") == pot_hash
+    ):
+        click.echo("🧰 Sources unchanged; keeping locales/messages.pot")
+        return pot_hash
+
+    click.echo(
+        f"🧰 Extracting translatable strings → locales/messages.pot "
+        f"({extraction.parsed} of {len(sources)} files parsed)"
+    )
+    tmp = part_path(POT)
+    write_pot(extraction.messages, tmp)
+    replace_if_changed(tmp, POT, ignore=POT_VOLATILE_RE)
+    manifest["sources"] = digest
+    manifest["pot"] = file_digest(POT)
+    return manifest["pot"]
+
+
 # --------------------------------------------------------------------
 # CLI
 # --------------------------------------------------------------------
@@ -199,11 +741,56 @@ def map_lang_to_deepl(code: str) -> str:
     required=True,
     help="Comma-separated target codes (e.g., es,fr,de)",
 )
-def auto_translate(source: str, langs: str) -> None:
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Locales processed at the same time",
+)
+@click.option(
+    "--rate",
+    type=click.FloatRange(min=0),
+    default=5.0,
+    show_default=True,
+    help="DeepL requests per second, shared by all locales (0: no limit)",
+)
+@click.option(
+    "--glossary",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=GLOSSARY,
+    show_default=True,
+    help="Terms that must never be translated, one per line",
+)
+@click.option(
+    "--partial-terms",
+    is_flag=True,
+    default=False,
+    help="Also protect glossary terms inside longer words",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Rebuild every stage, even if its inputs did not change",
+)
+def auto_translate(
+    source: str,
+    langs: str,
+    jobs: int,
+    rate: float,
+    glossary: Path,
+    partial_terms: bool,
+    force: bool,
+) -> None:
     """
     Extract strings, update per-language .po, machine-translate missing/fuzzy entries
     with DeepL using XML tag-handling so placeholders survive, protect product/library
-    names, and compile .mo.
+    names, and compile .mo. Strings already translated (or nearly) in any
+    catalog are reused instead of sent. Locales are processed in parallel; a locale
+    that fails is reported without stopping the others. Stages whose
+    inputs are unchanged since the last run are skipped.
     """
     targets = [c.strip() for c in langs.split(",") if c.strip()]
     BASE.mkdir(parents=True, exist_ok=True)
@@ -216,10 +803,7 @@ def auto_translate(source: str, langs: str) -> None:
         )
     translator = deepl.Translator(auth_key)
 
-    # 1) Extract to POT
-    click.echo(
-        "🧰 Extracting translatable strings → locales/messages.pot"
-    )
+    manifest = load_manifest()
     SOURCES = python_sources(ROOT)
 
     # Sanity log: confirm cli.py is in SOURCES
@@ -229,126 +813,88 @@ def auto_translate(source: str, langs: str) -> None:
             err=True,
         )
 
-    run_checked(
-        [
-            "xgettext",
-            "--from-code=UTF-8",
-            "--language=Python",
-            "--keyword=_",
-            "-o",
-            str(ROOT / "locales" / "messages.pot"),
-            *SOURCES,
-        ]
-    )
+    # 1) Extract to POT
+    pot_hash = update_pot(SOURCES, manifest, force)
+    save_manifest(manifest)
 
     src_deepl = map_lang_to_deepl(source)
-
+    protector = Protector(
+        load_glossary(glossary), whole_words=not partial_terms
+    )
+    built = manifest.setdefault("langs", {})
+    todo = []
     for lang in targets:
-        lang_dir = BASE / lang / LC
-        po_path = lang_dir / "messages.po"
-        mo_path = lang_dir / "messages.mo"
-        lang_dir.mkdir(parents=True, exist_ok=True)
-
-        # 2) Ensure PO exists, then merge with POT
-        if not po_path.exists():
-            click.echo(f"📄 Creating new catalog for {lang}")
-            run(
-                [
-                    "msginit",
-                    "--no-translator",
-                    "--locale",
-                    lang,
-                    "--input",
-                    str(POT),
-                    "--output-file",
-                    str(po_path),
-                ]
-            )
+        # only a catalog DeepL finished is up to date; one with strings
+        # left untranslated or fuzzy is retried on the next run
+        state = {**lang_state(lang, pot_hash), "incomplete": 0}
+        if not force and state["mo"] and built.get(lang) == state:
+            click.echo(f"⏭️  [{lang}] up to date")
         else:
-            click.echo(f"🔄 Merging POT into {po_path}")
-            run(
-                [
-                    "msgmerge",
-                    "--update",
-                    "--backup=none",
-                    str(po_path),
-                    str(POT),
-                ]
-            )
-
-        # 3) Translate missing/fuzzy entries
-        click.echo(f"🌍 Translating missing strings → {lang}")
-        po = polib.pofile(str(po_path))
-        tgt_deepl = map_lang_to_deepl(lang)
-
-        for entry in po:
-            if not needs_translation(entry):
-                continue
-
-            msgid = entry.msgid
-            if not msgid or not msgid.strip():
-                continue
-
-            prefix, rest = split_leading_symbols(msgid)
-
-            # Only symbols/whitespace? Mirror source.
-            if not rest.strip():
-                entry.msgstr = msgid
-                if "fuzzy" in entry.flags:
-                    entry.flags.remove("fuzzy")
-                continue
+            todo.append(lang)
+
+    memory = None
+    if todo:
+        memory = TranslationMemory.from_catalogs(BASE, protector)
+        click.echo(f"🧠 Translation memory: {len(memory)} strings")
+
+    limiter = RateLimiter(rate)
+    failed: list[str] = []
+    requests = reused = 0
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(jobs, len(todo) or 1))
+    ) as pool:
+        futures = {
+            pool.submit(
+                update_language,
+                lang,
+                translator,
+                src_deepl,
+                protector,
+                memory,
+                limiter,
+            ): lang
+            for lang in todo
+        }
+        for future in as_completed(futures):
+            lang = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failed.append(lang)
+                built.pop(lang, None)
+                if isinstance(e, subprocess.CalledProcessError):
+                    e = f"{' '.join(e.cmd)} (exit {e.returncode})"
+                click.echo(f"❌ [{lang}] {e}", err=True)
+            else:
+                built[lang] = {
+                    **lang_state(lang, pot_hash),
+                    "incomplete": result.incomplete,
+                }
+                requests += result.requests
+                reused += result.reused
+                click.echo(
+                    f"🏁 [{lang}] done, {result.translated} strings"
+                    f" translated in {result.requests} DeepL requests,"
+                    f" {result.reused} reused"
+                )
+                if result.incomplete:
+                    click.echo(
+                        f"⚠️ [{lang}] {result.incomplete} strings left"
+                        " untranslated; they are retried on the next run",
+                        err=True,
+                    )
+            save_manifest(manifest)
 
-            # Protect placeholders
-            xml_in, restore_placeholders = protect_placeholders_to_xml(
-                rest
-            )
-            # Continue indexing after existing placeholder ids
-            next_idx = (
-                0
-                + sum(1 for _ in re.finditer(r'<m id="\d+"/>', xml_in))
-                + sum(1 for _ in re.finditer(r'<ph id="\d+"/>', xml_in))
-            )
-            xml_in, restore_terms, _ = protect_terms(
-                xml_in, start_index=next_idx
-            )
+    if todo:
+        click.echo(
+            f"📊 DeepL requests: {requests};"
+            f" strings reused from translation memory: {reused}"
+        )
 
-            # Retry with light backoff
-            for attempt in range(3):
-                try:
-                    xml_out = translator.translate_text(
-                        xml_in,
-                        source_lang=src_deepl,
-                        target_lang=tgt_deepl,
-                        tag_handling="xml",
-                    )
-                    translated = str(xml_out)
-                    # Restore brand terms and placeholders
-                    translated = restore_from_map(
-                        translated, restore_terms
-                    )
-                    translated = restore_from_map(
-                        translated, restore_placeholders
-                    )
-                    entry.msgstr = f"{prefix}{translated}"
-                    if "fuzzy" in entry.flags:
-                        entry.flags.remove("fuzzy")
-                    break
-                except Exception as e:
-                    if attempt == 2:
-                        click.echo(
-                            f"⚠️ DeepL translation failed for '{msgid[:60]}…' [{lang}]: {e}"
-                        )
-                        entry.msgstr = msgid  # degrade gracefully
-                        if "fuzzy" in entry.flags:
-                            entry.flags.remove("fuzzy")
-                    time.sleep(0.6 * (attempt + 1))
-
-        po.save(str(po_path))
-        click.echo(f"✅ Saved {po_path}")
-
-        # 4) Compile .mo
-        po.save_as_mofile(str(mo_path))
-        click.echo(f"📦 Compiled {mo_path}")
+    if failed:
+        raise click.ClickException(
+            "Failed locales: " + ", ".join(sorted(failed))
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+"""Compare subtitle extraction paths on a real file.
+
+    python benchmarks/bench_extract.py movie.mkv [--track N] [--repeat 3]
+
+``transcode`` is the old path (ffmpeg decodes the track and re-encodes
+it as SRT into a file); ``copy`` stream-copies the track and converts it
+in-process. Both need ffmpeg/ffprobe on PATH.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+)
+
+from functions.pipeline import can_copy, stream_subtitles  # noqa: E402
+from functions.probe import probe_media  # noqa: E402
+from functions.tracks import extract_command  # noqa: E402
+from functions.write import write_segments  # noqa: E402
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("video")
+    parser.add_argument("--track", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    info = probe_media(args.video)
+    if not info.subtitles:
+        sys.exit("no subtitle streams in " + args.video)
+    track = (
+        info.subtitles[args.track]
+        if args.track is not None
+        else info.default_subtitle()
+    )
+    print(f"track 0:s:{track.sub_index} codec={track.codec}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "out.srt")
+        cmd = extract_command(args.video, [track], [out])
+
+        def transcode():
+            subprocess.run(cmd, check=True, capture_output=True)
+
+        def copy():
+            write_segments(
+                stream_subtitles(
+                    args.video, track.sub_index, track.codec
+                ),
+                out,
+                False,
+            )
+
+        slow = best_of(transcode, args.repeat)
+        print(f"transcode  {slow:8.3f}s")
+        if not can_copy(track.codec):
+            print(
+                f"copy       n/a ({track.codec} is always transcoded)"
+            )
+            return
+        fast = best_of(copy, args.repeat)
+        print(f"copy       {fast:8.3f}s  ({slow / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
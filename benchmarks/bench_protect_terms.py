@@ -0,0 +1,121 @@
+"""Compare the old per-term loop with the single-pass ``Protector``.
+
+    python benchmarks/bench_protect_terms.py [--messages 5000] [--terms 2000]
+
+``loop`` is the old code: two placeholder passes, two ``finditer``
+scans for the next id, then a ``find``/slice loop per glossary term.
+``single-pass`` is ``auto_translate.Protector``, one compiled regex over
+placeholders and a trie of the terms.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+)
+
+from auto_translate import Protector, restore_from_map  # noqa: E402
+
+MUSTACHE_RE = re.compile(r"{{\s*([^{}]+?)\s*}}")
+FORMAT_RE = re.compile(r"{\s*([a-zA-Z0-9_]+)\s*}")
+
+
+def loop_protect(text: str, terms: list[str]):
+    restore = {}
+    idx = 0
+
+    def tagger(kind):
+        def repl(m):
+            nonlocal idx
+            tag = f'<{kind} id="{idx}"/>'
+            restore[tag] = m.group(0)
+            idx += 1
+            return tag
+
+        return repl
+
+    text = MUSTACHE_RE.sub(tagger("m"), text)
+    text = FORMAT_RE.sub(tagger("ph"), text)
+    idx = sum(1 for _ in re.finditer(r'<m id="\d+"/>', text)) + sum(
+        1 for _ in re.finditer(r'<ph id="\d+"/>', text)
+    )
+    for word in sorted(terms, key=len, reverse=True):
+        pos = 0
+        while True:
+            at = text.find(word, pos)
+            if at == -1:
+                break
+            tag = f'<term id="{idx}"/>'
+            restore[tag] = word
+            end = at + len(word)
+            text = text[:at] + tag + text[end:]
+            pos = at + len(tag)
+            idx += 1
+    return text, restore
+
+
+def make_catalog(messages: int, terms: list[str], seed: int = 1):
+    rng = random.Random(seed)
+    words = ["the", "file", "subtitle", "track", "saved", "to", "with"]
+    catalog = []
+    for _ in range(messages):
+        n = rng.choice((6, 12, 40, 400))  # a few long help texts
+        parts = []
+        for _ in range(n):
+            r = rng.random()
+            if r < 0.05:
+                parts.append(rng.choice(terms))
+            elif r < 0.08:
+                parts.append("{name}")
+            else:
+                parts.append(rng.choice(words))
+        catalog.append(" ".join(parts))
+    return catalog
+
+
+def timed(fn, catalog) -> tuple[float, list]:
+    t0 = time.perf_counter()
+    out = [fn(text) for text in catalog]
+    return time.perf_counter() - t0, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--terms", type=int, default=2000)
+    args = parser.parse_args()
+
+    terms = [f"Brand{i:05d}x" for i in range(args.terms)]
+    catalog = make_catalog(args.messages, terms)
+
+    t0 = time.perf_counter()
+    protector = Protector(terms)
+    build = time.perf_counter() - t0
+
+    slow, _ = timed(lambda t: loop_protect(t, terms), catalog)
+    fast, out = timed(protector.protect, catalog)
+    round_trip = all(
+        restore_from_map(xml, restore) == text
+        for text, (xml, restore) in zip(catalog, out)
+    )
+
+    n = args.messages
+    print(f"loop         {n / slow:>10,.0f} messages/s")
+    print(
+        f"single-pass  {n / fast:>10,.0f} messages/s  "
+        f"({slow / fast:.1f}x, regex built in {build * 1000:.0f} ms, "
+        f"round trip {'ok' if round_trip else 'BROKEN'})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare the per-cue and batched SRT writers on synthetic cues.
+
+    python benchmarks/bench_srt_writer.py [--cues 200000] [--repeat 3]
+
+``per-cue`` is the old loop (four ``write`` calls and two
+``format_timestamp`` calls per cue); ``batched`` is ``write_cues``, which
+renders cues in batches with table-driven timestamps.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+)
+
+from functions.format_timestamp import format_timestamp  # noqa: E402
+from functions.formats import write_cues  # noqa: E402
+
+
+def per_cue(segments, f) -> None:
+    for idx, seg in enumerate(segments, 1):
+        f.write(f"{idx}\n")
+        f.write(
+            f"{format_timestamp(seg['start'])} --> "
+            f"{format_timestamp(seg['end'])}\n"
+        )
+        f.write(seg["text"].strip() + "\n")
+        f.write("\n")
+
+
+def batched(segments, f) -> None:
+    write_cues(segments, f, "srt")
+
+
+def best_of(fn, segments, path: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        with open(path, "w", encoding="utf-8") as f:
+            t0 = time.perf_counter()
+            fn(segments, f)
+            times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--cues", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    segments = [
+        {
+            "start": i * 2.347,
+            "end": i * 2.347 + 1.9,
+            "text": f"Line number {i}",
+        }
+        for i in range(args.cues)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        slow_path = os.path.join(tmp, "per_cue.srt")
+        fast_path = os.path.join(tmp, "batched.srt")
+        slow = best_of(per_cue, segments, slow_path, args.repeat)
+        fast = best_of(batched, segments, fast_path, args.repeat)
+        with open(slow_path, encoding="utf-8") as a, open(
+            fast_path, encoding="utf-8"
+        ) as b:
+            same = a.read() == b.read()
+
+    print(f"per-cue  {args.cues / slow:>12,.0f} cues/s")
+    print(
+        f"batched  {args.cues / fast:>12,.0f} cues/s  "
+        f"({slow / fast:.1f}x, output {'identical' if same else 'DIFFERS'})"
+    )
+
+
+if __name__ == "__main__":
+    main()
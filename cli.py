@@ -1,26 +1,83 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import functools
+import glob
 import os
+import sqlite3
 import subprocess
-import sys
+from contextlib import ExitStack
 from pathlib import Path
 
 import click
 
-from functions.i18n import _, set_language  # noqa: E402
-
-set_language(os.getenv("APP_LANG", "en"))
-
-# Domain logic
-from functions.has_subtitles import has_subtitles  # noqa: E402
-from functions.validators import (  # noqa: E402
-    validate_srt,
+from functions.cue_archive import (
+    SIDECAR_SUFFIX,
+    CueArchive,
+    is_fresh,
+    sidecar_path,
+    write_archive,
+)
+from functions.cues import CueTable
+from functions.follow import follow_transcribe
+from functions.format_timestamp import format_timestamp
+from functions.formats import (
+    FORMAT_NAMES,
+    SUFFIXES,
+    detect_format,
+    read_segments,
+)
+from functions.has_subtitles import has_subtitles
+from functions.i18n import LazyString, _, _l, set_language
+from functions.ocr import ocr_available, ocr_subtitles
+from functions.pipeline import (
+    can_copy,
+    stream_subtitles,
+    translate_segments,
+    translate_srt_lines,
+)
+from functions.preload import AudioDecoder, WhisperPreloader
+from functions.probe import SubtitleStream, probe_media
+from functions.repetition import GuardReport, guarded_transcribe
+from functions.retime import (
+    convert_fps,
+    load_timings,
+    merge_timings,
+    shift_times,
+    stretch_times,
+    to_segments,
+)
+from functions.search_index import CueIndex, default_index_path
+from functions.sync import (
+    FPS_FACTORS,
+    cue_activity,
+    estimate_sync,
+    media_activity,
+)
+from functions.tracks import (
+    FFMPEG_ENCODERS,
+    extract_command,
+    parse_langs,
+    select_tracks,
+    track_outputs,
+)
+from functions.validators import (
+    validate_fps,
+    validate_subtitle,
+    validate_time,
+    validate_times,
     validate_video_extension,
 )
-from functions.write import (  # noqa: E402
+from functions.write import (
+    clean_files,
     clean_srt_file_to_txt,
+    convert_file,
+    find_subtitle_files,
+    open_output,
+    output_sinks,
+    tee_clean_lines,
     write_segments,
+    write_sinks,
 )
 
 # ------------------------- Optional runtime stubs -------------------------
@@ -51,32 +108,175 @@ except Exception:
 
 
 # ------------------------------ Utilities ---------------------------------
+def load_whisper_model(model: str):
+    try:
+        return whisper.load_model(model)
+    except Exception as e:
+        raise click.ClickException(
+            "Whisper "
+            + _(" is required for transcription. ")
+            + _("Install it with: ")
+            + "pip install openai_whisper"
+        ) from e
+
+
+def preload_whisper(video_path: str, model: str) -> WhisperPreloader:
+    """Start loading the model and decoding the audio in the background."""
+    return WhisperPreloader(
+        functools.partial(load_whisper_model, model),
+        AudioDecoder(video_path),
+    ).start()
+
+
+def whisper_segments(
+    video_path: str,
+    model: str,
+    language: str,
+    preloaded: WhisperPreloader | None = None,
+    guard: bool = False,
+) -> CueTable:
+    """Run Whisper and return its segments as a compact ``CueTable``.
+
+    Whisper's own result (tokens, log-probs, ...) is dropped here.
+    """
+    if preloaded is not None:
+        model_instance = preloaded.get_model()
+        audio = preloaded.get_audio()
+    else:
+        model_instance = load_whisper_model(model)
+        audio = None
+
+    if guard:
+        if audio is None:
+            audio = whisper.load_audio(video_path)
+        segments, report = guarded_transcribe(
+            model_instance, audio, language
+        )
+        echo_guard_report(report)
+        return segments
+
+    result = model_instance.transcribe(
+        video_path if audio is None else audio, language=language
+    )
+    return CueTable.from_segments(result.get("segments", []))
+
+
 def transcribe_video(
     video_path: str,
     model: str,
     language: str,
     output: str,
     clean: bool = False,
+    preloaded: WhisperPreloader | None = None,
+    guard: bool = False,
+    fmt: str | None = None,
 ) -> str:
     """Run Whisper, then delegate writing to write_segments."""
+    segments = whisper_segments(
+        video_path, model, language, preloaded, guard
+    )
     try:
-        model_instance = whisper.load_model(model)
+        return write_segments(segments, output, clean, fmt)
     except Exception as e:
         raise click.ClickException(
-            "Whisper "
-            + _(" is required for transcription. ")
-            + _("Install it with: ")
-            + "pip install openai_whisper"
+            _("⚠️ Failed to write transcription: ") + str(e)
         ) from e
 
-    result = model_instance.transcribe(video_path, language=language)
-    segments = result.get("segments", [])
+
+def make_translator(target_lang: str):
     try:
-        return write_segments(segments, output, clean)
-    except Exception as e:
+        return GoogleTranslator(source="auto", target=target_lang)
+    except ImportError:
         raise click.ClickException(
-            _("⚠️ Failed to write transcription: ") + str(e)
-        ) from e
+            _("The ")
+            + "'deep-translator'"
+            + _(" package is required for translation. \n")
+            + _("Install it with: ")
+            + "pip install deep-translator"
+        )
+
+
+def say(message: str = "") -> None:
+    """Status line; goes to stderr while stdout carries subtitle data."""
+    ctx = click.get_current_context(silent=True)
+    click.echo(message, err=bool(ctx and ctx.meta.get("stdout_data")))
+
+
+def _no_clean_to_stdout(clean: bool, output: str) -> None:
+    if clean and output == "-":
+        raise click.BadParameter(
+            _("--clean needs an output file, not '-'."),
+            param_hint="--output",
+        )
+
+
+def say_saved(output: str, clean: bool) -> None:
+    """Name every file written for ``output``."""
+    for path, fmt in output_sinks(output, None, clean):
+        name = Path(path).name or "stdout"
+        if fmt == "txt":
+            say(_("🧹 Clean transcript saved to ") + name)
+        else:
+            say(_("Subtitles saved to ") + name + " 📝")
+
+
+def echo_guard_report(report: GuardReport) -> None:
+    if not report.loops:
+        return
+    say(
+        _("🔁 Repetition loops caught: ")
+        + str(report.loops)
+        + _(" (re-decoded: ")
+        + str(report.redecoded)
+        + _(", skipped: ")
+        + str(len(report.skipped))
+        + ")"
+    )
+    for start, end in report.skipped:
+        say(
+            _("⏭️ Skipped ")
+            + format_timestamp(start)
+            + " --> "
+            + format_timestamp(end)
+        )
+    say(
+        _("⏱️ Dropped ")
+        + str(report.dropped_segments)
+        + _(" repeated segments; stopping loops early saved about ")
+        + f"{report.saved_seconds:.1f}s"
+        + _(" of decoding (re-decoding took ")
+        + f"{report.redecode_seconds:.1f}s"
+        + ")."
+    )
+
+
+# ---------------------------- Lazy help text ------------------------------
+class LazyHelpOption(click.Option):
+    """Option whose help is translated when it is shown.
+
+    click tidies ``help`` into a plain string as soon as the option is
+    declared, at import, which would fix it in the language active then.
+    """
+
+    def __init__(self, *args, help=None, **kwargs):
+        lazy = isinstance(help, LazyString)
+        super().__init__(*args, help=None if lazy else help, **kwargs)
+        if lazy:
+            self.help = help
+
+    def get_help_record(self, ctx):
+        record = super().get_help_record(ctx)
+        return record and (record[0], str(record[1]))
+
+
+def option(*param_decls, **attrs):
+    """``click.option`` for a ``_l()`` help string."""
+    return click.option(*param_decls, cls=LazyHelpOption, **attrs)
+
+
+def _set_language(ctx: click.Context, _param, value: str) -> str:
+    set_language(value)
+    return value
 
 
 # -------------------------- Custom help option ----------------------------
@@ -90,101 +290,157 @@ class CustomGroup(click.Group):
     """Group that installs a custom help option with custom help text."""
 
     def get_help_option(self, ctx):
-        return click.Option(
+        return LazyHelpOption(
             ["--help", "-h"],
             is_flag=True,
             expose_value=False,
-            is_eager=True,
-            help=_("📖 Show this help and exit."),
+            # not eager, so the eager --lang (from the command line or
+            # APP_LANG) is applied first, in either order
+            is_eager=False,
+            help=_l("📖 Show this help and exit."),
             callback=_show_help,
         )
 
 
 # ------------------------------- CLI root ---------------------------------
 @click.group(cls=CustomGroup, invoke_without_command=True)
-@click.option(
+@option(
     "--lang",
     default="en",
+    envvar="APP_LANG",
+    # eager, so help shown later in this run is already translated
+    is_eager=True,
+    callback=_set_language,
     help=(
-        _("🌐 Interface language options: \n")
+        _l("🌐 Interface language options: \n")
         + "en, de, es, fr, ja, ko, pt, pt, br, ru, zh\n"
-        + _("Defaults to English.")
+        + _l("Defaults to English.")
     ),
 )
 @click.pass_context
 def cli(ctx: click.Context, lang: str):
-    # Install translation for runtime messages.
-    set_language(lang)
     ctx.ensure_object(dict)
     ctx.obj["_"] = _
 
     if ctx.invoked_subcommand is None:
-        desired = lang
-        current = os.getenv("APP_LANG", "en")
-        if desired != current:
-            # Re-execute script with APP_LANG=<desired> and --help
-            env = dict(os.environ, APP_LANG=desired)
-            os.execvpe(
-                sys.executable,
-                [sys.executable, sys.argv[0], "--help"],
-                env,
-            )
-        else:
-            click.echo(
-                _("** Welcome to ")
-                + "Subtitle Extractor & Translator CLI **\n"
-            )
-            click.echo(ctx.get_help())
-            click.echo("")
-    else:
         click.echo(
             _("** Welcome to ")
             + "Subtitle Extractor & Translator CLI **\n"
         )
+        click.echo(ctx.get_help())
+        click.echo("")
+    else:
+        # stderr, so piped subtitle output on stdout stays clean
+        click.echo(
+            _("** Welcome to ")
+            + "Subtitle Extractor & Translator CLI **\n",
+            err=True,
+        )
 
 
 # -------------------------------- Commands --------------------------------
-@cli.command(help=_("- Transcribe subtitles from video or audio"))
+@cli.command(help=_l("- Transcribe subtitles from video or audio"))
 @click.argument(
     "video_path",
     type=click.Path(
-        exists=True, dir_okay=False, readable=True, resolve_path=True
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        allow_dash=True,
     ),
     callback=validate_video_extension,
 )
-@click.option(
+@option(
     "--language",
     default="en",
-    help=_("Language hint for transcription") + " (e.g., en, es, zh).",
+    help=_l("Language hint for transcription") + " (e.g., en, es, zh).",
 )
-@click.option(
+@option(
     "--output",
     default="transcription.srt",
-    callback=validate_srt,  # must be .srt for this command
-    help=_("Output '.srt' file"),
+    callback=validate_subtitle,
+    help=_l("Output subtitle file ('-' for stdout)"),
 )
-@click.option(
+@option(
+    "--format",
+    "fmt",
+    type=click.Choice(FORMAT_NAMES),
+    default=None,
+    help=_l(
+        "Subtitle format (default: from the output suffix, else srt)."
+    ),
+)
+@option(
     "--model",
     default="base",
     help="Whisper "
-    + _("model size to use.")
+    + _l("model size to use.")
     + "\n"
-    + _("Options: ")
+    + _l("Options: ")
     + "(tiny, base, small, medium, large)",
 )
-@click.option(
+@option(
     "--clean",
     is_flag=True,
     default=False,
-    help=_("Also write plain '.txt' (no numbering/timestamps)."),
+    help=_l("Also write plain '.txt' (no numbering/timestamps)."),
+)
+@option(
+    "--follow",
+    is_flag=True,
+    default=False,
+    help=_l(
+        "Tail a growing recording (or '-' for stdin) and append cues."
+    ),
+)
+@option(
+    "--window",
+    type=click.FloatRange(min=1.0),
+    default=6.0,
+    show_default=True,
+    help=_l("Seconds of audio per window in --follow mode."),
+)
+@option(
+    "--idle-timeout",
+    type=click.FloatRange(min=1.0),
+    default=30.0,
+    show_default=True,
+    help=_l("Stop following after this many seconds without new data."),
+)
+@option(
+    "--repetition-guard",
+    is_flag=True,
+    default=False,
+    help=_l(
+        "Abort and re-decode windows where Whisper starts looping."
+    ),
 )
 @click.pass_context
-def transcribe(ctx, video_path, model, language, output, clean):
+def transcribe(
+    ctx,
+    video_path,
+    model,
+    language,
+    output,
+    clean,
+    follow,
+    window,
+    idle_timeout,
+    repetition_guard,
+    fmt,
+):
     _ = ctx.obj["_"]
-    short_in = Path(video_path).name
+    ctx.meta["stdout_data"] = output == "-"
+    if video_path == "-" and not follow:
+        raise click.BadParameter(
+            _("Reading from stdin requires --follow."),
+            param_hint="VIDEO_PATH",
+        )
+    short_in = Path(video_path).name or "stdin"
     short_out = Path(output).name
 
-    click.echo(
+    say(
         _("🎙️ Transcribing ")
         + short_in
         + _(" with language ")
@@ -193,22 +449,37 @@ def transcribe(ctx, video_path, model, language, output, clean):
         + short_out
     )
 
-    final_output = transcribe_video(
-        video_path, model, language, output, clean
-    )
-
-    click.echo(_("✅ Transcription complete."))
-    if clean:
-        txt_path = Path(output).with_suffix(".txt")
-        click.echo(_("🧹 Clean transcript saved to ") + txt_path.name)
+    if follow:
+        say(
+            _("👀 Following input; cues are appended as audio arrives.")
+        )
+        follow_transcribe(
+            video_path,
+            load_whisper_model(model),
+            language,
+            output,
+            clean,
+            window,
+            idle_timeout,
+            detect_format(output, fmt),
+        )
     else:
-        click.echo(
-            _("Subtitles saved to ") + Path(final_output).name + " 📝"
+        transcribe_video(
+            video_path,
+            model,
+            language,
+            output,
+            clean,
+            guard=repetition_guard,
+            fmt=fmt,
         )
 
+    say(_("✅ Transcription complete."))
+    say_saved(output, clean)
+
 
 @cli.command(
-    help=_("- Extract subtitles from video; fallback to transcription")
+    help=_l("- Extract subtitles from video; fallback to transcription")
 )
 @click.argument(
     "video_path",
@@ -217,82 +488,229 @@ def transcribe(ctx, video_path, model, language, output, clean):
     ),
     callback=validate_video_extension,
 )
-@click.option(
+@option(
     "--output",
     default="subtitles.srt",
-    callback=validate_srt,  # must be .srt
-    help=_("Output subtitle file name"),
+    callback=validate_subtitle,
+    help=_l("Output subtitle file name ('-' for stdout)"),
+)
+@option(
+    "--format",
+    "fmt",
+    type=click.Choice(FORMAT_NAMES),
+    default=None,
+    help=_l(
+        "Subtitle format (default: from the output suffix, else srt)."
+    ),
 )
-@click.option(
+@option(
     "--language",
     default="en",
-    help=_("Language for fallback transcription"),
+    help=_l("Language for fallback transcription"),
 )
-@click.option(
+@option(
     "--model",
     default="base",
     help="Whisper"
-    + _(" model size to use")
-    + _(" (tiny, base, small, medium, large)"),
+    + _l(" model size to use")
+    + _l(" (tiny, base, small, medium, large)"),
 )
-@click.option(
+@option(
     "--clean",
     is_flag=True,
     default=False,
-    help=_("Also write plain '.txt' (no timestamps or extra lines)"),
+    help=_l("Also write plain '.txt' (no timestamps or extra lines)"),
+)
+@option(
+    "--preload/--no-preload",
+    default=True,
+    help=_l("Load the fallback model while probing for subtitles."),
+)
+@option(
+    "--repetition-guard",
+    is_flag=True,
+    default=False,
+    help=_l(
+        "Abort and re-decode windows where Whisper starts looping."
+    ),
+)
+@option(
+    "--all-tracks",
+    is_flag=True,
+    default=False,
+    help=_l("Extract every subtitle track, one file per track."),
+)
+@option(
+    "--track-lang",
+    default=None,
+    help=_l("Only extract tracks in these languages")
+    + " (e.g., eng,jpn).",
+)
+@option(
+    "--ocr-jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help=_l("Processes for OCR of image-based subtitles")
+    + " (default: CPU count).",
 )
 @click.pass_context
-def extract(ctx, video_path, output, language, model, clean):
+def extract(
+    ctx,
+    video_path,
+    output,
+    language,
+    model,
+    clean,
+    preload,
+    repetition_guard,
+    all_tracks,
+    track_lang,
+    ocr_jobs,
+    fmt,
+):
     _ = ctx.obj["_"]
+    ctx.meta["stdout_data"] = output == "-"
+    fmt = detect_format(output, fmt)
     short_in = Path(video_path).name
     short_out = Path(output).name
+    langs = parse_langs(track_lang)
+    _no_clean_to_stdout(clean, output)
+    if output == "-" and (all_tracks or langs):
+        raise click.BadParameter(
+            _("Several tracks need an output file, not '-'."),
+            param_hint="--output",
+        )
 
-    click.echo(
+    say(
         _("🎬 Extracting subtitles from ")
         + short_in
         + _("... to ")
         + short_out
     )
 
+    # Speculatively warm up the fallback while ffprobe/ffmpeg run; if a
+    # track extracts, the decode is killed and the model dropped.
+    preloaded = preload_whisper(video_path, model) if preload else None
+
     # 1) Try embedded subs
     used_ffmpeg = False
-    if has_subtitles(ctx, file_path=video_path):
-        click.echo(
+    cmd = None
+    tracks = []
+    info = probe_media(video_path)
+    if langs and info.ok and not select_tracks(info.subtitles, langs):
+        if preloaded is not None:
+            preloaded.cancel()
+        available = sorted({s.language for s in info.subtitles})
+        raise click.ClickException(
+            _("No subtitle track matches --track-lang ")
+            + ", ".join(langs)
+            + _(". Available: ")
+            + (", ".join(available) or _("none"))
+        )
+    if has_subtitles(ctx, file_path=video_path, info=info):
+        if all_tracks or langs:
+            tracks = select_tracks(info.subtitles, langs)
+            if output == "-":
+                outputs = [output] * len(tracks)
+            else:
+                outputs = track_outputs(output, tracks)
+        else:
+            # Without stream details let ffmpeg take the first one.
+            tracks = [
+                info.default_subtitle()
+                or SubtitleStream(0, sub_index=0)
+            ]
+            outputs = [output]
+        if any(t.is_bitmap for t in tracks) and not ocr_available():
+            say(_("⚠️ Image-based subtitles need OCR. Skipping them."))
+            say(
+                _("Install it with: ")
+                + "pip install pytesseract Pillow"
+                + " (+ tesseract)"
+            )
+            outputs = [
+                o for t, o in zip(tracks, outputs) if not t.is_bitmap
+            ]
+            tracks = [t for t in tracks if not t.is_bitmap]
+        text = [i for i, t in enumerate(tracks) if not t.is_bitmap]
+        # With --clean every track is streamed through us instead, so
+        # its '.txt' is written in the same pass, not read back.
+        if text and fmt in FFMPEG_ENCODERS and not clean:
+            cmd = extract_command(
+                video_path,
+                [tracks[i] for i in text],
+                [outputs[i] for i in text],
+                fmt,
+            )
+
+    if tracks:
+        say(
             _("📺 Embedded subtitles found. Extracting with ")
             + "ffmpeg..."
         )
         try:
-            subprocess.run(
-                [
-                    "ffmpeg",
-                    "-y",
-                    "-i",
-                    video_path,
-                    "-map",
-                    "0:s:0",
-                    "-c:s",
-                    "srt",
-                    output,
-                ],
-                check=True,
-                capture_output=True,
-                text=True,
-            )
+            if (
+                len(tracks) == 1
+                and not tracks[0].is_bitmap
+                and (
+                    output == "-"
+                    or can_copy(tracks[0].codec)
+                    or not cmd
+                )
+            ):
+                # stream the track through us instead of having ffmpeg
+                # write it; text tracks are copied, not re-encoded
+                write_segments(
+                    stream_subtitles(
+                        video_path, tracks[0].sub_index, tracks[0].codec
+                    ),
+                    outputs[0],
+                    clean,
+                    fmt,
+                )
+            else:
+                if cmd:
+                    subprocess.run(
+                        cmd,
+                        check=True,
+                        capture_output=True,
+                        text=True,
+                    )
+                for track, out in zip(tracks, outputs):
+                    if track.is_bitmap:
+                        say(
+                            _("🔍 Running OCR on ")
+                            + track.codec
+                            + "..."
+                        )
+                        segments = ocr_subtitles(
+                            video_path, track, ocr_jobs
+                        )
+                    elif cmd is None:  # --clean, or no encoder for fmt
+                        segments = stream_subtitles(
+                            video_path, track.sub_index, track.codec
+                        )
+                    else:
+                        continue  # written by ffmpeg
+                    write_segments(segments, out, clean, fmt)
             used_ffmpeg = True
-            click.echo(_("✅ Subtitles saved to ") + short_out + " 📝")
-
-            if clean:
-                # Make a .txt from the extracted .srt
-                txt_out = Path(output).with_suffix(".txt")
-                clean_srt_file_to_txt(output, str(txt_out))
-                click.echo(
-                    _("🧹 Clean transcript saved to ") + txt_out.name
+            if preloaded is not None:
+                preloaded.cancel()
+
+            for out in outputs:
+                say(
+                    _("✅ Subtitles saved to ") + Path(out).name + " 📝"
                 )
+                if clean:
+                    say(
+                        _("🧹 Clean transcript saved to ")
+                        + Path(out).with_suffix(".txt").name
+                    )
 
             return output
 
         except subprocess.CalledProcessError as e:
-            click.echo(
+            say(
                 _(
                     "⚠️ Extraction failed. Falling back to transcription."
                 ).format(code=e.returncode)
@@ -300,50 +718,62 @@ def extract(ctx, video_path, output, language, model, clean):
 
     # 2) Fallback to Whisper (if no subs or ffmpeg failed)
     if not used_ffmpeg:
-        click.echo(
+        say(
             _("⚠️ No embedded subtitles found. Using ")
             + "Whisper"
             + _(" for transcription.")
         )
         final_out = transcribe_video(
-            video_path, model, language, output, clean
+            video_path,
+            model,
+            language,
+            output,
+            clean,
+            preloaded,
+            guard=repetition_guard,
+            fmt=fmt,
         )
-        click.echo(_("✅ Fallback transcription complete."))
-        if clean:
-            txt_path = Path(output).with_suffix(".txt")
-            click.echo(
-                _("🧹 Clean transcript saved to ") + txt_path.name
-            )
-        else:
-            click.echo(
-                _("Subtitles saved to ") + Path(final_out).name + " 📝"
-            )
+        say(_("✅ Fallback transcription complete."))
+        say_saved(output, clean)
         return final_out
 
 
-@cli.command(help=_("- Translate subtitles and save to '.srt' "))
+@cli.command(help=_l("- Translate subtitles and save to '.srt' "))
 @click.argument(
     "srt_file",
     type=click.Path(
-        exists=True, dir_okay=False, readable=True, resolve_path=True
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        allow_dash=True,
     ),
 )
-@click.option(
+@option(
     "--target-lang",
     required=True,
-    help=_("Target language") + "(e.g., es, fr, de)",
+    help=_l("Target language") + "(e.g., es, fr, de)",
 )
-@click.option(
+@option(
     "--output",
     default="translated.srt",
-    callback=validate_srt,  # must be .srt
-    help=_("Translated subtitle output file"),
+    callback=validate_subtitle,
+    help=_l("Translated subtitle output file ('-' for stdout)"),
 )
-@click.option(
+@option(
+    "--format",
+    "fmt",
+    type=click.Choice(FORMAT_NAMES),
+    default=None,
+    help=_l(
+        "Subtitle format (default: from the output suffix, else srt)."
+    ),
+)
+@option(
     "--clean",
     is_flag=True,
     default=False,
-    help=_("Also write plain '.txt' (no numbering/timestamps)."),
+    help=_l("Also write plain '.txt' (no numbering/timestamps)."),
 )
 @click.pass_context
 def translate(
@@ -352,12 +782,17 @@ def translate(
     target_lang: str,
     output: str,
     clean: bool,
+    fmt: str | None,
 ):
     _ = ctx.obj["_"]
+    ctx.meta["stdout_data"] = output == "-"
+    _no_clean_to_stdout(clean, output)
+    in_fmt = detect_format(srt_file)
+    fmt = detect_format(output, fmt)
     short_name = Path(srt_file).name
     out_name = Path(output).name
 
-    click.echo(
+    say(
         _("🌐 Translating ")
         + short_name
         + _(" to ")
@@ -366,70 +801,82 @@ def translate(
         + out_name
     )
 
-    try:
-        translator = GoogleTranslator(source="auto", target=target_lang)
-    except ImportError:
-        raise click.ClickException(
-            _("The ")
-            + "'deep-translator'"
-            + _(" package is required for translation. \n")
-            + _("Install it with: ")
-            + "pip install deep-translator"
-        )
+    translator = make_translator(target_lang)
 
+    txt_out = str(Path(output).with_suffix(".txt"))
     try:
-        Path(output).parent.mkdir(parents=True, exist_ok=True)
-        with open(srt_file, "r", encoding="utf-8") as infile, open(
-            output, "w", encoding="utf-8"
-        ) as outfile:
-            for line in infile:
-                s = line.strip()
-                if not s or s.isdigit() or "-->" in s:
-                    # keep indices, blank lines, and timing lines
-                    outfile.write(line)
-                else:
-                    translated = translator.translate(s)
-                    outfile.write(translated + "\n")
+        if in_fmt == fmt == "srt":
+            # line by line, so numbering and layout stay untouched
+            with ExitStack() as stack:
+                infile = stack.enter_context(
+                    click.open_file(srt_file, encoding="utf-8")
+                )
+                outfile = stack.enter_context(open_output(output))
+                lines = translate_srt_lines(infile, translator)
+                if clean:
+                    lines = tee_clean_lines(
+                        lines, stack.enter_context(open_output(txt_out))
+                    )
+                outfile.writelines(lines)
+        else:
+            write_sinks(
+                translate_segments(
+                    read_segments(srt_file, in_fmt), translator
+                ),
+                output_sinks(output, fmt, clean),
+            )
     except Exception as e:
         raise click.ClickException(_("⚠️ Translation failed: ") + str(e))
 
-    click.echo(
-        _("✅ Translation complete. Saved to ") + out_name + " 📝"
-    )
-
+    say(_("✅ Translation complete. Saved to ") + out_name + " 📝")
     if clean:
-        try:
-            txt_out = Path(output).with_suffix(".txt")
-            clean_srt_file_to_txt(output, str(txt_out))
-            click.echo(
-                _("🧹 Clean transcript saved to ") + txt_out.name
-            )
-        except Exception as e:
-            raise click.ClickException(_("⚠️ Clean failed: ") + str(e))
+        say(_("🧹 Clean transcript saved to ") + Path(txt_out).name)
 
 
 @cli.command(
     help=(
-        _(" - Clean an existing '.srt' or '.txt' into plain text\n")
-        + _("  (no empty lines or timestamps).")
+        _l(" - Clean an existing '.srt' or '.txt' into plain text\n")
+        + _l("  (no empty lines or timestamps).")
     )
 )
 @click.argument(
     "srt_file",
-    type=click.Path(
-        exists=True, dir_okay=False, readable=True, resolve_path=True
-    ),
+    metavar="SOURCE",
+    type=click.Path(allow_dash=True),
 )
-@click.option(
+@option(
     "--output",
     default=None,  # defaults to input[:-4] + ".txt"
-    help=_(
+    help=_l(
         "Output text file (defaults to input name with '.txt' extension)"
     ),
 )
-def clean(srt_file, output):
+@option(
+    "--format",
+    "fmt",
+    type=click.Choice(FORMAT_NAMES),
+    default=None,
+    help=_l(
+        "Input subtitle format (default: from the suffix, else srt)."
+    ),
+)
+@option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help=_l("Files cleaned in parallel for a folder or glob")
+    + " (default: CPU count).",
+)
+@click.pass_context
+def clean(ctx, srt_file, output, fmt, jobs):
+    if srt_file != "-" and (
+        os.path.isdir(srt_file) or glob.has_magic(srt_file)
+    ):
+        return clean_many(ctx, srt_file, output, fmt, jobs)
+
+    ctx.meta["stdout_data"] = (output or srt_file) == "-"
     try:
-        out_path = clean_srt_file_to_txt(srt_file, output)
+        out_path = clean_srt_file_to_txt(srt_file, output, fmt)
     except click.BadParameter as e:
         raise click.BadParameter(_("Invalid input file: ") + str(e))
     except Exception as e:
@@ -440,10 +887,877 @@ def clean(srt_file, output):
             + str(e)
         )
 
-    click.echo(
+    say(
         _("🧹 Clean transcript saved to ") + Path(out_path).name + " 📝"
     )
-    click.echo(_("Done."))
+    say(_("Done."))
+
+
+def clean_many(ctx, source, output, fmt, jobs):
+    """``clean`` for a folder or glob: a '.txt' beside each file, or
+    mirrored into the ``--output`` folder."""
+    _ = ctx.obj["_"]
+    if output == "-":
+        raise click.BadParameter(
+            _("A folder needs an output folder, not '-'."),
+            param_hint="--output",
+        )
+    root, files = find_subtitle_files(source)
+    if not files:
+        raise click.ClickException(
+            _("No subtitle files match ") + source
+        )
+    dest = Path(output).resolve() if output else root
+    pairs = [
+        (str(f), str((dest / f.relative_to(root)).with_suffix(".txt")))
+        for f in files
+    ]
+    cleaned = failed = 0
+    for src, _out, error in clean_files(pairs, fmt, jobs):
+        if error is None:
+            cleaned += 1
+        else:
+            failed += 1
+            say(
+                _("⚠️ Failed to clean ")
+                + Path(src).name
+                + ": "
+                + str(error)
+            )
+    say(_("🧹 Cleaned ") + str(cleaned) + _(" files") + " 📝")
+    if failed:
+        raise click.ClickException(
+            str(failed) + _(" files could not be cleaned.")
+        )
+
+
+@cli.command(help=_l("- Convert subtitle files or whole folders"))
+@click.argument(
+    "source",
+    type=click.Path(
+        exists=True, readable=True, resolve_path=True, allow_dash=True
+    ),
+)
+@option(
+    "--format",
+    "fmt",
+    type=click.Choice(FORMAT_NAMES),
+    default=None,
+    help=_l(
+        "Subtitle format (default: from the output suffix, else srt)."
+    ),
+)
+@option(
+    "--output",
+    default=None,
+    help=_l(
+        "Output file or folder (default: next to the input; '-' for stdout)"
+    ),
+)
+@option(
+    "--from",
+    "src_fmt",
+    type=click.Choice(FORMAT_NAMES),
+    default=None,
+    help=_l("Input format (default: from each file's suffix)."),
+)
+@click.pass_context
+def convert(ctx, source, fmt, output, src_fmt):
+    _ = ctx.obj["_"]
+    ctx.meta["stdout_data"] = output == "-"
+    src = Path(source)
+
+    if source == "-" or src.is_file():
+        if output and output != "-":
+            validate_subtitle(ctx, None, output)
+        fmt = fmt or detect_format(output or "")
+        dst = output or str(src.with_suffix("." + fmt))
+        if dst != "-" and Path(dst).resolve() == src:
+            raise click.BadParameter(
+                _("Input is already in that format."),
+                param_hint="--format",
+            )
+        try:
+            count = convert_file(source, dst, fmt, src_fmt)
+        except Exception as e:
+            raise click.ClickException(
+                _("⚠️ Conversion failed: ") + str(e)
+            ) from e
+        say(
+            _("✅ Converted ")
+            + str(count)
+            + _(" cues to ")
+            + Path(dst).name
+            + " 📝"
+        )
+        return
+
+    # A folder: every subtitle file below it, mirrored into --output.
+    if output == "-":
+        raise click.BadParameter(
+            _("A folder needs an output folder, not '-'."),
+            param_hint="--output",
+        )
+    if not fmt:
+        raise click.BadParameter(
+            _("Converting a folder needs --format."),
+            param_hint="--format",
+        )
+    dest = Path(output) if output else src
+    converted = failed = 0
+    for path in sorted(src.rglob("*")):
+        if not path.is_file() or path.suffix.lower() not in SUFFIXES:
+            continue
+        in_fmt = src_fmt or SUFFIXES[path.suffix.lower()]
+        if in_fmt == fmt:
+            continue
+        dst = (dest / path.relative_to(src)).with_suffix("." + fmt)
+        try:
+            convert_file(str(path), str(dst), fmt, in_fmt)
+            converted += 1
+        except Exception as e:
+            failed += 1
+            say(_("⚠️ Conversion failed: ") + path.name + ": " + str(e))
+    say(
+        _("✅ Converted ")
+        + str(converted)
+        + _(" files to ")
+        + fmt
+        + " 📝"
+    )
+    if failed:
+        raise click.ClickException(
+            str(failed) + _(" files could not be converted.")
+        )
+
+
+def retime_file(ctx, source, output, fmt, transform) -> int:
+    """Read ``source``, apply ``transform(starts, ends)`` to its timing
+    arrays and write the result; returns the number of cues written."""
+    _ = ctx.obj["_"]
+    in_fmt = detect_format(source)
+    if output is None:
+        # rewrite in place, unless that would put --format's content
+        # under the source's name: movie.srt --format vtt -> movie.vtt
+        output = (
+            str(Path(source).with_suffix("." + fmt))
+            if fmt and fmt != in_fmt and source != "-"
+            else source
+        )
+    ctx.meta["stdout_data"] = output == "-"
+    try:
+        starts, ends, texts = load_timings(read_segments(source))
+        starts, ends = transform(starts, ends)
+        segments = to_segments(starts, ends, texts)
+        fmt = detect_format(output, fmt, in_fmt)
+        write_segments(segments, output, False, fmt)
+    except Exception as e:
+        raise click.ClickException(
+            _("⚠️ Retiming failed: ") + str(e)
+        ) from e
+    say(
+        _("✅ Retimed ")
+        + str(len(segments))
+        + _(" cues to ")
+        + Path(output).name
+        + " 📝"
+    )
+    return len(segments)
+
+
+@cli.command(help=_l("- Move every cue earlier or later"))
+@click.argument(
+    "source",
+    type=click.Path(
+        exists=True, dir_okay=False, readable=True, allow_dash=True
+    ),
+)
+@option(
+    "--output",
+    default=None,
+    callback=validate_subtitle,
+    help=_l(
+        "Output file (default: rewrite SOURCE, or SOURCE with the "
+        "--format suffix; '-' for stdout)"
+    ),
+)
+@option(
+    "--format",
+    "fmt",
+    type=click.Choice(FORMAT_NAMES),
+    default=None,
+    help=_l("Output format (default: same as the input)."),
+)
+@option(
+    "--by",
+    "offset",
+    required=True,
+    callback=validate_time,
+    help=_l(
+        "Offset in seconds or [-]HH:MM:SS,mmm (negative is earlier)."
+    ),
+)
+@click.pass_context
+def shift(ctx, source, output, fmt, offset):
+    retime_file(
+        ctx, source, output, fmt, lambda s, e: shift_times(s, e, offset)
+    )
+
+
+@cli.command(help=_l("- Scale cue times to fix gradual drift"))
+@click.argument(
+    "source",
+    type=click.Path(
+        exists=True, dir_okay=False, readable=True, allow_dash=True
+    ),
+)
+@option(
+    "--output",
+    default=None,
+    callback=validate_subtitle,
+    help=_l(
+        "Output file (default: rewrite SOURCE, or SOURCE with the "
+        "--format suffix; '-' for stdout)"
+    ),
+)
+@option(
+    "--format",
+    "fmt",
+    type=click.Choice(FORMAT_NAMES),
+    default=None,
+    help=_l("Output format (default: same as the input)."),
+)
+@option(
+    "--factor",
+    type=click.FloatRange(min=0, min_open=True),
+    required=True,
+    help=_l("Multiply times by this (e.g. 1.001)."),
+)
+@option(
+    "--anchor",
+    default="0",
+    callback=validate_time,
+    help=_l("Time that stays put (default: 0)."),
+)
+@click.pass_context
+def stretch(ctx, source, output, fmt, factor, anchor):
+    retime_file(
+        ctx,
+        source,
+        output,
+        fmt,
+        lambda s, e: stretch_times(s, e, factor, anchor),
+    )
+
+
+@cli.command(help=_l("- Retime subtitles for a different frame rate"))
+@click.argument(
+    "source",
+    type=click.Path(
+        exists=True, dir_okay=False, readable=True, allow_dash=True
+    ),
+)
+@option(
+    "--output",
+    default=None,
+    callback=validate_subtitle,
+    help=_l(
+        "Output file (default: rewrite SOURCE, or SOURCE with the "
+        "--format suffix; '-' for stdout)"
+    ),
+)
+@option(
+    "--format",
+    "fmt",
+    type=click.Choice(FORMAT_NAMES),
+    default=None,
+    help=_l("Output format (default: same as the input)."),
+)
+@option(
+    "--from",
+    "src_fps",
+    required=True,
+    callback=validate_fps,
+    help=_l("Frame rate the subtitles were timed for")
+    + " (e.g. 23.976).",
+)
+@option(
+    "--to",
+    "dst_fps",
+    required=True,
+    callback=validate_fps,
+    help=_l("Frame rate of the video") + " (e.g. 25).",
+)
+@click.pass_context
+def fps(ctx, source, output, fmt, src_fps, dst_fps):
+    retime_file(
+        ctx,
+        source,
+        output,
+        fmt,
+        lambda s, e: convert_fps(s, e, src_fps, dst_fps),
+    )
+
+
+@cli.command(help=_l("- Merge subtitle files into one, in time order"))
+@click.argument(
+    "sources",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, readable=True),
+)
+@option(
+    "--output",
+    default="merged.srt",
+    callback=validate_subtitle,
+    help=_l("Merged subtitle file ('-' for stdout)"),
+)
+@option(
+    "--format",
+    "fmt",
+    type=click.Choice(FORMAT_NAMES),
+    default=None,
+    help=_l(
+        "Subtitle format (default: from the output suffix, else srt)."
+    ),
+)
+@option(
+    "--offset",
+    "offsets",
+    multiple=True,
+    callback=validate_times,
+    help=_l(
+        "Shift for each file, in order (repeat; e.g. CD2 start time)."
+    ),
+)
+@click.pass_context
+def merge(ctx, sources, output, fmt, offsets):
+    _ = ctx.obj["_"]
+    ctx.meta["stdout_data"] = output == "-"
+    if len(offsets) > len(sources):
+        raise click.BadParameter(
+            _("More offsets than files."), param_hint="--offset"
+        )
+    offsets = [*offsets, *[0.0] * (len(sources) - len(offsets))]
+    try:
+        parts = []
+        for path, offset in zip(sources, offsets):
+            starts, ends, texts = load_timings(read_segments(path))
+            parts.append((*shift_times(starts, ends, offset), texts))
+        segments = to_segments(*merge_timings(parts))
+        write_segments(segments, output, False, fmt)
+    except Exception as e:
+        raise click.ClickException(
+            _("⚠️ Merge failed: ") + str(e)
+        ) from e
+    say(
+        _("✅ Merged ")
+        + str(len(sources))
+        + _(" files (")
+        + str(len(segments))
+        + _(" cues) into ")
+        + Path(output).name
+        + " 📝"
+    )
+
+
+@cli.command(
+    help=_l(
+        "- Line subtitles up with a video's audio (offset and drift)"
+    )
+)
+@click.argument(
+    "source",
+    type=click.Path(
+        exists=True, dir_okay=False, readable=True, allow_dash=True
+    ),
+)
+@click.argument(
+    "reference",
+    type=click.Path(exists=True, dir_okay=False, readable=True),
+)
+@option(
+    "--output",
+    default=None,
+    callback=validate_subtitle,
+    help=_l(
+        "Output file (default: rewrite SOURCE, or SOURCE with the "
+        "--format suffix; '-' for stdout)"
+    ),
+)
+@option(
+    "--format",
+    "fmt",
+    type=click.Choice(FORMAT_NAMES),
+    default=None,
+    help=_l("Output format (default: same as the input)."),
+)
+@option(
+    "--audio-track",
+    type=click.IntRange(min=0),
+    default=0,
+    help=_l("Audio stream of REFERENCE to listen to (default: 0)."),
+)
+@option(
+    "--max-offset",
+    type=click.FloatRange(min=0, min_open=True),
+    default=600.0,
+    help=_l("Largest offset to look for, in seconds (default: 600)."),
+)
+@option(
+    "--drift/--no-drift",
+    default=True,
+    help=_l("Also correct speed (frame rate) differences."),
+)
+@click.pass_context
+def sync(
+    ctx, source, reference, output, fmt, audio_track, max_offset, drift
+):
+    _ = ctx.obj["_"]
+    ctx.meta["stdout_data"] = (output or source) == "-"
+    say(_("🎧 Listening to ") + Path(reference).name + "...")
+    try:
+        if Path(reference).suffix.lower() in SUFFIXES:
+            # an in-sync subtitle file works as the reference too
+            ref_starts, ref_ends, _texts = load_timings(
+                read_segments(reference)
+            )
+            speech = cue_activity(ref_starts, ref_ends)
+        else:
+            speech = media_activity(reference, audio_track)
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise click.ClickException(
+            _("⚠️ Could not read audio from ") + Path(reference).name
+        ) from e
+
+    def transform(starts, ends):
+        factor, offset, score = estimate_sync(
+            speech,
+            starts,
+            ends,
+            max_offset,
+            FPS_FACTORS if drift else (1.0,),
+            refine=drift,
+        )
+        say(
+            _("🎯 Offset ")
+            + f"{offset:+.3f}s"
+            + _(", speed ")
+            + f"x{factor:.5f}"
+            + _(" (match ")
+            + f"{score:.2f})"
+        )
+        return shift_times(*stretch_times(starts, ends, factor), offset)
+
+    retime_file(ctx, source, output, fmt, transform)
+
+
+@cli.command(
+    help=_l("- Add subtitle files to the full-text search index")
+)
+@click.argument("sources", nargs=-1, required=True)
+@option(
+    "--db",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help=_l(
+        "Index file (default: ~/.cache/subtitle-extractor/index.sqlite)"
+    ),
+)
+@click.pass_context
+def index(ctx, sources, db):
+    _ = ctx.obj["_"]
+    cue_index = CueIndex(db or default_index_path())
+    indexed = unchanged = failed = cues = 0
+    roots = []
+    try:
+        for source in sources:
+            if os.path.isfile(source):
+                files = [Path(source)]
+            elif os.path.isdir(source) or glob.has_magic(source):
+                root, files = find_subtitle_files(source)
+                roots.append(root)
+            else:
+                raise click.BadParameter(
+                    _("📄 File not found: ") + source,
+                    param_hint="SOURCES",
+                )
+            for path, count, error in cue_index.add(files):
+                if error is not None:
+                    failed += 1
+                    say(
+                        _("⚠️ Could not index ")
+                        + Path(path).name
+                        + ": "
+                        + str(error)
+                    )
+                elif count is None:
+                    unchanged += 1
+                else:
+                    indexed += 1
+                    cues += count
+        removed = cue_index.prune(roots)
+        total_files, total_cues = cue_index.counts()
+    finally:
+        cue_index.close()
+
+    say(
+        _("📚 Indexed ")
+        + str(indexed)
+        + _(" files (")
+        + str(cues)
+        + _(" cues); ")
+        + str(unchanged)
+        + _(" unchanged, ")
+        + str(removed)
+        + _(" removed.")
+    )
+    say(
+        _("Index holds ")
+        + str(total_files)
+        + _(" files, ")
+        + str(total_cues)
+        + _(" cues.")
+    )
+    if failed:
+        raise click.ClickException(
+            str(failed) + _(" files could not be indexed.")
+        )
+
+
+@cli.command(help=_l("- Find cues in the search index"))
+@click.argument("query", nargs=-1, required=True)
+@option(
+    "--db",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help=_l(
+        "Index file (default: ~/.cache/subtitle-extractor/index.sqlite)"
+    ),
+)
+@option(
+    "--limit",
+    type=click.IntRange(min=1),
+    default=20,
+    help=_l("Most matches to show (default: 20)."),
+)
+@option(
+    "--raw",
+    is_flag=True,
+    default=False,
+    help=_l('QUERY is SQLite FTS5 syntax (OR, NEAR, "phrases").'),
+)
+@click.pass_context
+def search(ctx, query, db, limit, raw):
+    _ = ctx.obj["_"]
+    ctx.meta["stdout_data"] = True
+    path = Path(db) if db else default_index_path()
+    if not path.exists():
+        raise click.ClickException(
+            _("No search index yet; run 'index' first.")
+        )
+    cue_index = CueIndex(path)
+    try:
+        hits = cue_index.search(" ".join(query), limit, raw)
+    except sqlite3.OperationalError as e:
+        raise click.BadParameter(str(e), param_hint="QUERY")
+    finally:
+        cue_index.close()
+    for hit in hits:
+        click.echo(
+            f"{hit.path}\t{format_timestamp(hit.start)}"
+            f" --> {format_timestamp(hit.end)}\t{hit.text}"
+        )
+    if not hits:
+        say(_("No matches."))
+
+
+def ensure_archive(source: str, force: bool = False) -> Path:
+    """Sidecar of ``source``, (re)built if missing or out of date."""
+    archive = sidecar_path(source)
+    if force or not is_fresh(archive, source):
+        write_archive(
+            CueTable.from_segments(read_segments(source)),
+            archive,
+            source,
+        )
+    return archive
+
+
+@cli.command(
+    help=_l("- Write '.cues' sidecars for fast lookups in long files")
+)
+@click.argument("sources", nargs=-1, required=True)
+@option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help=_l("Rebuild sidecars that are already up to date."),
+)
+@click.pass_context
+def archive(ctx, sources, force):
+    _ = ctx.obj["_"]
+    built = fresh = failed = 0
+    for source in sources:
+        if os.path.isfile(source):
+            files = [Path(source)]
+        elif os.path.isdir(source) or glob.has_magic(source):
+            files = find_subtitle_files(source)[1]
+        else:
+            raise click.BadParameter(
+                _("📄 File not found: ") + source, param_hint="SOURCES"
+            )
+        for path in files:
+            if not force and is_fresh(sidecar_path(path), path):
+                fresh += 1
+                continue
+            try:
+                ensure_archive(str(path), force=True)
+                built += 1
+            except Exception as e:
+                failed += 1
+                say(
+                    _("⚠️ Could not archive ")
+                    + path.name
+                    + ": "
+                    + str(e)
+                )
+    say(
+        _("🗃️ Wrote ")
+        + str(built)
+        + _(" sidecars; ")
+        + str(fresh)
+        + _(" already up to date.")
+    )
+    if failed:
+        raise click.ClickException(
+            str(failed) + _(" files could not be archived.")
+        )
+
+
+@cli.command(
+    help=_l("- Show cues by time or number from a '.cues' sidecar")
+)
+@click.argument(
+    "source",
+    type=click.Path(exists=True, dir_okay=False, readable=True),
+)
+@option(
+    "--at",
+    callback=validate_time,
+    default=None,
+    help=_l("Cues around this time") + " (e.g. 01:23:45).",
+)
+@option(
+    "--around",
+    type=click.IntRange(min=1),
+    default=3,
+    help=_l("How many cues before and after --at (default: 3)."),
+)
+@option(
+    "--from",
+    "t0",
+    callback=validate_time,
+    default=None,
+    help=_l("Cues on screen from this time..."),
+)
+@option(
+    "--to",
+    "t1",
+    callback=validate_time,
+    default=None,
+    help=_l("...up to this time."),
+)
+@option(
+    "--number",
+    type=click.IntRange(min=1),
+    default=None,
+    help=_l("A single cue by its number."),
+)
+@click.pass_context
+def cues(ctx, source, at, around, t0, t1, number):
+    _ = ctx.obj["_"]
+    ctx.meta["stdout_data"] = True
+    modes = (at is not None) + (t0 is not None or t1 is not None)
+    if modes + (number is not None) != 1:
+        raise click.UsageError(
+            _("Give exactly one of --at, --from/--to or --number.")
+        )
+    try:
+        path = (
+            Path(source)
+            if source.endswith(SIDECAR_SUFFIX)
+            else ensure_archive(source)
+        )
+        with CueArchive(path) as cue_archive:
+            if number:
+                if number > len(cue_archive):
+                    raise click.BadParameter(
+                        _("There are only ")
+                        + str(len(cue_archive))
+                        + _(" cues."),
+                        param_hint="--number",
+                    )
+                hits = [(number, cue_archive.cue(number))]
+            elif at is not None:
+                hits = cue_archive.around(at, around)
+            else:
+                hits = cue_archive.between(
+                    t0 if t0 is not None else 0.0,
+                    t1 if t1 is not None else float("inf"),
+                )
+    except (OSError, ValueError) as e:
+        raise click.ClickException(str(e)) from e
+    for idx, cue in hits:
+        click.echo(
+            f"{idx}\n{format_timestamp(cue['start'])} --> "
+            f"{format_timestamp(cue['end'])}\n{cue['text']}\n"
+        )
+
+
+@cli.command(
+    help=_l("- Extract or transcribe, translate and clean in one pass")
+)
+@click.argument(
+    "video_path",
+    type=click.Path(
+        exists=True, dir_okay=False, readable=True, resolve_path=True
+    ),
+    callback=validate_video_extension,
+)
+@option(
+    "--output",
+    default="subtitles.srt",
+    callback=validate_subtitle,
+    help=_l("Final subtitle file ('-' for stdout)"),
+)
+@option(
+    "--format",
+    "fmt",
+    type=click.Choice(FORMAT_NAMES),
+    default=None,
+    help=_l(
+        "Subtitle format (default: from the output suffix, else srt)."
+    ),
+)
+@option(
+    "--target-lang",
+    default=None,
+    help=_l("Translate to this language") + " (e.g., es, fr, de)",
+)
+@option(
+    "--language",
+    default="en",
+    help=_l("Language for fallback transcription"),
+)
+@option(
+    "--model",
+    default="base",
+    help="Whisper"
+    + _l(" model size to use")
+    + _l(" (tiny, base, small, medium, large)"),
+)
+@option(
+    "--clean",
+    is_flag=True,
+    default=False,
+    help=_l("Also write plain '.txt' (no timestamps or extra lines)"),
+)
+@option(
+    "--ocr-jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help=_l("Processes for OCR of image-based subtitles")
+    + " (default: CPU count).",
+)
+@click.pass_context
+def process(
+    ctx,
+    video_path,
+    output,
+    target_lang,
+    language,
+    model,
+    clean,
+    ocr_jobs,
+    fmt,
+):
+    # Subtitles flow from ffmpeg (or Whisper) through translation into
+    # the writers in memory; only the final files touch the disk.
+    _ = ctx.obj["_"]
+    ctx.meta["stdout_data"] = output == "-"
+    _no_clean_to_stdout(clean, output)
+    txt_out = str(Path(output).with_suffix(".txt")) if clean else None
+    translator = make_translator(target_lang) if target_lang else None
+
+    say(
+        _("⚙️ Processing ")
+        + Path(video_path).name
+        + _(" -> ")
+        + Path(output).name
+    )
+
+    def finish(segments):
+        if translator is not None:
+            segments = translate_segments(segments, translator)
+        return write_sinks(segments, output_sinks(output, fmt, clean))
+
+    written = None
+    info = probe_media(video_path)
+    try:
+        if has_subtitles(ctx, file_path=video_path, info=info):
+            track = info.default_subtitle() or SubtitleStream(
+                0, sub_index=0
+            )
+            say(
+                _("📺 Embedded subtitles found. Extracting with ")
+                + "ffmpeg..."
+            )
+            try:
+                if not track.is_bitmap:
+                    segments = stream_subtitles(
+                        video_path, track.sub_index, track.codec
+                    )
+                elif ocr_available():
+                    say(_("🔍 Running OCR on ") + track.codec + "...")
+                    segments = ocr_subtitles(
+                        video_path, track, ocr_jobs
+                    )
+                else:
+                    say(
+                        _(
+                            "⚠️ Image-based subtitles need OCR. Skipping them."
+                        )
+                    )
+                    segments = None
+                if segments is not None:
+                    written = finish(segments)
+            except subprocess.CalledProcessError:
+                say(
+                    _(
+                        "⚠️ Extraction failed. Falling back to transcription."
+                    )
+                )
+
+        if written is None:
+            say(
+                _("⚠️ No embedded subtitles found. Using ")
+                + "Whisper"
+                + _(" for transcription.")
+            )
+            written = finish(
+                whisper_segments(video_path, model, language)
+            )
+    except click.ClickException:
+        raise
+    except Exception as e:
+        raise click.ClickException(
+            _("⚠️ Processing failed: ") + str(e)
+        ) from e
+
+    say(_("✅ Subtitles saved to ") + Path(output).name + " 📝")
+    if txt_out:
+        say(_("🧹 Clean transcript saved to ") + Path(txt_out).name)
 
 
 # ------------------------------- Entrypoint -------------------------------
@@ -0,0 +1,220 @@
+# extract_messages.py
+# Collects _("...") strings from Python sources into a POT, in process.
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+import polib
+
+# Call names whose first argument is a translatable string
+KEYWORDS = {"_", "_l"}
+CACHE_VERSION = 1
+# Below this many files to parse, a process pool costs more than it saves
+PARALLEL_MIN = 16
+
+# What xgettext flags as python-brace-format: {}, {0}, {name}, {name:>8}
+BRACE_FORMAT_RE = re.compile(r"{\w*(?:![rsa])?(?::[^{}]*)?}")
+
+
+class Message(NamedTuple):
+    msgid: str
+    path: str  # relative to the source root
+    line: int
+
+
+class Extraction(NamedTuple):
+    messages: list[Message]
+    hashes: dict[str, str]  # relative path -> sha256 of its contents
+    parsed: int  # files that had to be parsed this time
+
+    def digest(self) -> str:
+        """One hash over the names and contents of every source."""
+        h = hashlib.sha256()
+        for rel in sorted(self.hashes):
+            h.update(
+                rel.encode() + b"\0" + self.hashes[rel].encode() + b"\0"
+            )
+        return h.hexdigest()
+
+
+def literal_string(node: ast.AST) -> str | None:
+    """The value of a string literal, or of literals joined with ``+``."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left = literal_string(node.left)
+        right = literal_string(node.right)
+        if left is not None and right is not None:
+            return left + right
+    return None
+
+
+def parse_messages(data: bytes, filename: str) -> list[tuple[str, int]]:
+    """``(msgid, line)`` of every ``_()`` call with a literal argument,
+    in source order."""
+    tree = ast.parse(data, filename)
+    found = []
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id in KEYWORDS
+            and node.args
+        ):
+            text = literal_string(node.args[0])
+            if text:
+                found.append((node.lineno, node.col_offset, text))
+    found.sort()
+    return [(text, line) for line, _col, text in found]
+
+
+def _parse_file(rel: str, data: bytes):
+    try:
+        return rel, parse_messages(data, rel), None
+    except (SyntaxError, ValueError) as e:
+        return rel, None, e
+
+
+def load_cache(path: Path | None) -> dict:
+    if path is None:
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("files", {})
+
+
+def save_cache(path: Path, files: dict) -> None:
+    tmp = path.with_name(path.name + ".part")
+    tmp.write_text(
+        json.dumps({"version": CACHE_VERSION, "files": files}),
+        encoding="utf-8",
+    )
+    os.replace(tmp, path)
+
+
+def extract(
+    sources: list[str],
+    root: Path,
+    cache_path: Path | None = None,
+    jobs: int | None = None,
+) -> Extraction:
+    """
+    Messages of ``sources``. A file whose size and mtime match the cache
+    is not read at all; one whose contents hash the same is not parsed.
+    Files that do need parsing are spread over ``jobs`` processes.
+    Files that fail to parse are reported on stderr and skipped.
+    """
+    cached = load_cache(cache_path)
+    files: dict[str, dict] = {}
+    to_parse: list[tuple[str, bytes]] = []
+    stats: dict[str, os.stat_result] = {}
+    hashes: dict[str, str] = {}
+
+    for src in sources:
+        rel = Path(os.path.relpath(src, root)).as_posix()
+        st = os.stat(src)
+        entry = cached.get(rel)
+        if entry and (entry["size"], entry["mtime_ns"]) == (
+            st.st_size,
+            st.st_mtime_ns,
+        ):
+            files[rel] = entry
+            continue
+        data = Path(src).read_bytes()
+        sha = hashlib.sha256(data).hexdigest()
+        stats[rel] = st
+        hashes[rel] = sha
+        if entry and entry["sha256"] == sha:
+            files[rel] = {
+                **entry,
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+            }
+        else:
+            to_parse.append((rel, data))
+
+    if (
+        len(to_parse) >= PARALLEL_MIN
+        and (jobs or os.cpu_count() or 1) > 1
+    ):
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_parse_file, *zip(*to_parse)))
+    else:
+        results = [_parse_file(rel, data) for rel, data in to_parse]
+
+    failed = []
+    for rel, messages, error in results:
+        if error is not None:
+            print(f"⚠️  Skipping {rel}: {error}", file=sys.stderr)
+            failed.append(rel)
+            continue
+        st = stats[rel]
+        files[rel] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": hashes[rel],
+            "messages": messages,
+        }
+
+    if cache_path is not None and files != cached:
+        save_cache(cache_path, files)
+
+    messages = [
+        Message(text, rel, line)
+        for rel in sorted(files)
+        for text, line in files[rel]["messages"]
+    ]
+    # unparsable files count too, so fixing one changes the digest
+    all_hashes = {rel: entry["sha256"] for rel, entry in files.items()}
+    all_hashes.update((rel, hashes[rel]) for rel in failed)
+    return Extraction(messages, all_hashes, len(to_parse))
+
+
+def build_pot(messages: list[Message]) -> polib.POFile:
+    """One entry per msgid, with every place it is used, in order of
+    first use."""
+    pot = polib.POFile(wrapwidth=78)
+    pot.metadata_is_fuzzy = True
+    pot.metadata = {
+        "Project-Id-Version": "PACKAGE VERSION",
+        "Report-Msgid-Bugs-To": "",
+        "POT-Creation-Date": datetime.now(timezone.utc).strftime(
+            "%Y-%m-%d %H:%M%z"
+        ),
+        "PO-Revision-Date": "YEAR-MO-DA HO:MI+ZONE",
+        "Last-Translator": "FULL NAME <EMAIL@ADDRESS>",
+        "Language-Team": "LANGUAGE <LL@li.org>",
+        "Language": "",
+        "MIME-Version": "1.0",
+        "Content-Type": "text/plain; charset=UTF-8",
+        "Content-Transfer-Encoding": "8bit",
+    }
+    entries: dict[str, polib.POEntry] = {}
+    for msg in messages:
+        entry = entries.get(msg.msgid)
+        if entry is None:
+            entry = entries[msg.msgid] = polib.POEntry(
+                msgid=msg.msgid, msgstr=""
+            )
+            if BRACE_FORMAT_RE.search(msg.msgid):
+                entry.flags.append("python-brace-format")
+            pot.append(entry)
+        entry.occurrences.append((msg.path, str(msg.line)))
+    return pot
+
+
+def write_pot(messages: list[Message], path: Path) -> None:
+    build_pot(messages).save(str(path))
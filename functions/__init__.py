@@ -1,5 +1,6 @@
 from .has_subtitles import has_subtitles
 from .i18n import _, set_language
+from .probe import MediaInfo, probe_media
 from .validators import validate_srt, validate_video_extension
 from .write import clean_srt_file_to_txt, write_segments
 
@@ -9,6 +10,8 @@ __all__ = [
     "write_segments",
     "clean_srt_file_to_txt",
     "has_subtitles",
+    "probe_media",
+    "MediaInfo",
     "validate_srt",
     "validate_video_extension",
 ]
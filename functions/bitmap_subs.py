@@ -0,0 +1,761 @@
+from __future__ import annotations
+
+import subprocess
+import tempfile
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+FFPROBE = "ffprobe"
+
+# ffprobe prints packet payloads as "%08x: " + 41 columns of hex + ASCII.
+HEX_START, HEX_END = 10, 51
+
+# A cue nothing ends (last packet, no duration) stays up this long.
+LAST_CUE = 5.0
+PAD = 10  # white border around rendered bitmaps; OCR wants margins
+
+
+@dataclass(frozen=True)
+class Bitmap:
+    """One subtitle image, still run-length encoded.
+
+    ``table`` maps every palette index to 0 (ink) or 255 (background),
+    so two bitmaps compare equal exactly when they render the same
+    image. Placement is kept for reading order but not compared.
+    """
+
+    codec: str  # "pgs", "dvd" or "dvb"
+    width: int
+    height: int
+    data: bytes
+    table: bytes
+    fields: tuple[int, ...] = ()  # codec-specific offsets/depth
+    x: int = field(default=0, compare=False)
+    y: int = field(default=0, compare=False)
+
+
+# An event is (time, bitmaps now on screen, end time if known); an
+# event with no bitmaps clears the screen.
+Event = tuple[float, tuple[Bitmap, ...], "float | None"]
+
+
+def _be16(data: bytes, i: int) -> int:
+    return (data[i] << 8) | data[i + 1]
+
+
+def ink_table(entries: dict[int, tuple[int, int]]) -> bytes:
+    """Palette index -> 0 for ink, 255 for background.
+
+    ``entries`` maps indices to ``(luma, alpha)``. Opaque entries on the
+    light side are ink; subtitles are almost always light text with a
+    dark outline, and dropping the outline keeps glyphs apart for OCR.
+    If all opaque colours are alike, all of them are ink.
+    """
+    opaque = {i: y for i, (y, a) in entries.items() if a >= 128}
+    table = bytearray(b"\xff" * 256)
+    if not opaque:
+        return bytes(table)
+    lo, hi = min(opaque.values()), max(opaque.values())
+    cut = (lo + hi) / 2 if hi - lo >= 64 else lo
+    for i, y in opaque.items():
+        if y >= cut and 0 <= i < 256:
+            table[i] = 0
+    return bytes(table)
+
+
+# --------------------------------- demuxing --------------------------------
+def packet_command(video_path: str, sub_index: int) -> list[str]:
+    """ffprobe command that dumps one subtitle track's raw packets."""
+    return [
+        FFPROBE,
+        "-v",
+        "error",
+        "-select_streams",
+        f"s:{sub_index}",
+        "-show_entries",
+        "packet=pts_time,duration_time,data",
+        "-show_data",
+        "-of",
+        "default",
+        video_path,
+    ]
+
+
+def parse_sections(lines: Iterable[str]) -> Iterator[dict]:
+    """Stream ffprobe's default output, one dict per ``[SECTION]``.
+
+    Hex dumps (``-show_data``) come back as ``bytes``.
+    """
+    section: dict | None = None
+    key = None
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if line.startswith("[/"):
+            if section is not None:
+                yield {
+                    k: bytes(v) if isinstance(v, bytearray) else v
+                    for k, v in section.items()
+                }
+            section, key = None, None
+        elif line.startswith("["):
+            section, key = {}, None
+        elif section is None:
+            continue
+        elif key and line[8:10] == ": ":
+            section[key] += bytes.fromhex(line[HEX_START:HEX_END])
+        else:
+            k, _, v = line.partition("=")
+            section[k] = v if v else bytearray()
+            key = None if v else k
+
+
+def _time(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None  # "N/A"
+
+
+def read_packets(
+    lines: Iterable[str],
+) -> Iterator[tuple[float, float | None, bytes]]:
+    """``(pts, duration, payload)`` for every packet in a dump."""
+    for s in parse_sections(lines):
+        pts = _time(s.get("pts_time"))
+        if pts is not None and s.get("data"):
+            yield pts, _time(s.get("duration_time")), s["data"]
+
+
+def demux_packets(
+    video_path: str, sub_index: int
+) -> Iterator[tuple[float, float | None, bytes]]:
+    """Stream a track's packets from ffprobe without touching the disk.
+
+    Raises ``CalledProcessError`` once the stream ends if ffprobe failed.
+    """
+    cmd = packet_command(video_path, sub_index)
+    # stderr goes to a file: a long -show_data dump is read from stdout
+    # first, and warnings piling up in an unread pipe would block ffprobe
+    with tempfile.TemporaryFile() as errors:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=errors,
+            text=True,
+            encoding="ascii",
+            errors="replace",
+        )
+        try:
+            yield from read_packets(proc.stdout)
+        finally:
+            proc.stdout.close()
+            code = proc.wait()
+        if code:
+            errors.seek(0)
+            err = errors.read().decode("utf-8", "replace")
+            raise subprocess.CalledProcessError(code, cmd, stderr=err)
+
+
+def stream_extradata(video_path: str, sub_index: int) -> bytes:
+    """Codec private data (e.g. the VobSub palette) of one track."""
+    proc = subprocess.run(
+        [
+            FFPROBE,
+            "-v",
+            "error",
+            "-select_streams",
+            f"s:{sub_index}",
+            "-show_entries",
+            "stream=extradata",
+            "-show_data",
+            "-of",
+            "default",
+            video_path,
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    for s in parse_sections(proc.stdout.splitlines()):
+        if isinstance(s.get("extradata"), bytes):
+            return s["extradata"]
+    return b""
+
+
+# ----------------------------------- PGS -----------------------------------
+def pgs_events(
+    packets: Iterable[tuple[float, float | None, bytes]],
+    extradata: bytes = b"",
+) -> Iterator[Event]:
+    """Blu-ray PGS: one event per display set (PCS ... END)."""
+    palettes: dict[int, dict[int, tuple[int, int]]] = {}
+    objects: dict[int, tuple[int, int, bytearray]] = {}
+    comp = None
+    for pts, _dur, data in packets:
+        i = 0
+        while i + 3 <= len(data):
+            kind, size = data[i], _be16(data, i + 1)
+            seg = data[i + 3 : i + 3 + size]  # noqa: E203
+            i += 3 + size
+            if kind == 0x16 and len(seg) >= 11:  # presentation
+                if seg[7] & 0x80:  # epoch start: everything resets
+                    palettes.clear()
+                    objects.clear()
+                placed, pos = [], 11
+                for _ in range(seg[10]):
+                    if pos + 8 > len(seg):
+                        break
+                    placed.append(
+                        (
+                            _be16(seg, pos),
+                            _be16(seg, pos + 4),
+                            _be16(seg, pos + 6),
+                        )
+                    )
+                    pos += 16 if seg[pos + 3] & 0x80 else 8
+                comp = (pts, seg[9], placed)
+            elif kind == 0x14 and len(seg) >= 2:  # palette
+                pal = palettes.setdefault(seg[0], {})
+                for j in range(2, len(seg) - 4, 5):
+                    pal[seg[j]] = (seg[j + 1], seg[j + 4])  # Y, alpha
+            elif kind == 0x15 and len(seg) >= 4:  # object
+                oid = _be16(seg, 0)
+                if seg[3] & 0x80 and len(seg) >= 11:  # first fragment
+                    objects[oid] = (
+                        _be16(seg, 7),
+                        _be16(seg, 9),
+                        bytearray(seg[11:]),
+                    )
+                elif oid in objects:
+                    objects[oid][2].extend(seg[4:])
+            elif kind == 0x80 and comp is not None:  # end of set
+                start, pal_id, placed = comp
+                comp = None
+                table = ink_table(palettes.get(pal_id, {}))
+                yield start, tuple(
+                    Bitmap("pgs", w, h, bytes(rle), table, x=x, y=y)
+                    for oid, x, y in placed
+                    if oid in objects
+                    for w, h, rle in [objects[oid]]
+                ), None
+
+
+def decode_pgs(bm: Bitmap) -> bytearray:
+    data, w = bm.data, bm.width
+    out = bytearray()
+    i, n = 0, len(data)
+    try:
+        while i < n:
+            b = data[i]
+            i += 1
+            if b:
+                out.append(b)
+                continue
+            b = data[i]
+            i += 1
+            if not b:  # end of line
+                out += bytes(-len(out) % w)
+                continue
+            run = b & 0x3F
+            if b & 0x40:
+                run = (run << 8) | data[i]
+                i += 1
+            color = 0
+            if b & 0x80:
+                color = data[i]
+                i += 1
+            out += bytes((color,)) * run
+    except IndexError:
+        pass  # truncated object: keep what decoded
+    return out
+
+
+# ---------------------------------- VobSub ---------------------------------
+def dvd_palette(extradata: bytes) -> list[int]:
+    """Luma of the 16 colours in an idx-style ``palette:`` line."""
+    for line in extradata.decode("ascii", "replace").splitlines():
+        key, _, value = line.partition(":")
+        if key.strip().lower() != "palette":
+            continue
+        lumas = []
+        for colour in value.split(","):
+            try:
+                rgb = int(colour.strip(), 16)
+            except ValueError:
+                return []
+            r, g, b = rgb >> 16 & 255, rgb >> 8 & 255, rgb & 255
+            lumas.append(int(0.299 * r + 0.587 * g + 0.114 * b))
+        return lumas
+    return []
+
+
+def parse_spu(
+    data: bytes, lumas: list[int]
+) -> tuple[float, float | None, Bitmap | None] | None:
+    """DVD subpicture unit -> ``(start, stop, bitmap)`` relative to pts."""
+    if len(data) < 4:
+        return None
+    ctrl = _be16(data, 2)
+    colors, alpha = [0, 1, 2, 3], [0, 15, 15, 15]
+    x1 = x2 = y1 = y2 = top = bottom = 0
+    start, stop = 0.0, None
+    pos, seen = ctrl, set()
+    try:
+        while pos + 4 <= len(data) and pos not in seen:
+            seen.add(pos)
+            delay = _be16(data, pos) * 1024 / 90000
+            nxt, i = _be16(data, pos + 2), pos + 4
+            while i < len(data):
+                cmd = data[i]
+                i += 1
+                if cmd == 0xFF:
+                    break
+                if cmd in (0x00, 0x01):
+                    start = delay
+                elif cmd == 0x02:
+                    stop = delay
+                elif cmd in (0x03, 0x04):  # e2 e1 p b nibbles
+                    vals = [
+                        data[i + 1] & 15,
+                        data[i + 1] >> 4,
+                        data[i] & 15,
+                        data[i] >> 4,
+                    ]
+                    if cmd == 0x03:
+                        colors = vals
+                    else:
+                        alpha = vals
+                    i += 2
+                elif cmd == 0x05:
+                    x1 = (data[i] << 4) | (data[i + 1] >> 4)
+                    x2 = ((data[i + 1] & 15) << 8) | data[i + 2]
+                    y1 = (data[i + 3] << 4) | (data[i + 4] >> 4)
+                    y2 = ((data[i + 4] & 15) << 8) | data[i + 5]
+                    i += 6
+                elif cmd == 0x06:
+                    top, bottom = _be16(data, i), _be16(data, i + 2)
+                    i += 4
+                else:
+                    break  # unknown command; give up on this sequence
+            if nxt == pos:
+                break
+            pos = nxt
+    except IndexError:
+        return None
+
+    w, h = x2 - x1 + 1, y2 - y1 + 1
+    if w <= 0 or h <= 0 or not top or not bottom:
+        return start, stop, None
+    entries = {
+        v: (
+            (
+                lumas[colors[v]]
+                if colors[v] < len(lumas)
+                else (
+                    255 if v == 1 else 0
+                )  # no palette: pattern is ink
+            ),
+            alpha[v] * 17,
+        )
+        for v in range(4)
+    }
+    base = min(top, bottom)
+    bitmap = Bitmap(
+        "dvd",
+        w,
+        h,
+        bytes(data[base:ctrl]),
+        ink_table(entries),
+        (top - base, bottom - base),
+        x=x1,
+        y=y1,
+    )
+    return start, stop, bitmap
+
+
+def dvd_events(
+    packets: Iterable[tuple[float, float | None, bytes]],
+    extradata: bytes = b"",
+) -> Iterator[Event]:
+    lumas = dvd_palette(extradata)
+    for pts, dur, data in packets:
+        parsed = parse_spu(data, lumas)
+        if parsed is None:
+            continue
+        start, stop, bitmap = parsed
+        if stop is not None:
+            end = pts + stop
+        else:
+            end = pts + dur if dur else None
+        yield pts + start, (bitmap,) if bitmap else (), end
+
+
+def _dvd_field(data: bytes, offset: int, w: int, lines: int) -> list:
+    rows = []
+    p = offset * 2  # position in nibbles
+
+    def nib() -> int:
+        nonlocal p
+        b = data[p >> 1]
+        p += 1
+        return b & 15 if p & 1 == 0 else b >> 4
+
+    try:
+        for _ in range(lines):
+            row, x = bytearray(), 0
+            while x < w:
+                v = nib()
+                if v < 0x4:
+                    v = (v << 4) | nib()
+                    if v < 0x10:
+                        v = (v << 4) | nib()
+                        if v < 0x40:
+                            v = (v << 4) | nib()
+                run = min(v >> 2 or w - x, w - x)
+                row += bytes((v & 3,)) * run
+                x += run
+            p += p & 1  # lines start on a byte boundary
+            rows.append(row)
+    except IndexError:
+        pass
+    return rows
+
+
+def decode_dvd(bm: Bitmap) -> bytearray:
+    w, h = bm.width, bm.height
+    top = _dvd_field(bm.data, bm.fields[0], w, (h + 1) // 2)
+    bottom = _dvd_field(bm.data, bm.fields[1], w, h // 2)
+    out = bytearray()
+    for r in range(h):
+        field_rows = bottom if r & 1 else top
+        if r // 2 < len(field_rows):
+            out += field_rows[r // 2]
+        else:
+            out += bytes(w)
+    return out
+
+
+# ------------------------------------ DVB ----------------------------------
+def default_clut(depth: int) -> dict[int, tuple[int, int]]:
+    """Rough luma/alpha of the EN 300 743 default CLUTs."""
+    if depth == 1:
+        return {0: (0, 0), 1: (235, 255), 2: (16, 255), 3: (125, 255)}
+    if depth == 2:
+        return {
+            i: (
+                (0, 0)
+                if i == 0
+                else (200 if i < 8 else 16 if i == 8 else 100, 255)
+            )
+            for i in range(16)
+        }
+    return {i: (i, 0 if i == 0 else 255) for i in range(256)}
+
+
+def dvb_events(
+    packets: Iterable[tuple[float, float | None, bytes]],
+    extradata: bytes = b"",
+) -> Iterator[Event]:
+    """DVB subtitles: one event per page (page ... end of display set)."""
+    cluts: dict[int, dict[int, dict[int, tuple[int, int]]]] = {}
+    regions: dict[int, tuple] = {}
+    objects: dict[int, tuple[bytes, int]] = {}
+    page = None
+    for pts, _dur, data in packets:
+        i = 2 if data[:2] == b"\x20\x00" else 0
+        while i + 6 <= len(data) and data[i] == 0x0F:
+            kind, size = data[i + 1], _be16(data, i + 4)
+            seg = data[i + 6 : i + 6 + size]  # noqa: E203
+            i += 6 + size
+            if kind == 0x10 and len(seg) >= 2:  # page composition
+                if (seg[1] >> 2) & 3 == 2:  # mode change
+                    cluts.clear()
+                    regions.clear()
+                    objects.clear()
+                placed = [
+                    (seg[j], _be16(seg, j + 2), _be16(seg, j + 4))
+                    for j in range(2, len(seg) - 5, 6)
+                ]
+                page = (pts, seg[0], placed)
+            elif kind == 0x11 and len(seg) >= 10:  # region composition
+                objs, j = [], 10
+                while j + 6 <= len(seg):
+                    objs.append(
+                        (
+                            _be16(seg, j),
+                            _be16(seg, j + 2) & 0xFFF,
+                            _be16(seg, j + 4) & 0xFFF,
+                        )
+                    )
+                    j += 8 if seg[j + 2] >> 6 in (1, 2) else 6
+                regions[seg[0]] = (
+                    _be16(seg, 2),
+                    _be16(seg, 4),
+                    (seg[6] >> 2) & 7,
+                    seg[7],
+                    objs,
+                )
+            elif kind == 0x12 and len(seg) >= 2:  # CLUT definition
+                clut = cluts.setdefault(seg[0], {1: {}, 2: {}, 3: {}})
+                j = 2
+                while j + 2 <= len(seg):
+                    eid, flags = seg[j], seg[j + 1]
+                    j += 2
+                    if flags & 1 and j + 4 <= len(seg):  # full range
+                        y, t = seg[j], seg[j + 3]
+                        j += 4
+                    elif j + 2 <= len(seg):
+                        v = _be16(seg, j)
+                        y, t = (v >> 10) << 2, (v & 3) * 85
+                        j += 2
+                    else:
+                        break
+                    entry = (y, 0 if y == 0 else 255 - t)
+                    for depth, bit in ((1, 0x80), (2, 0x40), (3, 0x20)):
+                        if flags & bit:
+                            clut[depth][eid] = entry
+            elif kind == 0x13 and len(seg) >= 7:  # object data
+                if (seg[2] >> 2) & 3 == 0:  # pixels, not characters
+                    tl, bl = _be16(seg, 3), _be16(seg, 5)
+                    top = bytes(seg[7 : 7 + tl])  # noqa: E203
+                    bottom = (
+                        bytes(seg[7 + tl : 7 + tl + bl])  # noqa: E203
+                        if bl
+                        else top
+                    )
+                    objects[_be16(seg, 0)] = (top + bottom, tl)
+            elif kind == 0x80 and page is not None:  # end of display
+                start, timeout, placed = page
+                page = None
+                bitmaps = []
+                for rid, rx, ry in placed:
+                    if rid not in regions:
+                        continue
+                    w, h, depth, clut_id, objs = regions[rid]
+                    table = ink_table(
+                        cluts.get(clut_id, {}).get(depth)
+                        or default_clut(depth)
+                    )
+                    for oid, ox, oy in objs:
+                        if oid in objects and w > ox and h > oy:
+                            pixels, tl = objects[oid]
+                            bitmaps.append(
+                                Bitmap(
+                                    "dvb",
+                                    w - ox,
+                                    h - oy,
+                                    pixels,
+                                    table,
+                                    (tl, depth),
+                                    x=rx + ox,
+                                    y=ry + oy,
+                                )
+                            )
+                yield start, tuple(bitmaps), (
+                    start + timeout if timeout else None
+                )
+
+
+class _Bits:
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data: bytes, byte_pos: int):
+        self.data = data
+        self.pos = byte_pos * 8
+
+    def read(self, n: int) -> int:
+        v = 0
+        for _ in range(n):
+            byte = self.data[self.pos >> 3]
+            v = (v << 1) | ((byte >> (7 - (self.pos & 7))) & 1)
+            self.pos += 1
+        return v
+
+    def aligned(self) -> int:
+        return (self.pos + 7) >> 3
+
+
+def _dvb_2bit(data: bytes, i: int) -> tuple[bytearray, int]:
+    r, out = _Bits(data, i), bytearray()
+    while True:
+        v = r.read(2)
+        if v:
+            out.append(v)
+        elif r.read(1):
+            run = r.read(3) + 3
+            out += bytes((r.read(2),)) * run
+        elif r.read(1):
+            out.append(0)
+        else:
+            code = r.read(2)
+            if code == 0:
+                break
+            if code == 1:
+                out += bytes(2)
+            else:
+                run = r.read(4) + 12 if code == 2 else r.read(8) + 29
+                out += bytes((r.read(2),)) * run
+    return out, r.aligned()
+
+
+def _dvb_4bit(data: bytes, i: int) -> tuple[bytearray, int]:
+    r, out = _Bits(data, i), bytearray()
+    while True:
+        v = r.read(4)
+        if v:
+            out.append(v)
+        elif not r.read(1):
+            n = r.read(3)
+            if n == 0:
+                break
+            out += bytes(n + 2)
+        elif not r.read(1):
+            run = r.read(2) + 4
+            out += bytes((r.read(4),)) * run
+        else:
+            code = r.read(2)
+            if code < 2:
+                out += bytes(code + 1)
+            else:
+                run = r.read(4) + 9 if code == 2 else r.read(8) + 25
+                out += bytes((r.read(4),)) * run
+    return out, r.aligned()
+
+
+def _dvb_8bit(data: bytes, i: int) -> tuple[bytearray, int]:
+    r, out = _Bits(data, i), bytearray()
+    while True:
+        v = r.read(8)
+        if v:
+            out.append(v)
+        elif not r.read(1):
+            n = r.read(7)
+            if n == 0:
+                break
+            out += bytes(n)
+        else:
+            run = r.read(7)
+            out += bytes((r.read(8),)) * run
+    return out, r.aligned()
+
+
+def _lut(values) -> bytes:
+    return bytes(values) + bytes(range(len(values), 256))
+
+
+def _dvb_field(block: bytes, w: int, depth: int) -> list:
+    rows, row, i = [], bytearray(), 0
+    map24, map28, map48 = (
+        [0, 7, 8, 15],
+        [0, 0x77, 0x88, 0xFF],
+        list(range(0, 256, 17)),
+    )
+    try:
+        while i < len(block):
+            kind = block[i]
+            i += 1
+            if kind == 0x10:
+                pixels, i = _dvb_2bit(block, i)
+                if depth in (2, 3):
+                    pixels = pixels.translate(
+                        _lut(map24 if depth == 2 else map28)
+                    )
+                row += pixels
+            elif kind == 0x11:
+                pixels, i = _dvb_4bit(block, i)
+                row += (
+                    pixels.translate(_lut(map48))
+                    if depth == 3
+                    else pixels
+                )
+            elif kind == 0x12:
+                pixels, i = _dvb_8bit(block, i)
+                row += pixels
+            elif kind == 0x20:
+                map24 = [block[i] >> 4, block[i] & 15]
+                map24 += [block[i + 1] >> 4, block[i + 1] & 15]
+                i += 2
+            elif kind == 0x21:
+                map28 = list(block[i : i + 4])  # noqa: E203
+                i += 4
+            elif kind == 0x22:
+                map48 = list(block[i : i + 16])  # noqa: E203
+                i += 16
+            elif kind == 0xF0:  # end of line
+                rows.append(bytes(row[:w].ljust(w, b"\0")))
+                row = bytearray()
+            else:
+                break
+    except IndexError:
+        pass
+    return rows
+
+
+def decode_dvb(bm: Bitmap) -> bytearray:
+    w, h = bm.width, bm.height
+    tl, depth = bm.fields
+    top = _dvb_field(bm.data[:tl], w, depth)
+    bottom = _dvb_field(bm.data[tl:], w, depth)
+    out = bytearray()
+    for r in range(min(h, len(top) + len(bottom))):
+        field_rows = bottom if r & 1 else top
+        if r // 2 < len(field_rows):
+            out += field_rows[r // 2]
+        else:
+            out += bytes(w)
+    return out
+
+
+# --------------------------------- rendering -------------------------------
+EVENT_PARSERS = {
+    "hdmv_pgs_subtitle": pgs_events,
+    "dvd_subtitle": dvd_events,
+    "dvb_subtitle": dvb_events,
+}
+DECODERS = {"pgs": decode_pgs, "dvd": decode_dvd, "dvb": decode_dvb}
+
+
+def render(bm: Bitmap) -> tuple[int, int, bytes] | None:
+    """Decode to 8-bit gray, black ink on white, cropped and padded.
+
+    Returns ``(width, height, pixels)`` or None if nothing is visible.
+    """
+    w = bm.width
+    gray = bytes(DECODERS[bm.codec](bm)).translate(bm.table)
+    rows = [
+        gray[r * w : (r + 1) * w]  # noqa: E203
+        for r in range(min(bm.height, len(gray) // w))
+    ]
+    inked = [r for r, row in enumerate(rows) if 0 in row]
+    if not inked:
+        return None
+    top, bottom = inked[0], inked[-1]
+    left = min(rows[r].find(0) for r in inked)
+    right = max(rows[r].rfind(0) for r in inked)
+    width = right - left + 1 + 2 * PAD
+    margin = b"\xff" * PAD
+    out = [b"\xff" * width] * PAD
+    for r in range(top, bottom + 1):
+        row = rows[r][left : right + 1]  # noqa: E203
+        out.append(margin + row + margin)
+    out += [b"\xff" * width] * PAD
+    return width, bottom - top + 1 + 2 * PAD, b"".join(out)
+
+
+def display_cues(
+    events: Iterable[Event],
+) -> Iterator[tuple[float, float, tuple[Bitmap, ...]]]:
+    """``(start, end, bitmaps)`` for every span something is on screen."""
+    pending = None
+    for start, bitmaps, end in events:
+        if pending is not None:
+            p_start, p_bitmaps, p_end = pending
+            stop = start if p_end is None else min(p_end, start)
+            if p_bitmaps and stop > p_start:
+                yield p_start, stop, p_bitmaps
+        pending = (start, bitmaps, end)
+    if pending is not None and pending[1]:
+        start, bitmaps, end = pending
+        yield start, (
+            end if end is not None else start + LAST_CUE
+        ), bitmaps
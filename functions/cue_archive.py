@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+import numpy as np
+
+from functions.cues import CueTable
+
+# A ``.cues`` sidecar, little-endian, every section 8-byte aligned:
+#
+#   header   magic, version, cue count, longest cue, source size/mtime
+#   records  count x (start f64, end f64, text offset u32, text length u32)
+#   starts   count x f64, sorted
+#   order    count x u32, record number of each sorted start
+#   text     UTF-8 blob, each distinct line stored once
+#
+# Records are in file order, so cue ``n`` is record ``n - 1``. Time
+# lookups binary-search the sorted starts; the longest cue bounds how
+# far back a cue that is still on screen can have started.
+MAGIC = b"SUBCUES\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIdQQ")
+RECORD = struct.Struct("<ddII")
+SIDECAR_SUFFIX = ".cues"
+
+
+def sidecar_path(path: str | Path) -> Path:
+    """``movie.en.srt`` -> ``movie.en.srt.cues``."""
+    return Path(str(path) + SIDECAR_SUFFIX)
+
+
+def _pad(n: int) -> int:
+    return -n % 8
+
+
+def write_archive(
+    table: CueTable, path: str | Path, source: str | Path | None = None
+) -> Path:
+    """Write ``table`` as a ``.cues`` file; ``source`` (the subtitle file
+    it was read from) is stamped in so stale sidecars can be detected.
+    """
+    count = len(table)
+    starts = np.array(table.starts, dtype="<f8")
+    ends = np.array(table.ends, dtype="<f8")
+    order = np.argsort(starts, kind="stable").astype("<u4")
+    longest = float((ends - starts).max()) if count else 0.0
+
+    texts = [t.encode("utf-8") for t in table.pool]
+    pool_offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum([len(t) for t in texts], out=pool_offsets[1:])
+    ids = np.array(table.text_ids, dtype=np.int64)
+
+    records = np.zeros(
+        count,
+        dtype=[
+            ("start", "<f8"),
+            ("end", "<f8"),
+            ("off", "<u4"),
+            ("len", "<u4"),
+        ],
+    )
+    records["start"] = starts
+    records["end"] = ends
+    records["off"] = pool_offsets[ids]
+    records["len"] = pool_offsets[ids + 1] - pool_offsets[ids]
+
+    st = os.stat(source) if source is not None else None
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        count,
+        longest,
+        st.st_size if st else 0,
+        st.st_mtime_ns if st else 0,
+    )
+    order_bytes = order.tobytes()
+    path = Path(path)
+    tmp = path.with_name(path.name + ".part")
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(records.tobytes())
+        f.write(starts[order].tobytes())
+        f.write(order_bytes + b"\0" * _pad(len(order_bytes)))
+        f.write(b"".join(texts))
+    os.replace(tmp, path)
+    return path
+
+
+def is_fresh(archive: str | Path, source: str | Path) -> bool:
+    """The sidecar exists and was built from ``source`` as it is now."""
+    try:
+        with open(archive, "rb") as f:
+            head = f.read(HEADER.size)
+        st = os.stat(source)
+    except OSError:
+        return False
+    if len(head) < HEADER.size:
+        return False
+    magic, version, _count, _longest, size, mtime_ns = HEADER.unpack(
+        head
+    )
+    return (
+        magic == MAGIC
+        and version == VERSION
+        and (size, mtime_ns) == (st.st_size, st.st_mtime_ns)
+    )
+
+
+class CueArchive:
+    """Memory-mapped ``.cues`` file.
+
+    Opening costs one ``mmap``; ``cue``, ``between`` and ``around``
+    touch only the records they return plus a binary search, however
+    long the transcript is.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, count, longest, _size, _mtime = (
+                HEADER.unpack_from(self._mm)
+            )
+        except struct.error:
+            magic = version = None
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{self.path} is not a .cues archive")
+        self.count = count
+        self.longest = longest
+        self._records = HEADER.size
+        starts_at = self._records + count * RECORD.size
+        order_at = starts_at + count * 8
+        order_end = order_at + count * 4
+        self._text = order_end + _pad(count * 4)
+        view = memoryview(self._mm)
+        # views into the map; released again in close()
+        self._starts = view[starts_at:order_at]
+        self._order = view[order_at:order_end]
+        if sys.byteorder == "little":
+            self._starts = self._starts.cast("d")
+            self._order = self._order.cast("I")
+        else:  # copy and swap; the file is always little-endian
+            self._starts, self._order = array("d"), array("I")
+            self._starts.frombytes(view[starts_at:order_at])
+            self._order.frombytes(view[order_at:order_end])
+            self._starts.byteswap()
+            self._order.byteswap()
+        view.release()
+
+    def close(self) -> None:
+        for view in (self._starts, self._order):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mm.close()
+
+    def __enter__(self) -> CueArchive:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _record(self, row: int) -> dict:
+        start, end, off, length = RECORD.unpack_from(
+            self._mm, self._records + row * RECORD.size
+        )
+        lo = self._text + off
+        hi = lo + length
+        text = self._mm[lo:hi].decode("utf-8")
+        return {"start": start, "end": end, "text": text}
+
+    def cue(self, number: int) -> dict:
+        """Cue ``number`` (1-based, as numbered in the SRT)."""
+        if not 1 <= number <= self.count:
+            raise IndexError(number)
+        return self._record(number - 1)
+
+    def between(self, t0: float, t1: float) -> list[tuple[int, dict]]:
+        """``(number, cue)`` of cues on screen at any time in
+        ``[t0, t1]``, by start time."""
+        lo = bisect_left(self._starts, t0 - self.longest)
+        hi = bisect_right(self._starts, t1)
+        hits = []
+        for i in range(lo, hi):
+            row = self._order[i]
+            cue = self._record(row)
+            if cue["end"] >= t0:
+                hits.append((row + 1, cue))
+        return hits
+
+    def around(
+        self, t: float, count: int = 3
+    ) -> list[tuple[int, dict]]:
+        """The ``count`` cues that started by ``t`` (the last of them
+        usually still on screen) and the ``count`` after it, by start
+        time."""
+        pos = bisect_right(self._starts, t)
+        return [
+            (self._order[i] + 1, self._record(self._order[i]))
+            for i in range(
+                max(pos - count, 0), min(pos + count, self.count)
+            )
+        ]
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Mapping
+from typing import Iterable, Iterator
+
+KEYS = ("start", "end", "text")
+
+
+def _floats(values) -> array:
+    """``array('d')`` of ``values``; float64 buffers (NumPy arrays) are
+    copied in one go instead of item by item."""
+    out = array("d")
+    try:
+        view = memoryview(values)
+    except TypeError:
+        out.extend(float(v) for v in values)
+        return out
+    if view.format == "d" and view.c_contiguous:
+        out.frombytes(view.cast("B"))
+    else:
+        out.extend(float(v) for v in view.tolist())
+    return out
+
+
+class Cue(Mapping):
+    """One row of a ``CueTable``.
+
+    A read-only view that reads like the ``{"start", "end", "text"}``
+    dicts used everywhere else, so code written for segments keeps
+    working; it holds no data of its own.
+    """
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: CueTable, row: int):
+        self._table = table
+        self._row = row
+
+    @property
+    def start(self) -> float:
+        return self._table.starts[self._row]
+
+    @property
+    def end(self) -> float:
+        return self._table.ends[self._row]
+
+    @property
+    def text(self) -> str:
+        return self._table.pool[self._table.text_ids[self._row]]
+
+    def __getitem__(self, key: str):
+        if key == "start":
+            return self.start
+        if key == "end":
+            return self.end
+        if key == "text":
+            return self.text
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(KEYS)
+
+    def __len__(self) -> int:
+        return len(KEYS)
+
+    def __repr__(self) -> str:
+        return f"Cue({self.start!r}, {self.end!r}, {self.text!r})"
+
+
+class CueTable:
+    """Cues stored column-wise.
+
+    Start and end times live in two contiguous ``array('d')`` columns and
+    each text is an index into a pool in which every distinct line is
+    stored once, so a cue costs about 20 bytes plus its (shared) text
+    instead of a dict per segment. Whisper's tokens, log-probs and other
+    per-segment fields are dropped on the way in. Iterating or indexing
+    yields ``Cue`` row views.
+    """
+
+    __slots__ = ("starts", "ends", "text_ids", "pool", "_pool_index")
+
+    def __init__(self):
+        self.starts = array("d")
+        self.ends = array("d")
+        self.text_ids = array("I")
+        self.pool: list[str] = []
+        self._pool_index: dict[str, int] = {}
+
+    @classmethod
+    def from_segments(
+        cls, segments: Iterable[Mapping], offset: float = 0.0
+    ) -> CueTable:
+        """Table of ``segments``, each shifted by ``offset`` seconds."""
+        table = cls()
+        table.extend(segments, offset)
+        return table
+
+    @classmethod
+    def from_columns(
+        cls, starts, ends, texts: Iterable[str]
+    ) -> CueTable:
+        """Table from parallel start, end and text sequences."""
+        table = cls()
+        table.starts = _floats(starts)
+        table.ends = _floats(ends)
+        table.text_ids = array(
+            "I", (table._intern(str(t).strip()) for t in texts)
+        )
+        if (
+            not len(table.starts)
+            == len(table.ends)
+            == len(table.text_ids)
+        ):
+            raise ValueError("columns differ in length")
+        return table
+
+    def _intern(self, text: str) -> int:
+        idx = self._pool_index.get(text)
+        if idx is None:
+            idx = self._pool_index[text] = len(self.pool)
+            self.pool.append(text)
+        return idx
+
+    def append(self, start: float, end: float, text: str) -> None:
+        self.starts.append(start)
+        self.ends.append(end)
+        self.text_ids.append(self._intern(str(text).strip()))
+
+    def extend(
+        self, segments: Iterable[Mapping], offset: float = 0.0
+    ) -> None:
+        for seg in segments:
+            self.append(
+                offset + float(seg.get("start", 0.0)),
+                offset + float(seg.get("end", 0.0)),
+                seg.get("text", ""),
+            )
+
+    def texts(self, lo: int = 0, hi: int | None = None) -> list[str]:
+        pool = self.pool
+        return [pool[i] for i in self.text_ids[lo:hi]]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, row: int) -> Cue:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return Cue(self, row)
+
+    def __iter__(self) -> Iterator[Cue]:
+        return (Cue(self, row) for row in range(len(self)))
+
+    def __repr__(self) -> str:
+        return f"<CueTable {len(self)} cues, {len(self.pool)} texts>"
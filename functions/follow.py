@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import subprocess
+
+from functions.cues import CueTable
+from functions.write import open_writers, output_sinks
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2  # s16le mono
+
+# Segments ending closer than this to the end of a window may still be
+# cut mid-word, so they are re-decoded together with the next window.
+EDGE_GUARD = 1.0
+
+
+def pcm_command(source: str, idle_timeout: float = 30.0) -> list[str]:
+    """ffmpeg command that decodes ``source`` to 16 kHz mono PCM on stdout.
+
+    Regular files are read with ``-follow 1`` so ffmpeg keeps polling the
+    end of a file that is still being recorded; it gives up once no new
+    data has arrived for ``idle_timeout`` seconds. ``-`` reads stdin.
+    """
+    cmd = ["ffmpeg", "-v", "error"]
+    if source == "-":
+        cmd += ["-i", "pipe:0"]
+    else:
+        cmd += [
+            "-follow",
+            "1",
+            "-rw_timeout",
+            str(int(idle_timeout * 1_000_000)),
+            "-i",
+            "file:" + source,
+        ]
+    cmd += [
+        "-vn",
+        "-ac",
+        "1",
+        "-ar",
+        str(SAMPLE_RATE),
+        "-f",
+        "s16le",
+        "pipe:1",
+    ]
+    return cmd
+
+
+def read_exact(stream, nbytes: int) -> bytes:
+    """Read ``nbytes`` unless the stream ends first."""
+    buf = bytearray()
+    while len(buf) < nbytes:
+        chunk = stream.read(nbytes - len(buf))
+        if not chunk:
+            break
+        buf += chunk
+    return bytes(buf)
+
+
+def split_final(
+    segments: list[dict],
+    duration: float,
+    eof: bool,
+    max_carry: float,
+) -> tuple[list[dict], float]:
+    """Split a window's segments into finalized ones and a carry-over.
+
+    Returns ``(final, carry_from)``: audio from ``carry_from`` seconds on
+    is decoded again with the next window. At end of input everything is
+    final. A trailing segment is only held back while that keeps the
+    carried audio under ``max_carry`` seconds, which bounds latency.
+    """
+    if eof:
+        return segments, duration
+    if not segments:
+        return [], max(0.0, duration - EDGE_GUARD)
+
+    last = segments[-1]
+    if float(last.get("end", 0.0)) < duration - EDGE_GUARD:
+        return segments, max(0.0, duration - EDGE_GUARD)
+
+    start = float(last.get("start", 0.0))
+    if duration - start <= max_carry:
+        return segments[:-1], start
+    return segments, duration
+
+
+def transcribe_stream(
+    stream,
+    model_instance,
+    language: str,
+    output: str,
+    clean: bool = False,
+    window: float = 6.0,
+    fmt: str = "srt",
+) -> str:
+    """Transcribe a PCM stream in rolling windows, appending cues as we go.
+
+    Every finalized cue is flushed to ``output`` right away, so a cue
+    appears at most about 1.5 × ``window`` seconds (plus decode time)
+    after its audio arrived.
+    """
+    import numpy as np
+
+    chunk_bytes = int(window * SAMPLE_RATE) * BYTES_PER_SAMPLE
+    max_carry = window / 2
+    pending = np.zeros(0, dtype=np.float32)
+    offset = 0.0  # absolute time of pending[0]
+
+    with open_writers(output_sinks(output, fmt, clean)) as writer:
+        writer.begin()
+        while True:
+            data = read_exact(stream, chunk_bytes)
+            eof = len(data) < chunk_bytes
+            usable = len(data) - len(data) % BYTES_PER_SAMPLE
+            new = (
+                np.frombuffer(data[:usable], dtype=np.int16).astype(
+                    np.float32
+                )
+                / 32768.0
+            )
+            audio = np.concatenate([pending, new])
+            duration = len(audio) / SAMPLE_RATE
+
+            segments = []
+            if len(audio):
+                result = model_instance.transcribe(
+                    audio, language=language
+                )
+                segments = list(result.get("segments", []))
+
+            final, carry_from = split_final(
+                segments, duration, eof, max_carry
+            )
+            writer.write_table(CueTable.from_segments(final, offset))
+            writer.flush()
+            for w in writer.writers:
+                w.f.flush()
+
+            if eof:
+                break
+            cut = int(carry_from * SAMPLE_RATE)
+            pending = audio[cut:]
+            offset += cut / SAMPLE_RATE
+        writer.end()
+    return output
+
+
+def follow_transcribe(
+    source: str,
+    model_instance,
+    language: str,
+    output: str,
+    clean: bool = False,
+    window: float = 6.0,
+    idle_timeout: float = 30.0,
+    fmt: str = "srt",
+) -> str:
+    """Tail a growing recording (or ``-`` for stdin) and transcribe it."""
+    proc = subprocess.Popen(
+        pcm_command(source, idle_timeout),
+        stdin=None if source == "-" else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+    )
+    try:
+        transcribe_stream(
+            proc.stdout,
+            model_instance,
+            language,
+            output,
+            clean,
+            window,
+            fmt,
+        )
+    finally:
+        proc.stdout.close()
+        proc.wait()
+    return output
@@ -0,0 +1,646 @@
+from __future__ import annotations
+
+import html
+import json
+import re
+from functools import partial
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+import click
+
+from functions.cues import CueTable
+from functions.srt import parse_srt
+
+# --------------------------------- ASS/SSA ---------------------------------
+ASS_TIME_RE = re.compile(r"(\d+):(\d{2}):(\d{2})[.:](\d{1,3})")
+OVERRIDE_RE = re.compile(r"\{([^}]*)\}")
+TAG_RE = re.compile(
+    r"\\(?:(?P<flag>[ibu])(?P<on>\d+)"
+    r"|(?P<c>1?c)(?:&H(?P<color>[0-9A-Fa-f]+)&?|(?![a-z]))"
+    r"|p(?P<draw>\d+)"
+    r"|(?P<reset>r)(?![a-z]))"
+)
+
+# Order in which tags are opened; closing happens in reverse.
+STYLE_TAGS = ("b", "i", "u", "font")
+
+
+def _ass_seconds(stamp: str) -> float:
+    m = ASS_TIME_RE.match(stamp.strip())
+    if not m:
+        raise ValueError("bad ASS timestamp: " + stamp)
+    h, mi, s, frac = m.groups()
+    return (
+        int(h) * 3600
+        + int(mi) * 60
+        + int(s)
+        + int(frac) / 10 ** len(frac)
+    )
+
+
+def _ass_color(value: str) -> str:
+    """ASS colours are &HAABBGGRR; SRT wants #RRGGBB."""
+    value = value.rjust(6, "0")[-6:]
+    return "#" + value[4:6] + value[2:4] + value[0:2]
+
+
+def _open_tag(tag: str, state: dict) -> str:
+    if tag == "font":
+        return f'<font color="{state["font"]}">'
+    return f"<{tag}>"
+
+
+class _Styler:
+    """Turn a run of ASS override blocks into balanced SRT markup."""
+
+    def __init__(self, base: dict):
+        self.base = dict(base)
+        self.state = dict(base)
+        self.open: list[str] = []
+        self.out: list[str] = []
+
+    def _sync(self) -> None:
+        wanted = [t for t in STYLE_TAGS if self.state.get(t)]
+        # keep the longest prefix of open tags that is still wanted
+        keep = 0
+        while (
+            keep < len(self.open)
+            and keep < len(wanted)
+            and self.open[keep] == wanted[keep]
+            and self.open[keep] != "font"
+        ):
+            keep += 1
+        for tag in reversed(self.open[keep:]):
+            self.out.append(f"</{tag}>")
+        self.open = self.open[:keep]
+        for tag in wanted[keep:]:
+            self.out.append(_open_tag(tag, self.state))
+            self.open.append(tag)
+
+    def text(self, run: str) -> None:
+        if not run or self.state.get("draw"):
+            return
+        self._sync()
+        self.out.append(run)
+
+    def override(self, block: str) -> None:
+        for m in TAG_RE.finditer(block):
+            if m.group("flag"):
+                on = m.group("on") != "0"
+                self.state[m.group("flag")] = on
+            elif m.group("c"):
+                if m.group("color"):
+                    self.state["font"] = _ass_color(m.group("color"))
+                else:  # bare \c: back to the style's colour
+                    self.state["font"] = self.base.get("font")
+            elif m.group("draw") is not None:
+                self.state["draw"] = m.group("draw") != "0"
+            elif m.group("reset"):
+                self.state = dict(self.base)
+
+    def result(self) -> str:
+        for tag in reversed(self.open):
+            self.out.append(f"</{tag}>")
+        self.open = []
+        return "".join(self.out)
+
+
+def ass_text_to_srt(text: str, style: dict | None = None) -> str:
+    """Convert ASS dialogue text to SRT markup.
+
+    Bold, italic, underline and primary colour (from the style and from
+    override tags) become ``<b>``, ``<i>``, ``<u>`` and ``<font color>``.
+    Positioning, karaoke and other effects are dropped, and vector
+    drawings (``\\p1``) are skipped entirely.
+    """
+    styler = _Styler(style or {})
+    pos = 0
+    for m in OVERRIDE_RE.finditer(text):
+        styler.text(text[pos : m.start()])  # noqa: E203
+        styler.override(m.group(1))
+        pos = m.end()
+    styler.text(text[pos:])
+    out = styler.result()
+    out = (
+        out.replace("\\N", "\n")
+        .replace("\\n", "\n")
+        .replace("\\h", " ")
+    )
+    return "\n".join(line.strip() for line in out.split("\n")).strip()
+
+
+def _style_from_fields(fields: dict) -> dict:
+    def flag(name: str) -> bool:
+        return fields.get(name, "0").strip() not in ("0", "")
+
+    style = {
+        "b": flag("bold"),
+        "i": flag("italic"),
+        "u": flag("underline"),
+    }
+    colour = fields.get("primarycolour", "").strip()
+    if colour.upper().startswith("&H"):
+        rgb = _ass_color(colour[2:].rstrip("&"))
+        if rgb.upper() != "#FFFFFF":
+            style["font"] = rgb
+    return style
+
+
+def read_ass(lines: Iterable[str]) -> Iterator[dict]:
+    """Stream an ASS/SSA script into segments, keeping basic styling."""
+    section = ""
+    style_format: list[str] = []
+    event_format: list[str] = []
+    styles: dict[str, dict] = {}
+    for raw in lines:
+        line = raw.strip().lstrip("\ufeff")
+        if not line or line.startswith(";"):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            section = line.lower()
+            continue
+        key, _, value = line.partition(":")
+        key = key.strip().lower()
+        if key == "format":
+            names = [f.strip().lower() for f in value.split(",")]
+            if "styles" in section:
+                style_format = names
+            elif "events" in section:
+                event_format = names
+        elif key == "style" and style_format:
+            parts = value.split(",", len(style_format) - 1)
+            fields = dict(zip(style_format, (p.strip() for p in parts)))
+            styles[fields.get("name", "")] = _style_from_fields(fields)
+        elif key == "dialogue":
+            fmt = event_format or [
+                "layer",
+                "start",
+                "end",
+                "style",
+                "name",
+                "marginl",
+                "marginr",
+                "marginv",
+                "effect",
+                "text",
+            ]
+            parts = value.lstrip().split(",", len(fmt) - 1)
+            if len(parts) < len(fmt):
+                continue
+            fields = dict(zip(fmt, parts))
+            style = styles.get(
+                fields.get("style", "").strip().lstrip("*")
+            )
+            text = ass_text_to_srt(fields["text"], style)
+            if not text:
+                continue  # drawings, empty sign lines
+            yield {
+                "start": _ass_seconds(fields["start"]),
+                "end": _ass_seconds(fields["end"]),
+                "text": text,
+            }
+
+
+# ---------------------------------- WebVTT ---------------------------------
+VTT_TIMING_RE = re.compile(
+    r"((?:\d+:)?\d{2}:\d{2}\.\d{3})\s+-->\s+((?:\d+:)?\d{2}:\d{2}\.\d{3})"
+)
+VTT_KEEP_RE = re.compile(r"</?[ibu]>")
+VTT_TAG_RE = re.compile(r"<[^>]*>")
+
+
+def _vtt_seconds(stamp: str) -> float:
+    parts = stamp.split(":")
+    secs = float(parts[-1])
+    mins = int(parts[-2])
+    hours = int(parts[-3]) if len(parts) == 3 else 0
+    return hours * 3600 + mins * 60 + secs
+
+
+def vtt_text_to_srt(text: str) -> str:
+    """Keep ``<i>``, ``<b>``, ``<u>``; drop classes, voices and ruby."""
+    kept: list[str] = []
+    pos = 0
+    for m in VTT_TAG_RE.finditer(text):
+        kept.append(text[pos : m.start()])  # noqa: E203
+        if VTT_KEEP_RE.fullmatch(m.group(0)):
+            kept.append(m.group(0))
+        pos = m.end()
+    kept.append(text[pos:])
+    return html.unescape("".join(kept)).replace("\xa0", " ")
+
+
+def read_vtt(lines: Iterable[str]) -> Iterator[dict]:
+    """Stream WebVTT into segments; NOTE/STYLE/REGION blocks are skipped."""
+    seg: dict | None = None
+    text: list[str] = []
+    skipping = True  # the WEBVTT header block
+    for raw in lines:
+        line = raw.rstrip("\r\n").lstrip("\ufeff")
+        if not line.strip():
+            if seg is not None:
+                seg["text"] = vtt_text_to_srt("\n".join(text)).strip()
+                yield seg
+            seg, text, skipping = None, [], False
+            continue
+        if seg is not None:
+            text.append(line.strip())
+            continue
+        if skipping:
+            continue
+        m = VTT_TIMING_RE.search(line) if "-->" in line else None
+        if m:
+            seg = {
+                "start": _vtt_seconds(m.group(1)),
+                "end": _vtt_seconds(m.group(2)),
+            }
+            text = []
+        elif line.startswith(("NOTE", "STYLE", "REGION")):
+            skipping = True
+        # anything else is a cue identifier
+    if seg is not None:
+        seg["text"] = vtt_text_to_srt("\n".join(text)).strip()
+        yield seg
+
+
+# ----------------------------------- JSON ----------------------------------
+def _chunks(src) -> Iterator[str]:
+    if hasattr(src, "read"):
+        return iter(partial(src.read, 1 << 16), "")
+    return iter(src)
+
+
+def _segment(obj: dict) -> dict:
+    return {
+        "start": float(obj.get("start", 0.0)),
+        "end": float(obj.get("end", 0.0)),
+        "text": str(obj.get("text", "")).strip(),
+    }
+
+
+def read_json(src) -> Iterator[dict]:
+    """Stream a JSON array of segments, one object at a time.
+
+    ``src`` is a text handle or an iterable of chunks. A Whisper-style
+    ``{"segments": [...]}`` document is loaded whole.
+    """
+    decoder = json.JSONDecoder()
+    chunks = _chunks(src)
+    buf, pos, started = "", 0, False
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,\ufeff":
+            pos += 1
+        if pos == len(buf):
+            chunk = next(chunks, None)
+            if chunk is None:
+                return
+            buf, pos = chunk, 0
+            continue
+        if not started:
+            if buf[pos] == "{":
+                doc = json.loads(buf[pos:] + "".join(chunks))
+                yield from map(_segment, doc.get("segments", []))
+                return
+            if buf[pos] != "[":
+                raise ValueError("expected a JSON array of segments")
+            started, pos = True, pos + 1
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            obj, pos = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        yield _segment(obj)
+
+
+READERS = {
+    "srt": parse_srt,
+    "ass": read_ass,
+    "ssa": read_ass,
+    "vtt": read_vtt,
+    "json": read_json,
+}
+
+
+# ---------------------------------- writers --------------------------------
+BATCH = 4096  # cues rendered per write() call
+
+# Every "MM:SS" and millisecond suffix, so a timestamp is two divmods
+# and a few list lookups instead of three format calls.
+_HH = [f"{h:02}" for h in range(100)]
+_MMSS = [f"{m:02}:{s:02}" for m in range(60) for s in range(60)]
+_MS = [f"{ms:03}" for ms in range(1000)]
+
+
+def _split_times(values: Sequence[float]) -> tuple[list, list, list]:
+    """Hours, seconds into the hour and milliseconds of each time.
+
+    Rounds like ``format_timestamp``; negative times clamp to zero.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        total = [max(0, int(round(v * 1000))) for v in values]
+        secs = [t // 1000 for t in total]
+        return (
+            [t // 3600 for t in secs],
+            [t % 3600 for t in secs],
+            [t % 1000 for t in total],
+        )
+    total = np.rint(np.asarray(values, dtype=float) * 1000)
+    total = np.maximum(total, 0).astype(np.int64)
+    secs, ms = np.divmod(total, 1000)
+    hours, secs = np.divmod(secs, 3600)
+    return hours.tolist(), secs.tolist(), ms.tolist()
+
+
+def timestamps(values: Sequence[float], sep: str = ",") -> list[str]:
+    """``HH:MM:SS,mmm`` for a whole batch of times at once."""
+    return [
+        f"{_HH[h] if h < 100 else h}:{_MMSS[s]}{sep}{_MS[ms]}"
+        for h, s, ms in zip(*_split_times(values))
+    ]
+
+
+def _fields(seg: dict) -> tuple[float, float, str]:
+    return (
+        float(seg.get("start", 0.0)),
+        float(seg.get("end", 0.0)),
+        str(seg.get("text", "")).strip(),
+    )
+
+
+class SubtitleWriter:
+    """Streams segments into an open text handle.
+
+    ``begin`` and ``end`` write whatever frames the document (headers,
+    brackets); ``write`` adds a cue and ``write_table`` a whole
+    ``CueTable``. Cues are rendered from start/end/text columns and
+    written in batches of ``BATCH``; ``flush`` pushes out a partial
+    batch.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+        self._pending: list[dict] = []
+
+    def begin(self) -> None:
+        pass
+
+    def write(self, seg: dict) -> None:
+        self._pending.append(seg)
+        if len(self._pending) >= BATCH:
+            self.flush()
+
+    def write_table(self, table: CueTable) -> None:
+        """Write every cue of ``table`` straight from its columns."""
+        self.flush()
+        for lo in range(0, len(table), BATCH):
+            hi = lo + BATCH
+            self._emit(
+                table.starts[lo:hi],
+                table.ends[lo:hi],
+                table.texts(lo, hi),
+            )
+
+    def flush(self) -> None:
+        if self._pending:
+            starts, ends, texts = zip(*map(_fields, self._pending))
+            self._pending = []
+            self._emit(starts, ends, list(texts))
+
+    def _emit(self, starts, ends, texts: list[str]) -> None:
+        self.f.write(self.render(starts, ends, texts, self.count + 1))
+        self.count += len(texts)
+
+    def render(self, starts, ends, texts: list[str], first: int) -> str:
+        return "".join(
+            self.cue(idx, start, end, text)
+            for idx, start, end, text in zip(
+                range(first, first + len(texts)), starts, ends, texts
+            )
+        )
+
+    def cue(self, idx: int, start: float, end: float, text: str) -> str:
+        raise NotImplementedError
+
+    def end(self) -> None:
+        self.flush()
+
+
+class SrtWriter(SubtitleWriter):
+    stamp_sep = ","
+
+    def render(self, starts, ends, texts, first):
+        return self.join(
+            first,
+            timestamps(starts, self.stamp_sep),
+            timestamps(ends, self.stamp_sep),
+            texts,
+        )
+
+    def join(self, first, starts, ends, texts) -> str:
+        return "".join(
+            [
+                f"{idx}\n{a} --> {b}\n{text}\n\n"
+                for idx, a, b, text in zip(
+                    range(first, first + len(texts)),
+                    starts,
+                    ends,
+                    texts,
+                )
+            ]
+        )
+
+
+class TxtWriter(SubtitleWriter):
+    """Dialogue only: no numbering, timings or blank lines."""
+
+    def cue(self, idx, start, end, text):
+        return text + "\n" if text else ""
+
+
+FONT_TAG_RE = re.compile(r"</?font\b[^>]*>", re.I)
+LONE_LT_RE = re.compile(r"<(?!/?[ibu]>)")
+
+
+def _vtt_text(text: str) -> str:
+    text = FONT_TAG_RE.sub("", text).replace("&", "&amp;")
+    return LONE_LT_RE.sub("&lt;", text).replace("-->", "->")
+
+
+class VttWriter(SrtWriter):
+    stamp_sep = "."
+
+    def begin(self):
+        self.f.write("WEBVTT\n\n")
+
+    def join(self, first, starts, ends, texts):
+        return "".join(
+            [
+                f"{a} --> {b}\n{_vtt_text(text)}\n\n"
+                for a, b, text in zip(starts, ends, texts)
+            ]
+        )
+
+
+ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+WrapStyle: 0
+ScaledBorderAndShadow: yes
+PlayResX: 384
+PlayResY: 288
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, \
+OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, \
+ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, \
+MarginL, MarginR, MarginV, Encoding
+Style: Default,Arial,16,&H00FFFFFF,&H000000FF,&H00000000,&H80000000,\
+0,0,0,0,100,100,0,0,1,1,0,2,10,10,10,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, \
+Effect, Text
+"""
+SRT_TAG_RE = re.compile(
+    r"<(/?)(i|b|u|font)\b(?:[^>]*?color=\"?#?([0-9A-Fa-f]{6})\"?)?[^>]*>",
+    re.I,
+)
+
+
+def _ass_stamp(seconds: float) -> str:
+    cs = int(round(seconds * 100))
+    h, rem = divmod(cs, 360_000)
+    m, rem = divmod(rem, 6000)
+    s, cs = divmod(rem, 100)
+    return f"{h}:{m:02}:{s:02}.{cs:02}"
+
+
+def _ass_override(m: re.Match) -> str:
+    close, name, color = m.group(1), m.group(2).lower(), m.group(3)
+    if name != "font":
+        return "{\\" + name + ("0" if close else "1") + "}"
+    if close:
+        return "{\\c}"
+    if not color:
+        return ""
+    return "{\\c&H" + color[4:6] + color[2:4] + color[0:2] + "&}"
+
+
+class AssWriter(SubtitleWriter):
+    def begin(self):
+        self.f.write(ASS_HEADER)
+
+    def cue(self, idx, start, end, text):
+        text = SRT_TAG_RE.sub(_ass_override, text).replace("\n", "\\N")
+        return (
+            f"Dialogue: 0,{_ass_stamp(start)},{_ass_stamp(end)},"
+            f"Default,,0,0,0,,{text}\n"
+        )
+
+
+class JsonWriter(SubtitleWriter):
+    """A JSON array with one segment object per line."""
+
+    def begin(self):
+        self.f.write("[")
+
+    def cue(self, idx, start, end, text):
+        seg = {
+            "start": round(start, 3),
+            "end": round(end, 3),
+            "text": text,
+        }
+        return ("\n" if idx == 1 else ",\n") + json.dumps(
+            seg, ensure_ascii=False
+        )
+
+    def end(self):
+        self.flush()
+        self.f.write("\n]\n")
+
+
+WRITERS = {
+    "srt": SrtWriter,
+    "vtt": VttWriter,
+    "ass": AssWriter,
+    "json": JsonWriter,
+    "txt": TxtWriter,
+}
+
+
+class MultiWriter(SubtitleWriter):
+    """Fans one stream of cues out to several writers.
+
+    Each batch is split into start/end/text columns once and handed to
+    every writer, so writing an SRT and a TXT costs one pass over the
+    cues, not one per file.
+    """
+
+    def __init__(self, writers: list[SubtitleWriter]):
+        super().__init__(None)
+        self.writers = writers
+
+    def begin(self) -> None:
+        for w in self.writers:
+            w.begin()
+
+    def _emit(self, starts, ends, texts: list[str]) -> None:
+        for w in self.writers:
+            w._emit(starts, ends, texts)
+        self.count += len(texts)
+
+    def end(self) -> None:
+        self.flush()
+        for w in self.writers:
+            w.end()
+
+
+# What --format accepts; plain text stays behind --clean.
+FORMAT_NAMES = ("srt", "vtt", "ass", "json")
+SUFFIXES = {
+    ".srt": "srt",
+    ".vtt": "vtt",
+    ".ass": "ass",
+    ".ssa": "ass",
+    ".json": "json",
+}
+
+
+def detect_format(
+    path: str, fmt: str | None = None, default: str = "srt"
+) -> str:
+    """``fmt`` if given, else the format implied by ``path``'s suffix."""
+    if fmt:
+        return fmt
+    return SUFFIXES.get(Path(path).suffix.lower(), default)
+
+
+def read_segments(path: str, fmt: str | None = None) -> Iterator[dict]:
+    """Stream segments from a subtitle file (``-`` reads stdin)."""
+    reader = READERS[detect_format(path, fmt)]
+    with click.open_file(path, encoding="utf-8") as src:
+        yield from reader(src)
+
+
+def write_cues(
+    segments: Iterable[dict] | CueTable, f, fmt: str = "srt"
+) -> int:
+    """Write ``segments`` to an open handle; return the cue count."""
+    writer = WRITERS[fmt](f)
+    writer.begin()
+    if isinstance(segments, CueTable):
+        writer.write_table(segments)
+    else:
+        for seg in segments:
+            writer.write(seg)
+    writer.end()
+    return writer.count
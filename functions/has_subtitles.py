@@ -1,38 +1,16 @@
-import json
-import subprocess
+from __future__ import annotations
 
-from functions.i18n import _
+from functions.probe import MediaInfo, probe_media
 
-FFPROBE = "ffprobe"
 
+def has_subtitles(
+    ctx, file_path: str, info: MediaInfo | None = None
+) -> bool:
+    """True if the file carries at least one subtitle stream.
 
-def has_subtitles(ctx, file_path: str) -> bool:
-    try:
-        proc = subprocess.run(
-            [
-                "ffprobe",
-                "-v",
-                "error",
-                "-of",
-                "json",
-                "-show_streams",
-                file_path,
-            ],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        if not proc.stdout.strip():
-            if proc.stderr:
-                print("⚠️ ffprobe stderr: " + proc.stderr.strip())
-            return False
-
-        data = json.loads(proc.stdout)
-        streams = data.get("streams", [])
-        return any(s.get("codec_type") == "subtitle" for s in streams)
-    except FileNotFoundError:
-        print("⚠️ {ffprobe}" + _(" not found in PATH"))
-        return False
-    except Exception as e:
-        print("⚠️ ffprobe error: " + str(e))
-        return False
+    Pass the ``MediaInfo`` from an earlier ``probe_media`` call to avoid
+    probing the file again.
+    """
+    if info is None:
+        info = probe_media(file_path)
+    return info.has_subtitles
@@ -2,17 +2,23 @@ from __future__ import annotations
 
 import gettext
 import os
+from functools import lru_cache
+from typing import Callable
+
+LOCALEDIR = os.path.join(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+    "locales",
+)
 
 _trans: gettext.NullTranslations | gettext.GNUTranslations | None = None
 
 
-def set_language(lang: str = "en") -> None:
-    global _trans
-    localedir = os.path.join(
-        os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
-        "locales",
-    )
-    _trans = gettext.translation(
+@lru_cache(maxsize=None)
+def catalog(
+    lang: str, localedir: str = LOCALEDIR
+) -> gettext.NullTranslations:
+    """The catalog for ``lang``, read from disk once per process."""
+    return gettext.translation(
         domain="messages",
         localedir=localedir,
         languages=[lang],
@@ -20,7 +26,71 @@ def set_language(lang: str = "en") -> None:
     )
 
 
+def set_language(lang: str = "en") -> None:
+    global _trans
+    _trans = catalog(lang, LOCALEDIR)
+
+
 def _(msg: str) -> str:
     if _trans is None:
         set_language("en")
     return _trans.gettext(msg) if _trans else msg
+
+
+class LazyString:
+    """Text that is translated each time it is used as a string.
+
+    Help strings are built when the decorators run, at import, before
+    ``--lang`` is parsed; a ``LazyString`` defers the lookup until click
+    renders the help. ``+`` with plain strings stays lazy.
+    """
+
+    __slots__ = ("_render",)
+
+    def __init__(self, render: Callable[[], str]):
+        self._render = render
+
+    def __str__(self) -> str:
+        return self._render()
+
+    def __getattr__(self, name: str):
+        # str methods (split, find, expandtabs...) on the current text
+        return getattr(str(self), name)
+
+    def __add__(self, other) -> LazyString:
+        return LazyString(lambda: str(self) + str(other))
+
+    def __radd__(self, other) -> LazyString:
+        return LazyString(lambda: str(other) + str(self))
+
+    def __mod__(self, args) -> str:
+        return str(self) % args
+
+    def __eq__(self, other) -> bool:
+        return str(self) == str(other)
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __len__(self) -> int:
+        return len(str(self))
+
+    def __bool__(self) -> bool:
+        return bool(str(self))
+
+    def __contains__(self, item: str) -> bool:
+        return item in str(self)
+
+    def __iter__(self):
+        return iter(str(self))
+
+    def __getitem__(self, key):
+        return str(self)[key]
+
+    def __repr__(self) -> str:
+        return f"LazyString({str(self)!r})"
+
+
+def _l(msg: str) -> LazyString:
+    """``_`` for strings evaluated at import, such as help texts."""
+    return LazyString(lambda: _(msg))
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable
+
+from functions.bitmap_subs import (
+    EVENT_PARSERS,
+    PAD,
+    Bitmap,
+    Event,
+    demux_packets,
+    display_cues,
+    render,
+    stream_extradata,
+)
+from functions.probe import SubtitleStream
+
+# Cues closer than this with the same image/text are one cue.
+MERGE_GAP = 0.1
+
+# Containers tag tracks with ISO 639-2/B; tesseract names its models
+# with the /T codes (and splits Chinese by script).
+TESSERACT_LANGS = {
+    "alb": "sqi",
+    "arm": "hye",
+    "baq": "eus",
+    "bur": "mya",
+    "chi": "chi_sim",
+    "cze": "ces",
+    "dut": "nld",
+    "fre": "fra",
+    "geo": "kat",
+    "ger": "deu",
+    "gre": "ell",
+    "ice": "isl",
+    "mac": "mkd",
+    "may": "msa",
+    "per": "fas",
+    "rum": "ron",
+    "slo": "slk",
+    "tib": "bod",
+    "wel": "cym",
+}
+
+
+def ocr_available() -> bool:
+    """pytesseract, Pillow and the tesseract binary are all present."""
+    try:
+        import pytesseract
+        from PIL import Image  # noqa: F401
+
+        pytesseract.get_tesseract_version()
+    except Exception:
+        return False
+    return True
+
+
+def tesseract_lang(
+    language: str, installed: Iterable[str] | None = None
+) -> str:
+    """Tesseract model for a track language; ``eng`` if not installed."""
+    code = TESSERACT_LANGS.get(language, language)
+    if installed is None:
+        try:
+            import pytesseract
+
+            installed = pytesseract.get_languages(config="")
+        except Exception:
+            installed = ()
+    return code if code in set(installed) else "eng"
+
+
+def ocr_bitmap(bitmap: Bitmap, lang: str = "eng") -> str:
+    """Render one bitmap and OCR it; runs in the worker processes."""
+    import pytesseract
+    from PIL import Image
+
+    rendered = render(bitmap)
+    if rendered is None:
+        return ""
+    width, height, pixels = rendered
+    image = Image.frombytes("L", (width, height), pixels)
+    if height - 2 * PAD < 40:  # small DVD glyphs OCR better upscaled
+        image = image.resize((width * 2, height * 2))
+    text = pytesseract.image_to_string(
+        image, lang=lang, config="--psm 6"
+    )
+    return "\n".join(
+        " ".join(line.split())
+        for line in text.splitlines()
+        if line.strip()
+    )
+
+
+def ocr_segments(
+    events: Iterable[Event],
+    lang: str = "eng",
+    jobs: int | None = None,
+    recognize: Callable[[Bitmap, str], str] = ocr_bitmap,
+) -> list[dict]:
+    """OCR display events into segments.
+
+    Identical bitmaps are recognized once, however often they are shown,
+    and back-to-back cues showing the same image or text are merged.
+    The unique bitmaps are spread over ``jobs`` processes (default: one
+    per CPU).
+    """
+    cues: list[list] = []
+    for start, end, bitmaps in display_cues(events):
+        key = tuple(sorted(bitmaps, key=lambda b: (b.y, b.x)))
+        if (
+            cues
+            and cues[-1][2] == key
+            and start - cues[-1][1] <= MERGE_GAP
+        ):
+            cues[-1][1] = end
+        else:
+            cues.append([start, end, key])
+
+    unique = list(dict.fromkeys(b for cue in cues for b in cue[2]))
+    jobs = min(jobs or os.cpu_count() or 1, len(unique))
+    if jobs <= 1:
+        texts = [recognize(b, lang) for b in unique]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            texts = list(
+                pool.map(
+                    recognize,
+                    unique,
+                    [lang] * len(unique),
+                    chunksize=max(1, len(unique) // (jobs * 4)),
+                )
+            )
+    recognized = dict(zip(unique, texts))
+
+    segments: list[dict] = []
+    for start, end, key in cues:
+        text = "\n".join(t for t in (recognized[b] for b in key) if t)
+        if not text:
+            continue
+        last = segments[-1] if segments else None
+        if (
+            last
+            and last["text"] == text
+            and start - last["end"] <= MERGE_GAP
+        ):
+            last["end"] = end
+        else:
+            segments.append({"start": start, "end": end, "text": text})
+    return segments
+
+
+def ocr_subtitles(
+    video_path: str, track: SubtitleStream, jobs: int | None = None
+) -> list[dict]:
+    """Demux a PGS/VobSub/DVB track and OCR it into timed segments.
+
+    Raises ``CalledProcessError`` if ffprobe could not read the track.
+    """
+    extradata = (
+        stream_extradata(video_path, track.sub_index)
+        if track.codec == "dvd_subtitle"
+        else b""
+    )
+    events = EVENT_PARSERS[track.codec](
+        demux_packets(video_path, track.sub_index), extradata
+    )
+    return ocr_segments(events, tesseract_lang(track.language), jobs)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import subprocess
+import tempfile
+from typing import Iterable, Iterator
+
+from functions.formats import READERS
+from functions.srt import parse_srt
+
+# Text codecs that can be stream-copied and parsed in-process:
+# codec -> (ffmpeg muxer, reader in functions.formats). mov_text has no
+# text muxer outside the MP4 family, so it keeps the transcode path.
+COPY_FORMATS = {
+    "subrip": ("srt", "srt"),
+    "ass": ("ass", "ass"),
+    "ssa": ("ass", "ass"),
+    "webvtt": ("webvtt", "vtt"),
+}
+
+
+def can_copy(codec: str) -> bool:
+    return codec in COPY_FORMATS
+
+
+def subtitle_stream_command(
+    video_path: str, sub_index: int = 0, codec: str = ""
+) -> list[str]:
+    """ffmpeg command that writes one subtitle track to stdout.
+
+    Text codecs listed in ``COPY_FORMATS`` are stream-copied (no decode,
+    no re-encode, other streams skipped); anything else is transcoded
+    to SRT by ffmpeg.
+    """
+    if can_copy(codec):
+        muxer = COPY_FORMATS[codec][0]
+        return [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-nostdin",
+            "-i",
+            video_path,
+            "-map",
+            f"0:s:{sub_index}",
+            "-vn",
+            "-an",
+            "-dn",
+            "-c:s",
+            "copy",
+            "-f",
+            muxer,
+            "pipe:1",
+        ]
+    return [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-nostdin",
+        "-i",
+        video_path,
+        "-map",
+        f"0:s:{sub_index}",
+        "-c:s",
+        "srt",
+        "-f",
+        "srt",
+        "pipe:1",
+    ]
+
+
+def stream_subtitles(
+    video_path: str, sub_index: int = 0, codec: str = ""
+) -> Iterator[dict]:
+    """Yield segments straight from an ffmpeg pipe.
+
+    No subtitle data is written to disk. Raises ``CalledProcessError``
+    (with ffmpeg's messages as ``stderr``) once the stream ends if
+    ffmpeg failed.
+    """
+    cmd = subtitle_stream_command(video_path, sub_index, codec)
+    reader = (
+        READERS[COPY_FORMATS[codec][1]]
+        if can_copy(codec)
+        else parse_srt
+    )
+    # stderr goes to a file, not a pipe nobody reads while stdout is
+    # being consumed: a chatty ffmpeg would fill it and block
+    with tempfile.TemporaryFile() as errors:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=errors,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+        try:
+            yield from reader(proc.stdout)
+        finally:
+            proc.stdout.close()
+            code = proc.wait()
+        if code:
+            errors.seek(0)
+            err = errors.read().decode("utf-8", "replace")
+            raise subprocess.CalledProcessError(code, cmd, stderr=err)
+
+
+def _is_text(line: str) -> bool:
+    s = line.strip()
+    return bool(s) and not s.isdigit() and "-->" not in s
+
+
+def translate_srt_lines(
+    lines: Iterable[str], translator
+) -> Iterator[str]:
+    """Translate dialogue lines, keep numbering, timings and blanks."""
+    for line in lines:
+        if _is_text(line):
+            yield translator.translate(line.strip()) + "\n"
+        else:
+            yield line
+
+
+def translate_segments(
+    segments: Iterable[dict], translator
+) -> Iterator[dict]:
+    """Translate each segment's text line by line, keeping its timing."""
+    for seg in segments:
+        text = str(seg.get("text", "")).strip()
+        if text:
+            text = "\n".join(
+                translator.translate(line) if line.strip() else line
+                for line in text.split("\n")
+            )
+        yield {**seg, "text": text}
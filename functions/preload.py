@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import subprocess
+import threading
+from typing import Any, Callable
+
+import numpy as np
+
+# Whisper's input: 16 kHz mono
+SAMPLE_RATE = 16000
+
+
+def decode_audio_command(path: str, sr: int = SAMPLE_RATE) -> list[str]:
+    """The ffmpeg command ``whisper.load_audio`` runs: raw 16-bit mono
+    PCM at ``sr`` Hz on stdout."""
+    return [
+        "ffmpeg",
+        "-nostdin",
+        "-threads",
+        "0",
+        "-i",
+        path,
+        "-f",
+        "s16le",
+        "-ac",
+        "1",
+        "-acodec",
+        "pcm_s16le",
+        "-ar",
+        str(sr),
+        "-",
+    ]
+
+
+class AudioDecoder:
+    """``whisper.load_audio`` in a child process that can be stopped.
+
+    Calling the decoder runs ffmpeg and returns the raw int16 samples,
+    half the size of Whisper's float32 while nobody may need them (see
+    ``to_float``); ``cancel()`` terminates ffmpeg, so an abandoned
+    decode stops using CPU and memory right away instead of finishing.
+    """
+
+    def __init__(self, path: str, sr: int = SAMPLE_RATE):
+        self.cmd = decode_audio_command(path, sr)
+        self._lock = threading.Lock()
+        self._proc: subprocess.Popen | None = None
+        self._cancelled = False
+
+    def __call__(self) -> np.ndarray:
+        with self._lock:
+            if self._cancelled:
+                raise RuntimeError("decode was cancelled")
+            self._proc = subprocess.Popen(
+                self.cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        out, _ = self._proc.communicate()
+        code = self._proc.returncode
+        if code:
+            raise subprocess.CalledProcessError(code, self.cmd)
+        return np.frombuffer(out, np.int16)
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._cancelled = True
+            if self._proc is not None and self._proc.poll() is None:
+                self._proc.terminate()
+
+
+def to_float(samples: np.ndarray) -> np.ndarray:
+    """int16 samples as the float32 in [-1, 1] Whisper takes."""
+    return samples.astype(np.float32) / 32768.0
+
+
+class BackgroundTask:
+    """Run ``fn(*args, **kwargs)`` speculatively on a daemon thread.
+
+    The result (or the exception raised) is handed back by ``result()``.
+    ``cancel()`` drops the result and, if ``fn`` has a ``cancel()``
+    method of its own, calls it to stop the work early; otherwise the
+    worker runs on until ``fn`` returns, but being a daemon thread it
+    never keeps the process alive.
+    """
+
+    def __init__(self, fn: Callable[..., Any], *args, **kwargs):
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+        self._done = threading.Event()
+        self._cancelled = False
+        self._value: Any = None
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "BackgroundTask":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        try:
+            value = self._fn(*self._args, **self._kwargs)
+            if not self._cancelled:
+                self._value = value
+        except BaseException as e:  # re-raised in the caller's thread
+            if not self._cancelled:
+                self._error = e
+        finally:
+            self._done.set()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        self._cancelled = True
+        self._value = None
+        self._error = None
+        stop = getattr(self._fn, "cancel", None)
+        if stop is not None:
+            stop()
+
+    def result(self, timeout: float | None = None) -> Any:
+        if self._cancelled:
+            raise RuntimeError("task was cancelled")
+        if not self._done.wait(timeout):
+            raise TimeoutError("background task still running")
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+class WhisperPreloader:
+    """Load the Whisper model and decode the audio in the background.
+
+    ``extract`` starts this before probing, so that when embedded
+    subtitles turn out to be missing (or unusable) both are ready or on
+    their way. ``cancel()`` once ffmpeg has extracted a track kills the
+    decode; the model load cannot be interrupted, so its thread is
+    abandoned: it finishes on its own, and the model it returns is
+    dropped instead of kept.
+    """
+
+    def __init__(
+        self,
+        load_model: Callable[[], Any],
+        load_audio: Callable[[], Any] | None = None,
+    ):
+        self.model = BackgroundTask(load_model)
+        self.audio = BackgroundTask(load_audio) if load_audio else None
+
+    def start(self) -> "WhisperPreloader":
+        self.model.start()
+        if self.audio is not None:
+            self.audio.start()
+        return self
+
+    def cancel(self) -> None:
+        self.model.cancel()
+        if self.audio is not None:
+            self.audio.cancel()
+
+    def get_model(self) -> Any:
+        return self.model.result()
+
+    def get_audio(self) -> Any:
+        """Decoded audio, or ``None`` if decoding was not possible."""
+        if self.audio is None:
+            return None
+        try:
+            return to_float(self.audio.result())
+        except Exception:
+            # Whisper will decode the file itself.
+            return None
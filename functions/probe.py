@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import subprocess
+from dataclasses import dataclass
+
+import click
+
+from functions.i18n import _
+from functions.probe_cache import default_cache
+
+FFPROBE = "ffprobe"
+
+# Only what the pipeline uses: container duration plus codec, language,
+# title and disposition of the subtitle streams.
+SHOW_ENTRIES = (
+    "format=duration"
+    ":stream=index,codec_name"
+    ":stream_tags=language,title"
+    ":stream_disposition=default,forced,hearing_impaired"
+)
+
+TEXT_CODECS = {
+    "subrip",
+    "srt",
+    "ass",
+    "ssa",
+    "webvtt",
+    "mov_text",
+    "text",
+}
+BITMAP_CODECS = {"hdmv_pgs_subtitle", "dvd_subtitle", "dvb_subtitle"}
+
+
+@dataclass(frozen=True)
+class SubtitleStream:
+    index: int  # absolute stream index in the container
+    sub_index: int  # position among subtitle streams (0:s:N)
+    codec: str = ""
+    language: str = "und"
+    title: str = ""
+    default: bool = False
+    forced: bool = False
+    hearing_impaired: bool = False
+
+    @property
+    def is_bitmap(self) -> bool:
+        return self.codec in BITMAP_CODECS
+
+    @property
+    def is_text(self) -> bool:
+        return self.codec in TEXT_CODECS
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    path: str
+    duration: float | None = None
+    subtitles: tuple[SubtitleStream, ...] = ()
+    ok: bool = False  # False when ffprobe could not read the file
+
+    @property
+    def has_subtitles(self) -> bool:
+        return bool(self.subtitles)
+
+    def default_subtitle(self) -> SubtitleStream | None:
+        """The stream a player would pick: flagged default, not forced."""
+        for s in self.subtitles:
+            if s.default and not s.forced:
+                return s
+        for s in self.subtitles:
+            if not s.forced:
+                return s
+        return self.subtitles[0] if self.subtitles else None
+
+
+def parse_probe(path: str, data: dict) -> MediaInfo:
+    streams = []
+    for pos, s in enumerate(data.get("streams", [])):
+        tags = s.get("tags", {})
+        disp = s.get("disposition", {})
+        streams.append(
+            SubtitleStream(
+                index=int(s.get("index", pos)),
+                sub_index=pos,
+                codec=s.get("codec_name", ""),
+                language=tags.get("language", "und"),
+                title=tags.get("title", ""),
+                default=bool(disp.get("default")),
+                forced=bool(disp.get("forced")),
+                hearing_impaired=bool(disp.get("hearing_impaired")),
+            )
+        )
+    try:
+        duration = float(data.get("format", {}).get("duration"))
+    except (TypeError, ValueError):
+        duration = None
+    return MediaInfo(path, duration, tuple(streams), ok=True)
+
+
+def ffprobe_json(path: str) -> dict | None:
+    """Raw ffprobe output for ``path``, or None if it could not run."""
+    try:
+        proc = subprocess.run(
+            [
+                FFPROBE,
+                "-v",
+                "error",
+                "-select_streams",
+                "s",
+                "-show_entries",
+                SHOW_ENTRIES,
+                "-of",
+                "json",
+                path,
+            ],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if not proc.stdout.strip():
+            if proc.stderr:
+                click.echo(
+                    "⚠️ ffprobe stderr: " + proc.stderr.strip(), err=True
+                )
+            return None
+        return json.loads(proc.stdout)
+    except FileNotFoundError:
+        click.echo("⚠️ " + FFPROBE + _(" not found in PATH"), err=True)
+        return None
+    except Exception as e:
+        click.echo("⚠️ ffprobe error: " + str(e), err=True)
+        return None
+
+
+def run_ffprobe(path: str) -> MediaInfo:
+    data = ffprobe_json(path)
+    return MediaInfo(path) if data is None else parse_probe(path, data)
+
+
+# One probe per file per run, however many steps ask for it.
+_probed: dict[tuple[str, int, int], MediaInfo] = {}
+
+
+def probe_media(path: str) -> MediaInfo:
+    """Probe ``path``, going through the in-process and on-disk caches.
+
+    Unchanged files (same size and mtime) are answered from the
+    persistent cache without spawning ffprobe.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return run_ffprobe(path)
+    abspath = os.path.abspath(path)
+    key = (abspath, st.st_size, st.st_mtime_ns)
+    info = _probed.get(key)
+    if info is not None:
+        return info
+
+    cache = default_cache()
+    data = None
+    if cache is not None:
+        try:
+            data = cache.get(abspath, st)
+        except sqlite3.Error:
+            cache = None
+    if data is None:
+        data = ffprobe_json(path)
+        if data is None:
+            return MediaInfo(path)
+        if cache is not None:
+            try:
+                cache.put(abspath, st, data)
+            except sqlite3.Error:
+                pass
+
+    info = parse_probe(path, data)
+    _probed[key] = info
+    return info
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+import click
+
+# APP_PROBE_CACHE=<file> moves the cache, APP_PROBE_CACHE=off disables it.
+CACHE_ENV = "APP_PROBE_CACHE"
+VERIFY_ENV = "APP_PROBE_CACHE_VERIFY"
+
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 200_000
+HASH_BYTES = 64 * 1024
+
+# Hits only refresh their LRU timestamp when it is older than this, so a
+# warm re-scan stays read-only.
+TOUCH_INTERVAL = 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS probes (
+    path     TEXT PRIMARY KEY,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest   TEXT,
+    data     TEXT NOT NULL,
+    created  REAL NOT NULL,
+    used     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS probes_used ON probes (used);
+"""
+
+
+def default_cache_path() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "subtitle-extractor" / "probe.sqlite"
+
+
+def partial_digest(path: str, chunk: int = HASH_BYTES) -> str:
+    """Hash of the first and last ``chunk`` bytes (cheap content check)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        h.update(f.read(chunk))
+        size = os.fstat(f.fileno()).st_size
+        if size > chunk:
+            f.seek(max(chunk, size - chunk))
+            h.update(f.read(chunk))
+    return h.hexdigest()
+
+
+class ProbeCache:
+    """SQLite store of raw ffprobe output keyed by path, size and mtime.
+
+    A hit costs one ``stat`` plus one indexed lookup. With ``verify`` the
+    entry must also match a hash of the file's first and last 64 KiB,
+    which catches files rewritten in place with the same size and mtime.
+    Entries expire after ``ttl`` seconds and the least recently used ones
+    are evicted beyond ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        verify: bool = False,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.verify = verify
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), timeout=5)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._puts = 0
+
+    def close(self) -> None:
+        self._db.close()
+
+    def get(self, path: str, st: os.stat_result) -> dict | None:
+        row = self._db.execute(
+            "SELECT size, mtime_ns, digest, data, created, used"
+            " FROM probes WHERE path = ?",
+            (path,),
+        ).fetchone()
+        if row is None:
+            return None
+        size, mtime_ns, digest, data, created, used = row
+        now = time.time()
+        if (
+            size != st.st_size
+            or mtime_ns != st.st_mtime_ns
+            or now - created > self.ttl
+        ):
+            return None
+        if self.verify and digest != partial_digest(path):
+            return None
+        if now - used > TOUCH_INTERVAL:
+            with self._db:
+                self._db.execute(
+                    "UPDATE probes SET used = ? WHERE path = ?",
+                    (now, path),
+                )
+        return json.loads(data)
+
+    def put(self, path: str, st: os.stat_result, data: dict) -> None:
+        now = time.time()
+        digest = partial_digest(path) if self.verify else None
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO probes"
+                " (path, size, mtime_ns, digest, data, created, used)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    st.st_size,
+                    st.st_mtime_ns,
+                    digest,
+                    json.dumps(data, separators=(",", ":")),
+                    now,
+                    now,
+                ),
+            )
+        self._puts += 1
+        if self._puts % 1000 == 1:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries and trim to ``max_entries`` (LRU)."""
+        with self._db:
+            cur = self._db.execute(
+                "DELETE FROM probes WHERE created < ?",
+                (time.time() - self.ttl,),
+            )
+            removed = cur.rowcount
+            cur = self._db.execute(
+                "DELETE FROM probes WHERE path IN ("
+                " SELECT path FROM probes ORDER BY used DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            removed += cur.rowcount
+        return removed
+
+    def __len__(self) -> int:
+        row = self._db.execute("SELECT COUNT(*) FROM probes").fetchone()
+        return row[0]
+
+
+_default: ProbeCache | None = None
+_default_key: str | None = None
+
+
+def default_cache() -> ProbeCache | None:
+    """Process-wide cache from the environment, or None when disabled."""
+    global _default, _default_key
+    setting = os.environ.get(CACHE_ENV, "")
+    if setting.lower() in ("0", "off", "false", "no"):
+        return None
+    if _default is None or _default_key != setting:
+        path = setting or default_cache_path()
+        try:
+            _default = ProbeCache(
+                path, verify=os.environ.get(VERIFY_ENV) == "1"
+            )
+        except (sqlite3.Error, OSError) as e:
+            click.echo("⚠️ probe cache disabled: " + str(e), err=True)
+            return None
+        _default_key = setting
+    return _default
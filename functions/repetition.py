@@ -0,0 +1,386 @@
+from __future__ import annotations
+
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+from functions.cues import CueTable
+from functions.follow import SAMPLE_RATE
+
+# Whisper decodes 30 s of audio per step; guarding at the same size keeps
+# a loop from spilling into the next step through the text prompt.
+WINDOW_SECONDS = 30.0
+
+# A window that ran away is decoded again from where the loop began,
+# sampling at these temperatures in turn and without the (possibly
+# looping) previous text as a prompt.
+FALLBACK_TEMPERATURES = (0.2, 0.4, 0.6, 0.8, 1.0)
+
+# Within one segment, the same run of at most LOOP_PERIOD tokens
+# repeating over LOOP_TOKENS tokens is a loop as well.
+LOOP_PERIOD = 16
+LOOP_TOKENS = 32
+
+# Seconds per timestamp token (Whisper's audio tokens are 20 ms apart)
+TIME_PRECISION = 0.02
+
+PROMPT_CHARS = 200
+
+
+def compression_ratio(text: str) -> float:
+    """Same measure Whisper uses: raw bytes / zlib-compressed bytes."""
+    raw = text.encode("utf-8")
+    if not raw:
+        return 0.0
+    return len(raw) / len(zlib.compress(raw))
+
+
+def ngram_repeat_rate(text: str, n: int = 3) -> float:
+    """Share of word n-grams in ``text`` that already occurred before."""
+    words = text.lower().split()
+    grams = [
+        tuple(words[i : i + n])  # noqa: E203
+        for i in range(len(words) - n + 1)
+    ]
+    if not grams:
+        return 0.0
+    return 1.0 - len(set(grams)) / len(grams)
+
+
+class RepetitionMonitor:
+    """Watch a stream of segment texts for runaway repetition.
+
+    ``feed()`` returns True as soon as either the same line has come
+    back ``max_repeats`` times in a row, or the recent history is both
+    highly repetitive (n-gram repeat rate) and highly compressible.
+    ``loop_lines`` is then the number of fed lines the loop spans.
+    """
+
+    def __init__(
+        self,
+        max_repeats: int = 4,
+        history: int = 12,
+        ngram: int = 3,
+        max_ngram_rate: float = 0.6,
+        max_compression: float = 2.4,
+        min_chars: int = 80,
+    ):
+        self.max_repeats = max_repeats
+        self.ngram = ngram
+        self.max_ngram_rate = max_ngram_rate
+        self.max_compression = max_compression
+        self.min_chars = min_chars
+        self._recent: deque[str] = deque(maxlen=history)
+        self._last = None
+        self._run = 0
+        self.loop_lines = 0
+
+    def reset(self) -> None:
+        self._recent.clear()
+        self._last = None
+        self._run = 0
+        self.loop_lines = 0
+
+    def feed(self, text: str) -> bool:
+        line = " ".join(text.lower().split())
+        if not line:
+            return False
+        self._run = self._run + 1 if line == self._last else 1
+        self._last = line
+        self._recent.append(line)
+        if self._run >= self.max_repeats:
+            self.loop_lines = self._run
+            return True
+
+        joined = " ".join(self._recent)
+        if len(joined) < self.min_chars:
+            return False
+        if (
+            ngram_repeat_rate(joined, self.ngram) > self.max_ngram_rate
+            and compression_ratio(joined) > self.max_compression
+        ):
+            self.loop_lines = len(self._recent)
+            return True
+        return False
+
+
+def periodic_tail(tokens: list[int], period: int, span: int) -> bool:
+    """Whether the last ``span`` tokens repeat a run of at most
+    ``period`` tokens."""
+    if len(tokens) < span:
+        return False
+    tail = tokens[-span:]
+    return any(
+        all(tail[i] == tail[i - p] for i in range(p, span))
+        for p in range(1, period + 1)
+    )
+
+
+class StopOnLoop:
+    """Whisper logit filter that ends a decode once it starts looping.
+
+    Every segment the decoder closes (text followed by a timestamp
+    token) is fed to the monitor, and the segment still open is checked
+    with ``periodic_tail``. When either trips, only end-of-text is left
+    to sample, so the decode stops at the next token instead of running
+    on to its token limit. ``loop`` is then the index of the segment the
+    loop started at and ``loop_start`` its start, in seconds.
+    """
+
+    def __init__(
+        self, tokenizer, sample_begin: int, monitor: RepetitionMonitor
+    ):
+        self.eot = tokenizer.eot
+        self.timestamp_begin = tokenizer.timestamp_begin
+        self.decode_text = tokenizer.decode
+        self.sample_begin = sample_begin
+        self.monitor = monitor
+        self.starts: list[float] = []  # closed segments
+        self.opened = 0.0
+        self.text: list[int] = []
+        self.seen = 0
+        self.loop = -1
+        self.loop_start = 0.0
+
+    def _trip(self, segment: int) -> None:
+        self.loop = segment
+        self.loop_start = (
+            self.starts[segment]
+            if segment < len(self.starts)
+            else self.opened
+        )
+
+    def _feed(self, token: int) -> None:
+        if token < self.timestamp_begin:
+            self.text.append(token)
+            if periodic_tail(self.text, LOOP_PERIOD, LOOP_TOKENS):
+                self._trip(len(self.starts))
+            return
+        if self.text:  # a timestamp after text closes a segment
+            self.starts.append(self.opened)
+            text, self.text = self.decode_text(self.text), []
+            if self.monitor.feed(text):
+                self._trip(len(self.starts) - self.monitor.loop_lines)
+                return
+        self.opened = (token - self.timestamp_begin) * TIME_PRECISION
+
+    def apply(self, logits, tokens) -> None:
+        sampled = tokens[0, self.sample_begin :].tolist()  # noqa: E203
+        for token in sampled[self.seen :]:  # noqa: E203
+            if self.loop < 0:
+                self._feed(token)
+        self.seen = len(sampled)
+        if self.loop >= 0:
+            logits[:] = float("-inf")
+            logits[:, self.eot] = 0.0
+
+
+def split_segments(
+    tokens: list[int], tokenizer, duration: float
+) -> tuple[list[dict], float]:
+    """Segments of one decoded window, as ``whisper.transcribe`` cuts
+    them, and how far into the window the next one should start: at the
+    start of a last segment that was cut off, else after ``duration``.
+    """
+    tb = tokenizer.timestamp_begin
+    precision = TIME_PRECISION
+    is_ts = [t >= tb for t in tokens]
+    single_ending = is_ts[-2:] == [False, True]
+    slices = [
+        i for i in range(1, len(tokens)) if is_ts[i - 1] and is_ts[i]
+    ]
+    if not slices:
+        stamps = [t for t in tokens if t >= tb]
+        end = duration
+        if stamps and stamps[-1] != tb:
+            end = (stamps[-1] - tb) * precision
+        text = tokenizer.decode(tokens)
+        segs = (
+            [{"start": 0.0, "end": end, "text": text}] if text else []
+        )
+        return segs, duration
+    if single_ending:
+        slices.append(len(tokens))
+    segments, last = [], 0
+    for cut in slices:
+        part = tokens[last:cut]
+        segments.append(
+            {
+                "start": (part[0] - tb) * precision,
+                "end": (part[-1] - tb) * precision,
+                "text": tokenizer.decode(part),
+            }
+        )
+        last = cut
+    if single_ending:
+        return segments, duration
+    return segments, (tokens[last - 1] - tb) * precision
+
+
+class Window(NamedTuple):
+    """One decoded window; times are relative to its start."""
+
+    segments: list[dict]
+    advance: float  # where the next window starts
+    loop: int  # index of the segment a loop starts at, or -1
+    loop_start: float
+    tokens: int  # tokens sampled
+    seconds: float  # time the decode took
+
+
+class WhisperDecoder:
+    """Decode ``audio`` one window at a time, the way
+    ``whisper.transcribe`` does, with ``StopOnLoop`` added to
+    ``whisper.decode``'s logit filters."""
+
+    def __init__(self, model, audio, language: str):
+        import torch
+        import whisper
+        from whisper.audio import N_FRAMES, N_SAMPLES
+
+        self.model = model
+        self.language = language
+        self.mel = whisper.log_mel_spectrogram(
+            audio, model.dims.n_mels, padding=N_SAMPLES
+        )
+        self.frames = self.mel.shape[-1] - N_FRAMES
+        self.sample_len = model.dims.n_text_ctx // 2
+        self.fp16 = model.device.type != "cpu"
+        self.dtype = torch.float16 if self.fp16 else torch.float32
+
+    def decode(
+        self,
+        start: float,
+        end: float,
+        prompt: str | None,
+        temperature: float,
+        monitor: RepetitionMonitor,
+    ) -> Window:
+        from whisper.audio import (
+            FRAMES_PER_SECOND,
+            N_FRAMES,
+            pad_or_trim,
+        )
+        from whisper.decoding import DecodingOptions, DecodingTask
+
+        first = round(start * FRAMES_PER_SECOND)
+        last = min(round(end * FRAMES_PER_SECOND), self.frames)
+        mel = pad_or_trim(self.mel[:, first:last], N_FRAMES)
+        mel = mel.to(self.model.device).to(self.dtype)
+        task = DecodingTask(
+            self.model,
+            DecodingOptions(
+                language=self.language,
+                temperature=temperature,
+                prompt=prompt,
+                fp16=self.fp16,
+            ),
+        )
+        stop = StopOnLoop(task.tokenizer, task.sample_begin, monitor)
+        task.logit_filters.append(stop)
+        t0 = time.perf_counter()
+        result = task.run(mel.unsqueeze(0))[0]
+        seconds = time.perf_counter() - t0
+        segments, advance = split_segments(
+            result.tokens,
+            task.tokenizer,
+            (last - first) / FRAMES_PER_SECOND,
+        )
+        return Window(
+            segments,
+            advance,
+            stop.loop,
+            stop.loop_start,
+            len(result.tokens),
+            seconds,
+        )
+
+
+@dataclass
+class GuardReport:
+    windows: int = 0
+    loops: int = 0
+    redecoded: int = 0
+    skipped: list[tuple[float, float]] = field(default_factory=list)
+    dropped_segments: int = 0
+    decode_seconds: float = 0.0
+    # time spent decoding loops again at a fallback temperature
+    redecode_seconds: float = 0.0
+    # decoding a loop would have taken to reach the token limit, at the
+    # speed its stopped decode had; the time stopping it early saved
+    saved_seconds: float = 0.0
+
+
+def guarded_transcribe(
+    model_instance,
+    audio,
+    language: str,
+    window: float = WINDOW_SECONDS,
+    monitor: RepetitionMonitor | None = None,
+    decoder=None,
+) -> tuple[CueTable, GuardReport]:
+    """Transcribe ``audio`` window by window, stopping repetition loops.
+
+    Each window is one ``whisper.decode`` call watched token by token
+    (``StopOnLoop``): a loop is caught while it is being decoded and the
+    decode ends there, instead of running to the token limit and being
+    retried at every temperature as in ``whisper.transcribe``. Like
+    Whisper's own seek, a window ends where a cut-off last segment
+    starts. Segments before a loop are kept, and the window is decoded
+    again right away from where the loop began, at each of
+    ``FALLBACK_TEMPERATURES`` in turn without a prompt; if it loops
+    every time, the rest of the window is skipped.
+    """
+    monitor = monitor or RepetitionMonitor()
+    decoder = decoder or WhisperDecoder(model_instance, audio, language)
+    report = GuardReport()
+    duration = len(audio) / SAMPLE_RATE
+    segments = CueTable()
+    prompt = None
+    seek = 0.0
+
+    def run(start, end, prompt, temperature) -> Window:
+        monitor.reset()
+        w = decoder.decode(start, end, prompt, temperature, monitor)
+        report.decode_seconds += w.seconds
+        if w.loop >= 0 and w.tokens:
+            left = max(decoder.sample_len - w.tokens, 0)
+            report.saved_seconds += left * w.seconds / w.tokens
+        return w
+
+    while seek < duration:
+        end = min(seek + window, duration)
+        report.windows += 1
+        w = run(seek, end, prompt, 0.0)
+
+        if w.loop < 0:
+            segments.extend(w.segments, seek)
+            if w.segments:
+                text = " ".join(
+                    str(s.get("text", "")).strip() for s in w.segments
+                )
+                prompt = text[-PROMPT_CHARS:]
+            seek += w.advance if w.advance > 0 else end - seek
+            continue
+
+        report.loops += 1
+        # a loop caught mid-segment drops that open segment too
+        report.dropped_segments += max(len(w.segments) - w.loop, 1)
+        segments.extend(w.segments[: w.loop], seek)
+        restart = min(seek + w.loop_start, end)
+        prompt = None
+        for temperature in FALLBACK_TEMPERATURES:
+            retry = run(restart, end, None, temperature)
+            report.redecode_seconds += retry.seconds
+            if retry.loop < 0:
+                report.redecoded += 1
+                segments.extend(retry.segments, restart)
+                seek = restart + (retry.advance or end - restart)
+                break
+        else:
+            report.skipped.append((restart, end))
+            seek = end
+
+    return segments, report
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import re
+from fractions import Fraction
+from typing import Iterable
+
+import numpy as np
+
+from functions.cues import CueTable
+
+TIME_RE = re.compile(r"(-?)(?:(\d+):)?(\d+):(\d+(?:[.,]\d+)?)")
+
+# Frame rates people type instead of numbers.
+FPS_NAMES = {
+    "ntsc-film": Fraction(24000, 1001),
+    "film": Fraction(24),
+    "pal": Fraction(25),
+    "ntsc": Fraction(30000, 1001),
+}
+
+
+def parse_time(value: str) -> float:
+    """Seconds from ``1.5``, ``-2``, ``01:02.5`` or ``-0:01:02,500``."""
+    value = value.strip()
+    m = TIME_RE.fullmatch(value)
+    if not m:
+        return float(value)
+    sign, h, mins, secs = m.groups()
+    total = int(h or 0) * 3600 + int(mins) * 60
+    total += float(secs.replace(",", "."))
+    return -total if sign else total
+
+
+def parse_fps(value: str) -> Fraction:
+    """Frame rate from ``25``, ``23.976``, ``24000/1001`` or a name.
+
+    ``23.976`` and ``29.97`` mean the NTSC rates, as they do on screen.
+    """
+    value = value.strip().lower()
+    if value in FPS_NAMES:
+        return FPS_NAMES[value]
+    fps = Fraction(value)
+    if fps <= 0:
+        raise ValueError(value)
+    for exact in (Fraction(24000, 1001), Fraction(30000, 1001)):
+        if abs(fps - exact) < Fraction(1, 100) and fps != round(fps):
+            return exact
+    return fps
+
+
+def load_timings(
+    segments: Iterable[dict] | CueTable,
+) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """Split segments into start and end arrays plus their texts."""
+    if isinstance(segments, CueTable):
+        return (
+            np.array(segments.starts, dtype=float),
+            np.array(segments.ends, dtype=float),
+            segments.texts(),
+        )
+    starts: list[float] = []
+    ends: list[float] = []
+    texts: list[str] = []
+    for seg in segments:
+        starts.append(seg.get("start", 0.0))
+        ends.append(seg.get("end", 0.0))
+        texts.append(seg.get("text", ""))
+    return (
+        np.asarray(starts, dtype=float),
+        np.asarray(ends, dtype=float),
+        texts,
+    )
+
+
+def shift_times(
+    starts: np.ndarray, ends: np.ndarray, seconds: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Move every cue by ``seconds`` (negative is earlier)."""
+    return starts + seconds, ends + seconds
+
+
+def stretch_times(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    factor: float,
+    anchor: float = 0.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Scale times around ``anchor``, which stays put."""
+    return (
+        anchor + (starts - anchor) * factor,
+        anchor + (ends - anchor) * factor,
+    )
+
+
+def convert_fps(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    src_fps: float,
+    dst_fps: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Retime cues made for ``src_fps`` playback to ``dst_fps``.
+
+    A frame shown at ``t`` at the source rate is shown at
+    ``t * src / dst`` at the new one (25 fps PAL runs 4% fast).
+    """
+    return stretch_times(starts, ends, float(src_fps) / float(dst_fps))
+
+
+def merge_timings(
+    parts: list[tuple[np.ndarray, np.ndarray, list[str]]],
+) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """All cues of ``parts`` in time order (stable for equal starts)."""
+    if not parts:
+        return np.empty(0), np.empty(0), []
+    starts = np.concatenate([p[0] for p in parts])
+    ends = np.concatenate([p[1] for p in parts])
+    texts = [t for p in parts for t in p[2]]
+    order = np.argsort(starts, kind="stable")
+    return starts[order], ends[order], [texts[i] for i in order]
+
+
+def to_segments(
+    starts: np.ndarray, ends: np.ndarray, texts: list[str]
+) -> CueTable:
+    """Cue table for the writers; cues pushed before 0 are dropped and
+    ones straddling it are clipped."""
+    keep = ends > 0
+    return CueTable.from_columns(
+        np.maximum(starts[keep], 0.0),
+        ends[keep],
+        (t for t, k in zip(texts, keep.tolist()) if k),
+    )
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+from functions.formats import read_segments
+
+# APP_SEARCH_INDEX=<file> moves the index.
+INDEX_ENV = "APP_SEARCH_INDEX"
+
+COMMIT_EVERY = 200  # files per transaction while indexing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id       INTEGER PRIMARY KEY,
+    path     TEXT NOT NULL UNIQUE,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    cues     INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cues (
+    id       INTEGER PRIMARY KEY,
+    file_id  INTEGER NOT NULL,
+    start_ms INTEGER NOT NULL,
+    end_ms   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cues_file ON cues (file_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS cue_text USING fts5(
+    text,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+"""
+
+WORD_RE = re.compile(r"\w+")
+
+
+class Hit(NamedTuple):
+    path: str
+    start: float
+    end: float
+    text: str
+
+
+def default_index_path() -> Path:
+    setting = os.environ.get(INDEX_ENV)
+    if setting:
+        return Path(setting)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "subtitle-extractor" / "index.sqlite"
+
+
+def plain_query(text: str) -> str:
+    """FTS5 query matching cues that contain every word of ``text``.
+
+    Words are quoted, so punctuation and FTS operators in user input
+    are taken literally; a trailing ``*`` keeps prefix search.
+    """
+    terms = []
+    for token in text.split():
+        prefix = token.endswith("*")
+        for word in WORD_RE.findall(token):
+            terms.append(f'"{word}"')
+        if prefix and terms:
+            terms[-1] += "*"
+    return " ".join(terms)
+
+
+class CueIndex:
+    """SQLite FTS5 index of cue text with file and timing.
+
+    Files are keyed by path, size and mtime; ``add`` skips unchanged
+    ones and replaces the cues of changed ones, so re-indexing a library
+    only reads what moved.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # transactions are managed by hand (batches plus a savepoint
+        # per file), so no implicit BEGINs
+        self._db = sqlite3.connect(
+            str(self.path), timeout=5, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _drop(self, file_id: int) -> None:
+        self._db.execute(
+            "DELETE FROM cue_text WHERE rowid IN"
+            " (SELECT id FROM cues WHERE file_id = ?)",
+            (file_id,),
+        )
+        self._db.execute(
+            "DELETE FROM cues WHERE file_id = ?", (file_id,)
+        )
+        self._db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _add_file(self, path: str, st: os.stat_result) -> int:
+        rows = [
+            (
+                round(seg["start"] * 1000),
+                round(seg["end"] * 1000),
+                seg["text"].replace("\n", " "),
+            )
+            for seg in read_segments(path)
+        ]
+        file_id = self._db.execute(
+            "INSERT INTO files (path, size, mtime_ns, cues)"
+            " VALUES (?, ?, ?, ?)",
+            (path, st.st_size, st.st_mtime_ns, len(rows)),
+        ).lastrowid
+        (first,) = self._db.execute(
+            "SELECT COALESCE(MAX(id), 0) + 1 FROM cues"
+        ).fetchone()
+        self._db.executemany(
+            "INSERT INTO cues (id, file_id, start_ms, end_ms)"
+            " VALUES (?, ?, ?, ?)",
+            (
+                (first + i, file_id, start, end)
+                for i, (start, end, _text) in enumerate(rows)
+            ),
+        )
+        self._db.executemany(
+            "INSERT INTO cue_text (rowid, text) VALUES (?, ?)",
+            ((first + i, row[2]) for i, row in enumerate(rows)),
+        )
+        return len(rows)
+
+    def add(
+        self, paths: Iterable[str | Path]
+    ) -> Iterator[tuple[str, int | None, Exception | None]]:
+        """Index ``paths``; yields ``(path, cues, error)`` per file.
+
+        ``cues`` is None for files that had not changed. Work is
+        committed every ``COMMIT_EVERY`` files; a file that fails to
+        parse leaves its previous entry untouched.
+        """
+        pending = 0
+        self._db.execute("BEGIN")
+        try:
+            for p in paths:
+                path = str(Path(p).resolve())
+                try:
+                    st = os.stat(path)
+                except OSError as e:
+                    yield path, None, e
+                    continue
+                row = self._db.execute(
+                    "SELECT id, size, mtime_ns FROM files WHERE path = ?",
+                    (path,),
+                ).fetchone()
+                if row and row[1:] == (st.st_size, st.st_mtime_ns):
+                    yield path, None, None
+                    continue
+                self._db.execute("SAVEPOINT file")
+                try:
+                    if row:
+                        self._drop(row[0])
+                    count = self._add_file(path, st)
+                except Exception as e:
+                    self._db.execute("ROLLBACK TO file")
+                    self._db.execute("RELEASE file")
+                    yield path, None, e
+                    continue
+                self._db.execute("RELEASE file")
+                pending += 1
+                if pending >= COMMIT_EVERY:
+                    self._db.execute("COMMIT")
+                    self._db.execute("BEGIN")
+                    pending = 0
+                yield path, count, None
+        finally:
+            self._db.execute("COMMIT")
+
+    def prune(self, roots: Iterable[str | Path]) -> int:
+        """Forget indexed files below ``roots`` that no longer exist."""
+        removed = 0
+        self._db.execute("BEGIN")
+        for root in roots:
+            prefix = str(Path(root).resolve()).rstrip(os.sep) + os.sep
+            rows = self._db.execute(
+                "SELECT id, path FROM files"
+                " WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix),
+            ).fetchall()
+            for file_id, path in rows:
+                if not os.path.exists(path):
+                    self._drop(file_id)
+                    removed += 1
+        self._db.execute("COMMIT")
+        return removed
+
+    def search(
+        self, query: str, limit: int = 20, raw: bool = False
+    ) -> list[Hit]:
+        """Matching cues in index order (file by file, in time order).
+
+        Walking the match in rowid order lets ``LIMIT`` stop early;
+        ranking would score every match first, which is seconds on
+        common words in a multi-million-cue library. ``raw`` passes FTS5
+        query syntax (``OR``, ``NEAR``, ``"phrases"``) through unchanged.
+        """
+        match = query if raw else plain_query(query)
+        if not match:
+            return []
+        rows = self._db.execute(
+            "SELECT f.path, c.start_ms, c.end_ms, cue_text.text"
+            " FROM cue_text"
+            " JOIN cues c ON c.id = cue_text.rowid"
+            " JOIN files f ON f.id = c.file_id"
+            " WHERE cue_text MATCH ?"
+            " ORDER BY cue_text.rowid LIMIT ?",
+            (match, limit),
+        ).fetchall()
+        return [
+            Hit(path, start / 1000, end / 1000, text)
+            for path, start, end, text in rows
+        ]
+
+    def counts(self) -> tuple[int, int]:
+        """Number of indexed files and cues."""
+        row = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(cues), 0) FROM files"
+        ).fetchone()
+        return row[0], row[1]
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable, Iterator
+
+TIMING_RE = re.compile(
+    r"(\d+):(\d{2}):(\d{2})[,.](\d{1,3})\s*-->\s*"
+    r"(\d+):(\d{2}):(\d{2})[,.](\d{1,3})"
+)
+
+
+def _seconds(h: str, m: str, s: str, ms: str) -> float:
+    return (
+        int(h) * 3600
+        + int(m) * 60
+        + int(s)
+        + int(ms.ljust(3, "0")) / 1000
+    )
+
+
+def parse_srt(lines: Iterable[str]) -> Iterator[dict]:
+    """Stream SRT lines into segments (``start``/``end``/``text``).
+
+    Works one cue at a time, so it can sit directly on a file handle or a
+    pipe. Cue numbers are not kept; writers renumber from 1.
+    """
+    seg: dict | None = None
+    text: list[str] = []
+    for raw in lines:
+        line = raw.rstrip("\r\n").lstrip("\ufeff")
+        m = TIMING_RE.search(line) if "-->" in line else None
+        if m:
+            if seg is not None:
+                # a cue without a trailing blank line
+                if text and text[-1].strip().isdigit():
+                    text.pop()
+                seg["text"] = "\n".join(text).strip()
+                yield seg
+            g = m.groups()
+            seg = {"start": _seconds(*g[:4]), "end": _seconds(*g[4:])}
+            text = []
+        elif seg is not None:
+            if line.strip():
+                text.append(line.strip())
+            else:
+                seg["text"] = "\n".join(text).strip()
+                yield seg
+                seg, text = None, []
+    if seg is not None:
+        seg["text"] = "\n".join(text).strip()
+        yield seg
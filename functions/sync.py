@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import subprocess
+import tempfile
+from typing import BinaryIO, Iterable
+
+import numpy as np
+
+SAMPLE_RATE = 8000  # speech energy needs nothing finer
+FRAME = 0.01  # seconds per activity sample
+CHUNK_FRAMES = 6000  # frames decoded per read (one minute)
+
+# Time scales worth trying: the usual frame rate mix-ups, both ways.
+FPS_FACTORS = (
+    1.0,
+    25 / (24000 / 1001),
+    (24000 / 1001) / 25,
+    25 / 24,
+    24 / 25,
+    24 / (24000 / 1001),
+    (24000 / 1001) / 24,
+)
+
+REFINE_WINDOW = 300.0  # seconds of subtitles per local estimate
+REFINE_SEARCH = 2.0  # seconds a local estimate may move
+MIN_WINDOWS = 3
+
+
+def audio_command(
+    media_path: str, audio_index: int = 0, rate: int = SAMPLE_RATE
+) -> list[str]:
+    """ffmpeg command that writes one audio track as mono s16le PCM."""
+    return [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-nostdin",
+        "-i",
+        media_path,
+        "-map",
+        f"0:a:{audio_index}",
+        "-vn",
+        "-sn",
+        "-dn",
+        "-ac",
+        "1",
+        "-ar",
+        str(rate),
+        "-f",
+        "s16le",
+        "pipe:1",
+    ]
+
+
+def frame_energy(
+    pcm: BinaryIO, rate: int = SAMPLE_RATE, frame: float = FRAME
+) -> np.ndarray:
+    """Log energy of each ``frame`` of s16le audio read from ``pcm``.
+
+    Reads a minute at a time, so only the (small) energy array grows.
+    """
+    hop = int(rate * frame)
+    chunks = []
+    rest = b""
+    while True:
+        data = pcm.read(hop * CHUNK_FRAMES * 2)
+        if not data:
+            break
+        data = rest + data
+        usable = len(data) // (hop * 2) * hop * 2
+        rest = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype="<i2")
+        frames = samples.reshape(-1, hop).astype(np.float32)
+        chunks.append(np.log10(np.mean(frames * frames, axis=1) + 1.0))
+    return np.concatenate(chunks) if chunks else np.empty(0)
+
+
+def speech_activity(energy: np.ndarray) -> np.ndarray:
+    """1.0 where ``energy`` looks like speech, else 0.0.
+
+    The threshold sits halfway between the quiet and the loud end of
+    the recording, so it follows the mix's overall level.
+    """
+    if not len(energy):
+        return np.empty(0)
+    quiet, loud = np.percentile(energy, [20, 80])
+    return (energy > (quiet + loud) / 2).astype(np.float32)
+
+
+def media_activity(media_path: str, audio_index: int = 0) -> np.ndarray:
+    """Speech activity of a media file's audio, one value per ``FRAME``.
+
+    Raises ``CalledProcessError`` if ffmpeg could not decode the track.
+    """
+    cmd = audio_command(media_path, audio_index)
+    # stderr goes to a file: nobody reads a pipe while the PCM stream
+    # is being consumed, and ffmpeg would block once it filled up
+    with tempfile.TemporaryFile() as errors:
+        proc = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=errors
+        )
+        try:
+            energy = frame_energy(proc.stdout)
+        finally:
+            proc.stdout.close()
+            code = proc.wait()
+        if code:
+            errors.seek(0)
+            err = errors.read().decode("utf-8", "replace")
+            raise subprocess.CalledProcessError(code, cmd, stderr=err)
+    return speech_activity(energy)
+
+
+def cue_activity(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    length: int | None = None,
+    frame: float = FRAME,
+) -> np.ndarray:
+    """1.0 in every ``frame`` some cue is on screen, else 0.0."""
+    first = np.clip(np.round(starts / frame).astype(np.int64), 0, None)
+    last = np.clip(np.round(ends / frame).astype(np.int64), 0, None)
+    if length is None:
+        length = int(last.max()) if len(last) else 0
+    edges = np.zeros(length + 1, dtype=np.int32)
+    np.add.at(edges, np.minimum(first, length), 1)
+    np.add.at(edges, np.minimum(last, length), -1)
+    return (np.cumsum(edges[:-1]) > 0).astype(np.float32)
+
+
+def best_lag(
+    reference: np.ndarray, signal: np.ndarray, max_lag: int
+) -> tuple[int, float]:
+    """Lag (in samples) that best lines ``signal`` up with ``reference``.
+
+    ``reference[t + lag]`` matches ``signal[t]``; lags are limited to
+    ``±max_lag``. The score is the normalized cross-correlation at that
+    lag, so scores of different signals can be compared. One FFT-based
+    correlation, O(n log n).
+    """
+    a = reference - reference.mean()
+    b = signal - signal.mean()
+    norm = float(np.sqrt(np.dot(a, a) * np.dot(b, b)))
+    if not norm:
+        return 0, 0.0
+    size = 1 << int(len(a) + len(b) - 1).bit_length()
+    corr = np.fft.irfft(
+        np.fft.rfft(a, size) * np.conj(np.fft.rfft(b, size)), size
+    )
+    max_lag = min(max_lag, size // 2 - 1)
+    # lags 0..max_lag, then -max_lag..-1 (wrapped to the end)
+    lags = np.concatenate(
+        [np.arange(max_lag + 1), np.arange(-max_lag, 0)]
+    )
+    tail = size - max_lag
+    window = np.concatenate([corr[: max_lag + 1], corr[tail:]])
+    best = int(np.argmax(window))
+    return int(lags[best]), float(window[best]) / norm
+
+
+def estimate_sync(
+    speech: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    max_offset: float = 600.0,
+    factors: Iterable[float] = FPS_FACTORS,
+    refine: bool = True,
+    frame: float = FRAME,
+) -> tuple[float, float, float]:
+    """``(factor, offset, score)`` so ``t * factor + offset`` lines the
+    cues up with ``speech``.
+
+    Each candidate ``factor`` costs one cross-correlation over the whole
+    film; with ``refine``, local offsets in ``REFINE_WINDOW`` slices are
+    fitted with a line to pick up any remaining drift.
+    """
+    max_lag = int(max_offset / frame)
+    best = (1.0, 0.0, -1.0)
+    for factor in factors:
+        cues = cue_activity(starts * factor, ends * factor, frame=frame)
+        lag, score = best_lag(speech, cues, max_lag)
+        if score > best[2]:
+            best = (float(factor), lag * frame, score)
+    factor, offset, score = best
+    if refine:
+        factor, offset = _refine(
+            speech,
+            starts * factor + offset,
+            ends * factor + offset,
+            factor,
+            offset,
+            frame,
+        )
+    return factor, offset, score
+
+
+def _refine(speech, starts, ends, factor, offset, frame):
+    """Fit ``residual = a + b * t`` over local offsets; fold it back
+    into ``factor``/``offset``."""
+    search = int(REFINE_SEARCH / frame)
+    span = int(REFINE_WINDOW / frame)
+    cues = cue_activity(starts, ends, len(speech), frame)
+    times, residuals = [], []
+    for lo in range(0, len(cues) - span + 1, span):
+        hi = lo + span
+        if cues[lo:hi].sum() < span * 0.05:
+            continue  # too little dialogue to place
+        lag, score = best_lag(speech[lo:hi], cues[lo:hi], search)
+        if score > 0:
+            times.append((lo + hi) / 2 * frame)
+            residuals.append(lag * frame)
+    if len(times) < MIN_WINDOWS:
+        return factor, offset
+    t = np.asarray(times)
+    r = np.asarray(residuals)
+    keep = np.abs(r - np.median(r)) <= 0.5
+    if keep.sum() < MIN_WINDOWS:
+        return factor, offset
+    slope, intercept = (
+        float(v) for v in np.polyfit(t[keep], r[keep], 1)
+    )
+    return factor * (1 + slope), offset * (1 + slope) + intercept
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from functions.probe import SubtitleStream
+
+
+def parse_langs(value: str | None) -> list[str]:
+    """'eng, jpn' -> ['eng', 'jpn']"""
+    if not value:
+        return []
+    return [c.strip().lower() for c in value.split(",") if c.strip()]
+
+
+def select_tracks(
+    streams: tuple[SubtitleStream, ...] | list[SubtitleStream],
+    langs: list[str],
+) -> list[SubtitleStream]:
+    """Keep the subtitle streams whose language tag is in ``langs``.
+
+    With no languages every stream is selected.
+    """
+    if not langs:
+        return list(streams)
+    return [s for s in streams if s.language.lower() in langs]
+
+
+def track_outputs(
+    output: str, tracks: list[SubtitleStream]
+) -> list[str]:
+    """Name one output per track: ``subs.srt`` -> ``subs.eng.srt``.
+
+    Forced and SDH tracks get a ``.forced``/``.sdh`` tag, and remaining
+    clashes (two plain English tracks) are numbered ``subs.eng.2.srt``.
+    """
+    base = Path(output)
+    stem, suffix = base.stem, base.suffix
+    used: dict[str, int] = {}
+    names = []
+    for t in tracks:
+        parts = [t.language or "und"]
+        if t.forced:
+            parts.append("forced")
+        if t.hearing_impaired:
+            parts.append("sdh")
+        key = ".".join(parts)
+        used[key] = used.get(key, 0) + 1
+        if used[key] > 1:
+            key += f".{used[key]}"
+        names.append(str(base.with_name(f"{stem}.{key}{suffix}")))
+    return names
+
+
+# ffmpeg encoder per output format (JSON is written by us).
+FFMPEG_ENCODERS = {"srt": "srt", "vtt": "webvtt", "ass": "ass"}
+
+
+def extract_command(
+    video_path: str,
+    tracks: list[SubtitleStream],
+    outputs: list[str],
+    fmt: str = "srt",
+) -> list[str]:
+    """One ffmpeg call that writes every selected track to its own file.
+
+    Each ``-map``/``-c:s``/output triple is a separate output of the same
+    invocation, so the container is demuxed only once.
+    """
+    cmd = ["ffmpeg", "-y", "-i", video_path]
+    for t, out in zip(tracks, outputs):
+        cmd += [
+            "-map",
+            f"0:s:{t.sub_index}",
+            "-c:s",
+            FFMPEG_ENCODERS[fmt],
+            out,
+        ]
+    return cmd
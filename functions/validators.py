@@ -3,6 +3,7 @@ from pathlib import Path
 import click
 
 from functions.i18n import _
+from functions.retime import parse_fps, parse_time
 
 VALID_VIDEO_EXTENSIONS = {
     ".mp4",
@@ -11,10 +12,13 @@ VALID_VIDEO_EXTENSIONS = {
     ".mkv",
     ".webm",
     ".flv",
+    ".ts",
 }
 
 
 def validate_video_extension(ctx, param, value):
+    if value == "-":
+        return value
     ext = Path(value).suffix.lower()
     if ext not in VALID_VIDEO_EXTENSIONS:
         kinds = ", ".join(sorted(VALID_VIDEO_EXTENSIONS))
@@ -30,7 +34,7 @@ def validate_video_extension(ctx, param, value):
 def validate_extension(
     ctx, param, value, allowed_exts=(".srt", ".txt")
 ):
-    if value:
+    if value and value != "-":
         ext = Path(value).suffix.lower()
         if ext not in allowed_exts:
             allowed = ", ".join(allowed_exts)
@@ -40,9 +44,47 @@ def validate_extension(
     return value
 
 
+SUBTITLE_EXTENSIONS = (".srt", ".vtt", ".ass", ".ssa", ".json")
+
+
+def validate_subtitle(ctx, param, value):
+    return validate_extension(ctx, param, value, SUBTITLE_EXTENSIONS)
+
+
 def validate_srt(ctx, param, value):
     return validate_extension(ctx, param, value, (".srt",))
 
 
 def validate_txt(ctx, param, value):
     return validate_extension(ctx, param, value, (".txt",))
+
+
+def validate_time(ctx, param, value):
+    """``--by`` style offsets: seconds or ``[-][H:]MM:SS[.mmm]``."""
+    if value is None:
+        return value
+    try:
+        return parse_time(value)
+    except ValueError:
+        raise click.BadParameter(
+            _("Not a time: '")
+            + value
+            + _("'. Use seconds or HH:MM:SS,mmm")
+        )
+
+
+def validate_fps(ctx, param, value):
+    if value is None:
+        return value
+    try:
+        return parse_fps(value)
+    except (ValueError, ZeroDivisionError):
+        raise click.BadParameter(
+            _("Not a frame rate: '")
+            + value
+            + _("'. Use e.g. 25, 23.976 or 24000/1001")
+        )
+
+
+def validate_times(ctx, param, value):
+    return [validate_time(ctx, param, v) for v in value]
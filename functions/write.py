@@ -1,78 +1,233 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from itertools import islice
 from pathlib import Path
+from typing import Iterable, Iterator
 
 import click
 
-from functions.format_timestamp import format_timestamp
+from functions.cues import CueTable
+from functions.formats import (
+    READERS,
+    SUFFIXES,
+    WRITERS,
+    MultiWriter,
+    detect_format,
+    read_segments,
+    write_cues,
+)
 from functions.i18n import _
 
+WRITE_BATCH = 8192  # cleaned lines per write() call
 
-def clean_srt_lines(lines: list[str]) -> list[str]:
-    """Return plain text lines from SRT lines (no numbering/timestamps/blank lines)."""
-    cleaned: list[str] = []
+
+def iter_clean_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Plain text lines from SRT lines, one at a time."""
     for line in lines:
         s = line.strip()
         if not s or s.isdigit() or "-->" in s:
             continue
-        cleaned.append(s)
-    return cleaned
+        yield s
+
+
+def tee_clean_lines(lines: Iterable[str], f) -> Iterator[str]:
+    """Pass SRT ``lines`` through unchanged, writing their plain text
+    to ``f`` on the way, so one pass yields both files."""
+    for line in lines:
+        for text in iter_clean_lines(line.splitlines()):
+            f.write(text + "\n")
+        yield line
+
+
+def clean_srt_lines(lines: list[str]) -> list[str]:
+    """Return plain text lines from SRT lines (no numbering/timestamps/blank lines)."""
+    return list(iter_clean_lines(lines))
+
+
+def open_output(path: str):
+    """Text handle for ``path``; ``-`` is stdout and is left open."""
+    if path != "-":
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+    return click.open_file(path, "w", encoding="utf-8")
 
 
 def clean_srt_file_to_txt(
-    srt_path: str, out_path: str | None = None
+    srt_path: str, out_path: str | None = None, fmt: str | None = None
 ) -> str:
+    """Plain dialogue text from a subtitle file ('.srt', '.vtt', ...).
+
+    ``fmt`` names the input format when the suffix does not. The file
+    is streamed, so memory use does not grow with its size.
+    """
     if not srt_path:
         raise click.BadParameter(_("Error: No input file provided."))
 
-    p = Path(srt_path)
-    if not p.exists():
-        raise click.ClickException(_("📄 File not found: ") + str(p))
-    if p.suffix.lower() not in (".srt", ".txt"):
-        raise click.BadParameter(
-            _("Input file must end with: '.srt' or '.txt'")
-        )
+    if srt_path == "-":
+        out = out_path or "-"
+    else:
+        p = Path(srt_path)
+        if not p.exists():
+            raise click.ClickException(
+                _("📄 File not found: ") + str(p)
+            )
+        if not fmt and p.suffix.lower() not in (*SUFFIXES, ".txt"):
+            raise click.BadParameter(
+                _("Input file must end with: ")
+                + ", ".join((*SUFFIXES, ".txt"))
+            )
+        out = out_path or str(p.with_suffix(".txt"))
 
-    out = (
-        Path(out_path)
-        if out_path
-        else p.with_name(p.name[:-4] + ".txt")
-    )
-    if out.suffix.lower() != ".txt":
+    if out != "-" and Path(out).suffix.lower() != ".txt":
         raise click.BadParameter(_("Output file must end with: '.txt'"))
 
-    lines = p.read_text(encoding="utf-8").splitlines()
-    cleaned = clean_srt_lines(lines)
+    # Cleaning a '.txt' in place: write beside it, then swap it in.
+    in_place = (
+        out != "-"
+        and srt_path != "-"
+        and Path(out).resolve() == Path(srt_path).resolve()
+    )
+    target = out + ".part" if in_place else out
 
-    out.parent.mkdir(parents=True, exist_ok=True)
-    out.write_text("\n".join(cleaned) + "\n", encoding="utf-8")
-    return str(out.resolve())
+    fmt = detect_format(srt_path, fmt)
+    with click.open_file(srt_path, encoding="utf-8") as src:
+        if fmt == "srt":  # also plain '.txt'
+            cleaned = iter_clean_lines(src)
+        else:
+            cleaned = (
+                line.strip()
+                for seg in READERS[fmt](src)
+                for line in seg["text"].split("\n")
+                if line.strip()
+            )
+        with open_output(target) as f:
+            while batch := list(islice(cleaned, WRITE_BATCH)):
+                f.write("\n".join(batch) + "\n")
+    if in_place:
+        os.replace(target, out)
+    return out if out == "-" else str(Path(out).resolve())
 
 
-def write_segments(
-    segments: list[dict], output: str, clean: bool
-) -> str:
-    final_out = output
-    if clean and final_out.lower().endswith(".srt"):
-        final_out = final_out[:-4] + ".txt"
+def find_subtitle_files(source: str) -> tuple[Path, list[Path]]:
+    """Subtitle files under a folder, or matching a glob pattern.
+
+    Returns the folder the matches are relative to and the files in
+    sorted order; '.txt' files are left out since they are the output.
+    """
+    if glob.has_magic(source):
+        matches = [Path(m) for m in glob.glob(source, recursive=True)]
+        root = Path(
+            os.path.commonpath([m.parent.resolve() for m in matches])
+            if matches
+            else "."
+        )
+    else:
+        root = Path(source)
+        matches = list(root.rglob("*"))
+    files = sorted(
+        m.resolve()
+        for m in matches
+        if m.is_file() and m.suffix.lower() in SUFFIXES
+    )
+    return root.resolve(), files
+
+
+def clean_files(
+    pairs: list[tuple[str, str]],
+    fmt: str | None = None,
+    jobs: int | None = None,
+) -> Iterator[tuple[str, str, Exception | None]]:
+    """Clean ``(source, output)`` pairs over ``jobs`` processes.
+
+    Yields ``(source, output, error)`` in input order as each finishes;
+    ``error`` is None on success.
+    """
+    jobs = min(jobs or os.cpu_count() or 1, len(pairs))
+    if jobs <= 1:
+        for src, out in pairs:
+            try:
+                clean_srt_file_to_txt(src, out, fmt)
+                yield src, out, None
+            except Exception as e:
+                yield src, out, e
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(clean_srt_file_to_txt, src, out, fmt)
+            for src, out in pairs
+        ]
+        for (src, out), future in zip(pairs, futures):
+            yield src, out, future.exception()
 
-    Path(final_out).parent.mkdir(parents=True, exist_ok=True)
 
+def output_sinks(
+    output: str, fmt: str | None = None, clean: bool = False
+) -> list[tuple[str, str]]:
+    """``(path, format)`` of every file written for ``output``.
+
+    ``clean`` adds a '.txt' beside it; an ``output`` that is already a
+    '.txt' (or stdout) gets only the plain text.
+    """
+    if clean and (
+        output == "-" or Path(output).suffix.lower() == ".txt"
+    ):
+        return [(output, "txt")]
+    sinks = [(output, detect_format(output, fmt))]
     if clean:
-        with open(final_out, "w", encoding="utf-8") as f:
+        sinks.append((str(Path(output).with_suffix(".txt")), "txt"))
+    return sinks
+
+
+@contextmanager
+def open_writers(sinks: list[tuple[str, str]]) -> Iterator[MultiWriter]:
+    """One ``MultiWriter`` over ``(path, format)`` sinks, each with its
+    own file handle; all of them are closed on exit."""
+    with ExitStack() as stack:
+        yield MultiWriter(
+            [
+                WRITERS[fmt](stack.enter_context(open_output(path)))
+                for path, fmt in sinks
+            ]
+        )
+
+
+def write_sinks(
+    segments: Iterable[dict] | CueTable, sinks: list[tuple[str, str]]
+) -> int:
+    """Write ``segments`` to every sink in a single pass.
+
+    Returns the number of cues written.
+    """
+    with open_writers(sinks) as writer:
+        writer.begin()
+        if isinstance(segments, CueTable):
+            writer.write_table(segments)
+        else:
             for seg in segments:
-                text = str(seg.get("text", "")).strip()
-                if text:
-                    f.write(text + "\n")
-        return final_out
-
-    # SRT mode
-    with open(final_out, "w", encoding="utf-8") as f:
-        for idx, seg in enumerate(segments, start=1):
-            start = float(seg.get("start", 0.0))
-            end = float(seg.get("end", 0.0))
-            text = str(seg.get("text", "")).strip()
-            f.write(f"{idx}\n")
-            f.write(
-                f"{format_timestamp(start)} --> {format_timestamp(end)}\n"
-            )
-            f.write(text + "\n\n")
-    return final_out
+                writer.write(seg)
+        writer.end()
+    return writer.count
+
+
+def write_segments(
+    segments: Iterable[dict] | CueTable,
+    output: str,
+    clean: bool,
+    fmt: str | None = None,
+) -> str:
+    """Write ``output`` in ``fmt``, plus a '.txt' beside it with
+    ``clean``; returns ``output``."""
+    write_sinks(segments, output_sinks(output, fmt, clean))
+    return output
+
+
+def convert_file(
+    src: str, dst: str, fmt: str, src_fmt: str | None = None
+) -> int:
+    """Re-encode one subtitle file in a single streaming pass.
+
+    Returns the number of cues written.
+    """
+    with open_output(dst) as f:
+        return write_cues(read_segments(src, src_fmt), f, fmt)
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_probe_cache(tmp_path, monkeypatch):
+    # never touch the user's real ~/.cache from tests
+    monkeypatch.setenv("APP_PROBE_CACHE", str(tmp_path / "probe.sqlite"))
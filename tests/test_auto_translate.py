@@ -0,0 +1,309 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("deepl")
+polib = pytest.importorskip("polib")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import auto_translate as at  # noqa: E402
+import extract_messages  # noqa: E402
+
+
+class FakeDeepL:
+    """Translates "hello" and echoes the rest; records each request."""
+
+    def __init__(self, fail_batches=False):
+        self.calls = []
+        self.fail_batches = fail_batches
+
+    def translate_text(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        if self.fail_batches and len(texts) > 1:
+            raise RuntimeError("413 request too large")
+        if any("boom" in t for t in texts):
+            raise RuntimeError("bad text")
+        return [t.replace("hello", "HOLA") for t in texts]
+
+
+PROTECTOR = at.Protector(["Whisper", "ffmpeg", "pip"])
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(at.time, "sleep", lambda s: None)
+
+
+def entries(*msgids):
+    po = polib.POFile()
+    for m in msgids:
+        po.append(polib.POEntry(msgid=m, msgstr=""))
+    return po
+
+
+def test_protector_tags_placeholders_and_terms_in_one_scan():
+    protector = at.Protector(["pip", "pipx", "openai-whisper", "Whisper"])
+    xml, restore = protector.protect("pip or pipx in a pipeline: {pip} {{ n }} openai-whisper, Whisper")
+    assert xml == (
+        '<term id="0"/> or <term id="1"/> in a pipeline: <ph id="2"/> <m id="3"/> '
+        '<term id="4"/>, <term id="5"/>'
+    )
+    assert restore['<term id="1"/>'] == "pipx" and restore['<m id="3"/>'] == "{{ n }}"
+    # DeepL may hand tags back with a space before the slash
+    assert at.restore_from_map(xml.replace('"/>', '" />'), restore).startswith("pip or pipx")
+
+
+def test_partial_terms_match_inside_words():
+    assert at.Protector(["pip"]).protect("pipeline")[0] == "pipeline"
+    assert at.Protector(["pip"], whole_words=False).protect("pipeline")[0] == '<term id="0"/>eline'
+
+
+def test_glossary_file(tmp_path):
+    path = tmp_path / "glossary.txt"
+    path.write_text("# brands\nDeepL\n\n  C#  \n", encoding="utf-8")
+    assert at.load_glossary(path) == ["DeepL", "C#"]
+    assert "ffmpeg" in at.load_glossary(at.GLOSSARY)
+
+
+def test_batches_respect_text_and_byte_limits():
+    pending = [at.prepare_entry(e, PROTECTOR) for e in entries(*[f"hello {i}" for i in range(7)])]
+    assert [len(b) for b in at.batches(pending, max_texts=3)] == [3, 3, 1]
+    one = at.request_size(pending[0].xml)
+    assert [len(b) for b in at.batches(pending, max_bytes=one * 2)] == [2, 2, 2, 1]
+
+
+def test_entries_keep_their_own_placeholders_and_terms():
+    po = entries("🎬 hello {name} via ffmpeg", "hello {{count}} from Whisper", "✅")
+    fake = FakeDeepL()
+    at.translate_entries(fake, [p for e in po if (p := at.prepare_entry(e, PROTECTOR))], "EN", "ES", "es")
+
+    assert len(fake.calls) == 1  # one request for both entries
+    assert [e.msgstr for e in po] == [
+        "🎬 HOLA {name} via ffmpeg",
+        "HOLA {{count}} from Whisper",
+        "✅",
+    ]
+
+
+def test_failed_batch_falls_back_to_single_entries(capsys):
+    po = entries("hello one", "boom", "hello two")
+    fake = FakeDeepL(fail_batches=True)
+    at.translate_entries(fake, [at.prepare_entry(e, PROTECTOR) for e in po], "EN", "ES", "es")
+
+    assert [e.msgstr for e in po] == ["HOLA one", "boom", "HOLA two"]
+    assert [e.fuzzy for e in po] == [False, True, False]  # retried next run
+    assert sum(len(c) > 1 for c in fake.calls) == 3  # the batch, retried
+    assert "failed for 'boom" in capsys.readouterr().out
+
+
+def test_rate_limiter_spaces_calls(monkeypatch):
+    clock = [100.0]
+    slept = []
+    monkeypatch.setattr(at.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(at.time, "sleep", slept.append)
+    limiter = at.RateLimiter(4)
+    for _ in range(3):
+        limiter.wait()
+    assert slept == [0.25, 0.5]
+
+
+@pytest.fixture
+def build(monkeypatch, tmp_path):
+    """Sources and locales under tmp_path; records each POT written."""
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "cli.py").write_text('_("Hello")\n')
+    base = tmp_path / "locales"
+    base.mkdir()
+    monkeypatch.setattr(at, "ROOT", src)
+    monkeypatch.setattr(at, "BASE", base)
+    monkeypatch.setattr(at, "POT", base / "messages.pot")
+    monkeypatch.setattr(at, "MANIFEST", base / ".build-manifest.json")
+    monkeypatch.setattr(at, "EXTRACT_CACHE", base / ".extract-cache.json")
+    monkeypatch.setenv("DEEPL_AUTH_KEY", "x")
+    monkeypatch.setattr(at.deepl, "Translator", lambda key: FakeDeepL())
+
+    calls = []
+
+    def write_pot(messages, path):
+        calls.append([m.msgid for m in messages])
+        extract_messages.write_pot(messages, path)
+
+    monkeypatch.setattr(at, "write_pot", write_pot)
+    return src, calls
+
+
+def fake_update(log, fail=(), incomplete=()):
+    def update(lang, translator, src, protector, memory, limiter):
+        log.append(lang)
+        if lang in fail:
+            raise RuntimeError("msgmerge exploded")
+        po, mo = at.lang_paths(lang)
+        po.parent.mkdir(parents=True, exist_ok=True)
+        po.write_text(f"po {lang}")
+        mo.write_text(f"mo {lang}")
+        return at.LangResult(2, 1, 1, int(lang in incomplete))
+
+    return update
+
+
+def test_locales_run_in_parallel_and_fail_alone(build, monkeypatch):
+    from click.testing import CliRunner
+
+    started = []
+    monkeypatch.setattr(at, "update_language", fake_update(started, fail={"fr"}))
+
+    res = CliRunner().invoke(at.auto_translate, ["-s", "en", "-l", "es,fr,de", "-j", "3"])
+    assert res.exit_code == 1
+    assert sorted(started) == ["de", "es", "fr"]
+    assert "[es] done, 2 strings translated in 1 DeepL requests, 1 reused" in res.output
+    assert "DeepL requests: 2;" in res.output
+    assert "[de] done" in res.output
+    assert "Failed locales: fr" in res.output
+
+
+def test_unchanged_run_skips_every_stage(build, monkeypatch):
+    from click.testing import CliRunner
+
+    src, pot_writes = build
+    updated = []
+    monkeypatch.setattr(at, "update_language", fake_update(updated))
+    args = ["-s", "en", "-l", "es,de"]
+
+    assert CliRunner().invoke(at.auto_translate, args).exit_code == 0
+    assert len(pot_writes) == 1 and sorted(updated) == ["de", "es"]
+
+    res = CliRunner().invoke(at.auto_translate, args)
+    assert res.exit_code == 0, res.output
+    assert len(pot_writes) == 1 and len(updated) == 2
+    assert "[es] up to date" in res.output
+
+    # a hand-edited catalog is rebuilt, the other one is not
+    at.lang_paths("de")[0].write_text("edited")
+    CliRunner().invoke(at.auto_translate, args)
+    assert updated[2:] == ["de"]
+
+    # touched sources with the same strings: the POT is regenerated but
+    # (creation date aside) unchanged, so no locale is rebuilt
+    (src / "cli.py").write_text('_("Hello")\n')
+    (src / "extra.py").write_text("")
+    pot = at.POT.read_bytes()
+    CliRunner().invoke(at.auto_translate, args)
+    assert len(pot_writes) == 2
+    assert at.POT.read_bytes() == pot and updated[3:] == []
+
+    # new strings change the POT and rebuild every locale
+    (src / "extra.py").write_text('_("Bye")\n')
+    CliRunner().invoke(at.auto_translate, args)
+    assert sorted(updated[3:]) == ["de", "es"]
+
+
+def test_incomplete_locale_is_retried(build, monkeypatch):
+    from click.testing import CliRunner
+
+    updated = []
+    args = ["-s", "en", "-l", "es,de"]
+    monkeypatch.setattr(at, "update_language", fake_update(updated, incomplete={"es"}))
+    res = CliRunner().invoke(at.auto_translate, args)
+    assert res.exit_code == 0, res.output
+    assert "[es] 1 strings left untranslated" in res.output
+
+    # DeepL failed on a string in es: only es runs again
+    monkeypatch.setattr(at, "update_language", fake_update(updated))
+    CliRunner().invoke(at.auto_translate, args)
+    assert updated[2:] == ["es"]
+    res = CliRunner().invoke(at.auto_translate, args)
+    assert updated[3:] == [] and "[es] up to date" in res.output
+
+
+def write_po(path, pairs, fuzzy=()):
+    po = polib.POFile()
+    for msgid, msgstr in pairs:
+        flags = ["fuzzy"] if msgid in fuzzy else []
+        po.append(polib.POEntry(msgid=msgid, msgstr=msgstr, flags=flags))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    po.save(str(path))
+
+
+def test_translation_memory_reuses_only_the_same_text(tmp_path):
+    write_po(
+        tmp_path / "es" / "LC_MESSAGES" / "messages.po",
+        [
+            ("🎬 Extracting subtitles from ", "🎬 Extrayendo subtítulos de "),
+            ("Subtitles saved to {output}", "Subtítulos guardados en {output}"),
+            ("Run ffmpeg first", "Ejecuta ffmpeg primero"),
+            ("Enable logging to the file", "Activar el registro en el archivo"),
+            ("Failed to clean 10 files", "No se pudieron limpiar 10 archivos"),
+            ("Old wording", "Viejo"),
+        ],
+        fuzzy={"Old wording"},
+    )
+    memory = at.TranslationMemory.from_catalogs(tmp_path, PROTECTOR)
+    assert len(memory) == 5  # the fuzzy one is not trusted
+
+    # the same text: new emoji prefix, different spacing
+    assert memory.lookup("es", "📺 Extracting subtitles from ") == "📺 Extrayendo subtítulos de "
+    assert memory.lookup("es", "Subtitles  saved to\n{output}") == "Subtítulos guardados en {output}"
+    # only case or trailing punctuation differ: adapted to the msgid
+    assert memory.lookup("es", "Subtitles saved to {output}.") == "Subtítulos guardados en {output}."
+    assert memory.lookup("es", "enable logging to the file:") == "activar el registro en el archivo:"
+    # similar strings are not the same text
+    for near in ("Disable logging to the file", "Failed to clean 19 files", "Run Whisper first"):
+        assert memory.lookup("es", near) is None
+    # the placeholder or protected term differs in case
+    assert memory.lookup("es", "Subtitles saved to {OUTPUT}") is None
+    assert memory.lookup("es", "Run FFMPEG first") is None
+    assert memory.lookup("es", "Old wording") is None
+    assert memory.lookup("fr", "Run ffmpeg first") is None
+
+
+def update_es(tmp_path, monkeypatch, pairs, fuzzy=(), translator=None):
+    monkeypatch.setattr(at, "BASE", tmp_path)
+    po_path, mo_path = at.lang_paths("es")
+    write_po(po_path, pairs, fuzzy=fuzzy)
+
+    def msgmerge(cmd):  # nothing new in the POT
+        out = cmd[cmd.index("--output-file") + 1]
+        with open(cmd[-2], "rb") as src, open(out, "wb") as dst:
+            dst.write(src.read())
+
+    monkeypatch.setattr(at, "run", msgmerge)
+    memory = at.TranslationMemory.from_catalogs(tmp_path, PROTECTOR)
+    fake = translator or FakeDeepL()
+    result = at.update_language("es", fake, "EN", PROTECTOR, memory)
+    return result, fake, polib.pofile(str(po_path)), mo_path
+
+
+def test_update_language_only_sends_unmatched_strings(tmp_path, monkeypatch):
+    result, fake, po, mo_path = update_es(
+        tmp_path,
+        monkeypatch,
+        [("Saved to {output}", "Guardado en {output}"), ("📝 Saved  to {output}", ""), ("hello world", "")],
+    )
+    assert result == at.LangResult(translated=1, reused=1, requests=1)
+    assert fake.calls == [["hello world"]]
+    assert po.find("📝 Saved  to {output}").msgstr == "📝 Guardado en {output}"
+    assert po.find("hello world").msgstr == "HOLA world"
+    assert mo_path.exists()
+
+
+def test_fuzzy_entries_from_msgmerge_are_filled_without_deepl(tmp_path, monkeypatch):
+    # msgmerge carried the old translation over to the reworded msgid
+    # and flagged it fuzzy
+    result, fake, po, mo_path = update_es(
+        tmp_path,
+        monkeypatch,
+        [
+            ("Failed to clean 10 files", "No se pudieron limpiar 10 archivos"),
+            ("Failed to clean 10 files.", "No se pudieron limpiar 10 archivos"),
+            ("Failed to clean 19 files", "No se pudieron limpiar 10 archivos"),
+        ],
+        fuzzy={"Failed to clean 10 files.", "Failed to clean 19 files"},
+    )
+    assert result == at.LangResult(translated=1, reused=1, requests=1)
+    assert fake.calls == [["Failed to clean 19 files"]]
+    period = po.find("Failed to clean 10 files.")
+    assert period.msgstr == "No se pudieron limpiar 10 archivos." and not period.fuzzy
+    assert polib.mofile(str(mo_path)).find("Failed to clean 10 files.").msgstr == period.msgstr
\ No newline at end of file
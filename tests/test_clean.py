@@ -76,3 +76,45 @@ def test_clean_accepts_txt_input(tmp_path, runner):
     expected = txt_in.parent / (txt_in.name[:-4] + ".txt")
     assert expected.exists()
     assert expected.read_text(encoding="utf-8").strip() == "Hello\nWorld"
+
+
+SRT = "1\n00:00:00,000 --> 00:00:01,000\n{}\n\n"
+
+
+def test_clean_folder_in_parallel(tmp_path, runner):
+    (tmp_path / "s1").mkdir()
+    (tmp_path / "a.srt").write_text(SRT.format("A"), encoding="utf-8")
+    (tmp_path / "s1" / "b.srt").write_text(SRT.format("B"), encoding="utf-8")
+    (tmp_path / "notes.md").write_text("skip me", encoding="utf-8")
+
+    res = runner.invoke(app, ["clean", str(tmp_path), "--jobs", "2"])
+    assert res.exit_code == 0, res.output
+    assert (tmp_path / "a.txt").read_text(encoding="utf-8") == "A\n"
+    assert (tmp_path / "s1" / "b.txt").read_text(encoding="utf-8") == "B\n"
+    assert not (tmp_path / "notes.txt").exists()
+
+
+def test_clean_glob_mirrors_into_output_folder(tmp_path, runner):
+    (tmp_path / "x.srt").write_text(SRT.format("X"), encoding="utf-8")
+    (tmp_path / "y.vtt").write_text("WEBVTT\n\n00:01.000 --> 00:02.000\nY\n", encoding="utf-8")
+    (tmp_path / "z.ass").write_text("not really ass", encoding="utf-8")
+    out = tmp_path / "out"
+
+    res = runner.invoke(
+        app, ["clean", str(tmp_path / "*.[sv][rt][t]"), "--output", str(out), "--jobs", "1"]
+    )
+    assert res.exit_code == 0, res.output
+    assert (out / "x.txt").read_text(encoding="utf-8") == "X\n"
+    assert (out / "y.txt").read_text(encoding="utf-8") == "Y\n"
+    assert not (out / "z.txt").exists()
+
+
+def test_clean_streams_in_batches(tmp_path, monkeypatch):
+    import functions.write as write_module
+
+    monkeypatch.setattr(write_module, "WRITE_BATCH", 2)
+    src = tmp_path / "long.srt"
+    src.write_text("".join(SRT.format(f"line {i}") for i in range(5)), encoding="utf-8")
+    clean_srt_file_to_txt(str(src))
+    expected = "".join(f"line {i}\n" for i in range(5))
+    assert (tmp_path / "long.txt").read_text(encoding="utf-8") == expected
@@ -82,3 +82,60 @@ def test_help_text_customized():
     assert r.exit_code == 0
     assert "📖 Show this help and exit." in r.output
     assert "🌐 Interface language" in r.output
+
+
+@pytest.fixture
+def spanish_catalog(monkeypatch, tmp_path):
+    polib = pytest.importorskip("polib")
+    from functions import i18n
+
+    po = polib.POFile()
+    po.metadata = {"Content-Type": "text/plain; charset=UTF-8"}
+    for msgid, msgstr in [
+        ("📖 Show this help and exit.", "📖 Mostrar esta ayuda y salir."),
+        ("- Transcribe subtitles from video or audio", "- Transcribir subtítulos de video o audio"),
+        ("Language hint for transcription", "Idioma para la transcripción"),
+    ]:
+        po.append(polib.POEntry(msgid=msgid, msgstr=msgstr))
+    (tmp_path / "es" / "LC_MESSAGES").mkdir(parents=True)
+    po.save_as_mofile(str(tmp_path / "es" / "LC_MESSAGES" / "messages.mo"))
+    monkeypatch.setattr(i18n, "LOCALEDIR", str(tmp_path))
+    return i18n
+
+
+@pytest.mark.parametrize(
+    "args, env",
+    [
+        (["--lang", "es", "--help"], {}),
+        (["--help", "--lang", "es"], {}),
+        (["--help"], {"APP_LANG": "es"}),
+        (["--lang", "es"], {}),
+    ],
+)
+def test_lang_translates_help_in_process(spanish_catalog, runner, args, env):
+    res = runner.invoke(app, args, env=env)
+    assert res.exit_code == 0
+    assert "📖 Mostrar esta ayuda y salir." in res.output
+    assert "- Transcribir subtítulos" in res.output
+
+    # the next run is back in English
+    assert "📖 Show this help and exit." in runner.invoke(app, ["--help"]).output
+
+
+def test_lang_translates_subcommand_help(spanish_catalog, runner):
+    res = runner.invoke(app, ["--lang", "es", "transcribe", "--help"])
+    assert "Idioma para la transcripción (e.g., en, es, zh)." in res.output
+
+
+def test_catalog_is_loaded_once_per_language(spanish_catalog, monkeypatch, runner):
+    loads = []
+    translation = spanish_catalog.gettext.translation
+    monkeypatch.setattr(
+        spanish_catalog.gettext,
+        "translation",
+        lambda *a, **kw: loads.append(kw["languages"]) or translation(*a, **kw),
+    )
+    spanish_catalog.catalog.cache_clear()
+    for _ in range(3):
+        runner.invoke(app, ["--lang", "es", "--help"])
+    assert loads == [["es"]]
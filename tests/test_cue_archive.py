@@ -0,0 +1,90 @@
+import os
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cli as cli_module  # noqa: E402
+from functions.cue_archive import (  # noqa: E402
+    CueArchive,
+    is_fresh,
+    sidecar_path,
+    write_archive,
+)
+from functions.cues import CueTable  # noqa: E402
+
+app = cli_module.cli
+
+
+def table():
+    segs = [{"start": i * 10.0, "end": i * 10.0 + 2, "text": f"line {i % 7}"} for i in range(1000)]
+    segs[500] = {"start": 4990.0, "end": 5030.0, "text": "long sign ✓"}  # out of order, long
+    return CueTable.from_segments(segs)
+
+
+@pytest.fixture
+def runner():
+    return CliRunner()
+
+
+def test_lookup_by_number_and_time(tmp_path):
+    path = write_archive(table(), tmp_path / "a.cues")
+    with CueArchive(path) as arc:
+        assert len(arc) == 1000
+        assert arc.cue(1) == {"start": 0.0, "end": 2.0, "text": "line 0"}
+        assert arc.cue(501)["text"] == "long sign ✓"
+        with pytest.raises(IndexError):
+            arc.cue(1001)
+        # 5020-5021 only the long cue (which started earlier) is on screen
+        assert [n for n, _ in arc.between(5020, 5021)] == [501, 503]
+        assert [n for n, _ in arc.around(5000, 2)] == [500, 501, 502, 503]
+
+
+def test_empty_table(tmp_path):
+    path = write_archive(CueTable(), tmp_path / "e.cues")
+    with CueArchive(path) as arc:
+        assert len(arc) == 0 and arc.between(0, 100) == []
+
+
+def test_rejects_other_files(tmp_path):
+    bad = tmp_path / "x.cues"
+    bad.write_bytes(b"1\n00:00:00,000 --> 00:00:01,000\nhi\n")
+    with pytest.raises(ValueError):
+        CueArchive(bad)
+
+
+def test_cues_command_builds_and_refreshes_sidecar(tmp_path, runner):
+    srt = tmp_path / "movie.srt"
+    srt.write_text(
+        "1\n00:00:01,000 --> 00:00:02,000\nOne\n\n"
+        "2\n01:23:44,000 --> 01:23:46,000\nTwo\n\n",
+        encoding="utf-8",
+    )
+    res = runner.invoke(app, ["cues", str(srt), "--at", "01:23:45", "--around", "1"])
+    assert res.exit_code == 0, res.output
+    assert res.stdout == "2\n01:23:44,000 --> 01:23:46,000\nTwo\n\n"
+    res = runner.invoke(app, ["cues", str(srt), "--from", "0:00:01.5", "--to", "1:00:00"])
+    assert res.stdout == "1\n00:00:01,000 --> 00:00:02,000\nOne\n\n"
+    assert is_fresh(sidecar_path(srt), srt)
+
+    srt.write_text("1\n00:00:05,000 --> 00:00:06,000\nNew\n\n", encoding="utf-8")
+    os.utime(srt, ns=(1, 1))
+    res = runner.invoke(app, ["cues", str(srt), "--number", "1"])
+    assert "New" in res.stdout
+
+
+def test_cues_needs_one_mode(tmp_path, runner):
+    srt = tmp_path / "movie.srt"
+    srt.write_text("1\n00:00:01,000 --> 00:00:02,000\nOne\n\n", encoding="utf-8")
+    res = runner.invoke(app, ["cues", str(srt), "--at", "1", "--number", "1"])
+    assert res.exit_code != 0
+
+
+def test_archive_command_skips_fresh(tmp_path, runner):
+    (tmp_path / "a.srt").write_text("1\n00:00:01,000 --> 00:00:02,000\nOne\n\n", encoding="utf-8")
+    res = runner.invoke(app, ["archive", str(tmp_path)])
+    assert "Wrote 1 sidecars; 0 already" in res.output
+    res = runner.invoke(app, ["archive", str(tmp_path)])
+    assert "Wrote 0 sidecars; 1 already" in res.output
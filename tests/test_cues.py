@@ -0,0 +1,56 @@
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from functions.cues import CueTable  # noqa: E402
+from functions.formats import FORMAT_NAMES, write_cues  # noqa: E402
+from functions.write import output_sinks, write_sinks  # noqa: E402
+
+WHISPER = [
+    {"id": 0, "seek": 0, "start": 0.0, "end": 1.5, "text": " Hello", "tokens": [50364, 2425], "avg_logprob": -0.2},
+    {"id": 1, "seek": 0, "start": 1.5, "end": 3.0, "text": " ♪", "tokens": [50439, 3], "no_speech_prob": 0.9},
+    {"id": 2, "seek": 0, "start": 3.0, "end": 4.25, "text": " ♪", "tokens": [50514, 3], "compression_ratio": 1.1},
+]
+PLAIN = [
+    {"start": 0.0, "end": 1.5, "text": "Hello"},
+    {"start": 1.5, "end": 3.0, "text": "♪"},
+    {"start": 3.0, "end": 4.25, "text": "♪"},
+]
+
+
+def test_table_keeps_only_timing_and_pooled_text():
+    table = CueTable.from_segments(WHISPER)
+    assert len(table) == 3
+    assert table.pool == ["Hello", "♪"]
+    assert list(table) == PLAIN
+    assert dict(table[-1]) == PLAIN[-1]
+    assert table[0].get("tokens") is None
+    with pytest.raises(IndexError):
+        table[3]
+
+
+def test_from_columns_accepts_numpy_and_offsets():
+    starts = np.array([[0.0, 9.0], [1.0, 9.0]])[:, 0]  # strided view
+    table = CueTable.from_columns(starts, np.array([0.5, 1.5]), ["a", "b"])
+    assert [c.start for c in table] == [0.0, 1.0]
+    shifted = CueTable.from_segments(PLAIN, offset=10)
+    assert shifted[2]["start"] == 13.0
+
+
+@pytest.mark.parametrize("fmt", [*FORMAT_NAMES, "txt"])
+def test_writers_give_same_output_for_table_and_dicts(fmt):
+    a, b = io.StringIO(), io.StringIO()
+    assert write_cues(CueTable.from_segments(WHISPER), a, fmt) == 3
+    write_cues(PLAIN, b, fmt)
+    assert a.getvalue() == b.getvalue()
+
+
+def test_write_sinks_takes_a_table(tmp_path):
+    out, txt = tmp_path / "a.srt", tmp_path / "a.txt"
+    assert write_sinks(CueTable.from_segments(WHISPER), output_sinks(str(out), clean=True)) == 3
+    assert txt.read_text(encoding="utf-8") == "Hello\n♪\n♪\n"
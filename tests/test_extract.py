@@ -2,14 +2,23 @@ import os
 import subprocess
 import sys
 import tempfile
+import threading
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import numpy as np
 import pytest
 from click.testing import CliRunner
 
 import cli as cli_module
+from functions.preload import (
+    AudioDecoder,
+    BackgroundTask,
+    WhisperPreloader,
+)
+from functions.probe import MediaInfo
 
 app = cli_module.cli
 TEST_VIDEO_PATH = "../baldursGate.mp4"
@@ -21,6 +30,13 @@ def runner():
     return CliRunner()
 
 
+@pytest.fixture(autouse=True)
+def no_ffprobe():
+    # has_subtitles is patched per test; keep the real probe out of it
+    with patch("cli.probe_media", side_effect=lambda path: MediaInfo(path)):
+        yield
+
+
 @pytest.mark.skipif(not os.path.exists(TEST_VIDEO_PATH), reason="Test video not available")
 def test_extract_command_success(runner):
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -87,20 +103,23 @@ def test_extract_fallback_transcribe_clean(mock_has, mock_load, runner, tmp_path
     assert "-->" not in data
 
 
+@patch("cli.stream_subtitles")
 @patch("cli.subprocess.run")
 @patch("cli.has_subtitles", return_value=True)
-def test_extract_clean_converts_existing_srt_to_txt(mock_has, mock_run, runner, tmp_path):
+def test_extract_clean_converts_existing_srt_to_txt(mock_has, mock_run, mock_stream, runner, tmp_path):
     video = tmp_path / "v.mp4"
     video.write_bytes(b"\x00\x00\x00\x20ftyp")
 
-    out_srt = tmp_path / "out.srt"
-    out_srt.write_text(
-        "1\n00:00:00,000 --> 00:00:00,500\nHi\n\n2\n00:00:00,500 --> 00:00:01,000\nThere\n",
-        encoding="utf-8",
+    # the track is streamed once into both files, never read back
+    mock_stream.return_value = iter(
+        [{"start": 0.0, "end": 0.5, "text": "Hi"}, {"start": 0.5, "end": 1.0, "text": "There"}]
     )
+    out_srt = tmp_path / "out.srt"
 
     res = runner.invoke(app, ["extract", str(video), "--output", str(out_srt), "--clean"])
     assert res.exit_code == 0, res.output
+    mock_run.assert_not_called()
+    assert "There" in out_srt.read_text(encoding="utf-8")
 
     out_txt = tmp_path / "out.txt"
     assert out_txt.exists()
@@ -119,9 +138,84 @@ def test_extract_prefers_ffmpeg_when_subs_present(mock_whisper, mock_has_subs, m
     res = runner.invoke(app, ["extract", str(video), "--output", str(out)])
     assert res.exit_code == 0
     mock_run.assert_called_once()
+    # the model may be preloaded speculatively, but never used
+    assert not mock_whisper.return_value.transcribe.called
+
+
+@patch("cli.subprocess.run")
+@patch("cli.has_subtitles", return_value=True)
+@patch("cli.whisper.load_model")
+def test_extract_no_preload_skips_model_load(mock_whisper, mock_has_subs, mock_run, runner, tmp_path):
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b"\x00\x00\x00\x20ftyp")
+    out = tmp_path / "out.srt"
+    res = runner.invoke(app, ["extract", str(video), "--output", str(out), "--no-preload"])
+    assert res.exit_code == 0
     assert not mock_whisper.called
 
 
+@patch("cli.AudioDecoder")
+@patch("cli.whisper.load_model")
+@patch("cli.probe_media")
+def test_extract_preloads_model_and_audio_while_probing(mock_probe, mock_load, mock_decoder, runner, tmp_path):
+    loading, decoding = threading.Event(), threading.Event()
+    samples = np.array([0, 16384, -32768], dtype=np.int16)
+    mock_model = MagicMock()
+    mock_model.transcribe.return_value = {"segments": [{"start": 0, "end": 1, "text": "early"}]}
+
+    def slow_load(name):
+        loading.set()
+        return mock_model
+
+    def decode():
+        decoding.set()
+        return samples
+
+    def probe(path):
+        # both have to start before probing finishes
+        assert loading.wait(timeout=5) and decoding.wait(timeout=5)
+        return MediaInfo(path, ok=True)
+
+    mock_load.side_effect = slow_load
+    mock_decoder.return_value = MagicMock(side_effect=decode)
+    mock_probe.side_effect = probe
+
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b"\x00\x00\x00\x20ftyp")
+    out = tmp_path / "out.srt"
+    res = runner.invoke(app, ["extract", str(video), "--output", str(out)])
+    assert res.exit_code == 0, res.output
+    assert "early" in out.read_text()
+    mock_load.assert_called_once_with("base")
+    audio = mock_model.transcribe.call_args[0][0]
+    assert audio.dtype == np.float32 and audio.tolist() == [0.0, 0.5, -1.0]
+
+
+def test_cancelled_model_load_is_abandoned():
+    release = threading.Event()
+    model = object()
+    preloader = WhisperPreloader(lambda: release.wait(5) and model).start()
+    preloader.cancel()  # returns while the load is still running
+    release.set()
+    assert preloader.model._done.wait(timeout=5)
+    assert preloader.model._value is None  # the late model is dropped
+    with pytest.raises(RuntimeError):
+        preloader.get_model()
+
+
+def test_cancel_kills_the_audio_decode():
+    decoder = AudioDecoder("v.mp4")
+    decoder.cmd = [sys.executable, "-c", "import time; time.sleep(60)"]
+    task = BackgroundTask(decoder).start()
+    while decoder._proc is None:
+        time.sleep(0.01)
+    task.cancel()
+    assert decoder._proc.wait(timeout=5) != 0
+    assert task._done.wait(timeout=5)
+    with pytest.raises(RuntimeError):
+        task.result()
+
+
 @patch("cli.whisper.load_model")
 @patch("cli.subprocess.run", side_effect=subprocess.CalledProcessError(1, "ffmpeg"))
 @patch("cli.has_subtitles", return_value=True)
@@ -0,0 +1,112 @@
+import os
+import sys
+
+import pytest
+
+polib = pytest.importorskip("polib")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import extract_messages as em  # noqa: E402
+
+SOURCE = '''\
+import click
+
+
+def greet(name):
+    click.echo(_("Hello {name}").format(name=name))
+    click.echo(_("Long help text, "
+                 "split over lines") + _("!"))
+    click.echo(_(name))  # not a literal
+    click.echo(_("Joined " + "with plus"))
+    click.echo(f"{_('Hello {name}')}")
+    return gettext("other keyword")
+
+
+@click.command(help=_l("Lazy help"))
+def cmd():
+    pass
+'''
+
+
+def test_parse_messages_literals_in_source_order():
+    assert em.parse_messages(SOURCE.encode(), "cli.py") == [
+        ("Hello {name}", 5),
+        ("Long help text, split over lines", 6),
+        ("!", 7),
+        ("Joined with plus", 9),
+        ("Hello {name}", 10),
+        ("Lazy help", 14),
+    ]
+
+
+def test_pot_merges_occurrences_and_flags_brace_format(tmp_path):
+    (tmp_path / "cli.py").write_text(SOURCE)
+    (tmp_path / "other.py").write_text('_("!")\n')
+    extraction = em.extract([str(tmp_path / "cli.py"), str(tmp_path / "other.py")], tmp_path)
+    em.write_pot(extraction.messages, tmp_path / "messages.pot")
+
+    pot = polib.pofile(str(tmp_path / "messages.pot"))
+    assert [e.msgid for e in pot] == [
+        "Hello {name}",
+        "Long help text, split over lines",
+        "!",
+        "Joined with plus",
+        "Lazy help",
+    ]
+    hello = pot.find("Hello {name}")
+    assert hello.occurrences == [("cli.py", "5"), ("cli.py", "10")]
+    assert hello.flags == ["python-brace-format"]
+    assert pot.find("!").occurrences == [("cli.py", "7"), ("other.py", "1")]
+    assert pot.find("!").flags == []
+
+
+def test_cache_skips_unchanged_files(tmp_path, monkeypatch):
+    a, b = tmp_path / "a.py", tmp_path / "b.py"
+    a.write_text('_("A")\n')
+    b.write_text('_("B")\n')
+    cache = tmp_path / "cache.json"
+    sources = [str(a), str(b)]
+
+    first = em.extract(sources, tmp_path, cache)
+    assert first.parsed == 2
+
+    def no_parse(data, filename):
+        raise AssertionError(f"{filename} parsed again")
+
+    monkeypatch.setattr(em, "parse_messages", no_parse)
+    again = em.extract(sources, tmp_path, cache)
+    assert again.parsed == 0 and again.messages == first.messages
+
+    # rewritten with the same contents: hashed, not parsed
+    a.write_text('_("A")\n')
+    os.utime(a, ns=(0, 0))
+    assert em.extract(sources, tmp_path, cache).digest() == first.digest()
+
+    monkeypatch.undo()
+    b.write_text('_("B2")\n')
+    changed = em.extract(sources, tmp_path, cache)
+    assert changed.parsed == 1
+    assert [m.msgid for m in changed.messages] == ["A", "B2"]
+    assert changed.digest() != first.digest()
+
+
+def test_unparsable_file_is_skipped(tmp_path, capsys):
+    good, bad = tmp_path / "good.py", tmp_path / "bad.py"
+    good.write_text('_("ok")\n')
+    bad.write_text('_("broken"\n')
+    extraction = em.extract([str(good), str(bad)], tmp_path)
+    assert [m.msgid for m in extraction.messages] == ["ok"]
+    assert "bad.py" in extraction.hashes
+    assert "Skipping bad.py" in capsys.readouterr().err
+
+
+def test_many_files_are_parsed_in_a_process_pool(tmp_path):
+    sources = []
+    for i in range(em.PARALLEL_MIN):
+        path = tmp_path / f"m{i:02d}.py"
+        path.write_text(f'_("message {i}")\n')
+        sources.append(str(path))
+    extraction = em.extract(sources, tmp_path, jobs=2)
+    assert extraction.parsed == em.PARALLEL_MIN
+    assert [m.msgid for m in extraction.messages] == [f"message {i}" for i in range(em.PARALLEL_MIN)]
@@ -0,0 +1,115 @@
+import io
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import cli as cli_module  # noqa: E402
+from functions.follow import (  # noqa: E402
+    SAMPLE_RATE,
+    pcm_command,
+    split_final,
+    transcribe_stream,
+)
+
+app = cli_module.cli
+
+
+@pytest.fixture
+def runner():
+    return CliRunner()
+
+
+def pcm(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16).tobytes()
+
+
+class FakeModel:
+    """Emits one segment per full second of audio it is given."""
+
+    def __init__(self):
+        self.durations = []
+
+    def transcribe(self, audio, language=None):
+        duration = len(audio) / SAMPLE_RATE
+        self.durations.append(duration)
+        segs = [
+            {"start": float(i), "end": float(i + 1), "text": f"s{len(self.durations)}-{i}"}
+            for i in range(int(duration))
+        ]
+        return {"segments": segs}
+
+
+def test_pcm_command_follows_files_and_reads_stdin():
+    cmd = pcm_command("/rec/live.ts", idle_timeout=5)
+    assert cmd[cmd.index("-follow") + 1] == "1"
+    assert cmd[cmd.index("-rw_timeout") + 1] == "5000000"
+    assert "file:/rec/live.ts" in cmd
+    assert "pipe:0" in pcm_command("-")
+    assert "-follow" not in pcm_command("-")
+
+
+def test_split_final_holds_back_edge_segment():
+    segs = [{"start": 0.0, "end": 2.0}, {"start": 4.5, "end": 6.0}]
+    final, carry = split_final(segs, 6.0, eof=False, max_carry=3.0)
+    assert final == segs[:1]
+    assert carry == 4.5
+
+
+def test_split_final_bounds_carry():
+    segs = [{"start": 0.5, "end": 6.0}]
+    final, carry = split_final(segs, 6.0, eof=False, max_carry=3.0)
+    assert final == segs
+    assert carry == 6.0
+
+
+def test_split_final_flushes_everything_at_eof():
+    segs = [{"start": 4.5, "end": 6.0}]
+    assert split_final(segs, 6.0, eof=True, max_carry=3.0) == (segs, 6.0)
+
+
+def test_transcribe_stream_appends_cues_with_absolute_times(tmp_path):
+    model = FakeModel()
+    out = tmp_path / "live.srt"
+    transcribe_stream(io.BytesIO(pcm(14)), model, "en", str(out), window=6.0)
+
+    text = out.read_text(encoding="utf-8")
+    blocks = [b for b in text.strip().split("\n\n") if b]
+    # numbering is continuous across windows
+    assert [b.splitlines()[0] for b in blocks] == [str(i) for i in range(1, len(blocks) + 1)]
+    # no window ever exceeds window + max_carry
+    assert max(model.durations) <= 9.0
+    # the last cue ends at the end of the input
+    assert blocks[-1].splitlines()[1].endswith("00:00:14,000")
+
+
+def test_transcribe_stream_clean_also_writes_txt(tmp_path):
+    out = tmp_path / "live.srt"
+    transcribe_stream(io.BytesIO(pcm(14)), FakeModel(), "en", str(out), clean=True, window=6.0)
+
+    srt = out.read_text(encoding="utf-8")
+    txt = (tmp_path / "live.txt").read_text(encoding="utf-8")
+    assert "-->" in srt and "-->" not in txt
+    assert txt.splitlines() == [b.splitlines()[2] for b in srt.strip().split("\n\n")]
+
+
+@patch("cli.follow_transcribe")
+@patch("cli.whisper.load_model")
+def test_transcribe_follow_dispatches(mock_load, mock_follow, runner, tmp_path):
+    video = tmp_path / "rec.ts"
+    video.write_bytes(b"\x47")
+    out = tmp_path / "live.srt"
+    res = runner.invoke(app, ["transcribe", str(video), "--output", str(out), "--follow", "--window", "4"])
+    assert res.exit_code == 0, res.output
+    args = mock_follow.call_args[0]
+    assert args[0] == str(video) and args[3] == str(out) and args[5] == 4.0
+
+
+def test_transcribe_stdin_requires_follow(runner, tmp_path):
+    res = runner.invoke(app, ["transcribe", "-", "--output", str(tmp_path / "o.srt")])
+    assert res.exit_code != 0
+    assert "--follow" in res.output
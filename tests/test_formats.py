@@ -0,0 +1,156 @@
+import io
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import cli as cli_module  # noqa: E402
+from functions.format_timestamp import format_timestamp  # noqa: E402
+from functions.formats import (  # noqa: E402
+    FORMAT_NAMES,
+    READERS,
+    ass_text_to_srt,
+    read_ass,
+    read_json,
+    read_vtt,
+    timestamps,
+    write_cues,
+)
+
+app = cli_module.cli
+SEGMENTS = [
+    {"start": 1.0, "end": 2.5, "text": "<i>Hi</i> & <b>you</b>\nline two"},
+    {"start": 3.0, "end": 4.0, "text": "Bye"},
+]
+
+
+@pytest.fixture
+def runner():
+    return CliRunner()
+
+ASS = """\ufeff[Script Info]
+ScriptType: v4.00+
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline
+Style: Default,Arial,20,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0
+Style: Thoughts,Arial,20,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,-1,0
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Comment: 0,0:00:00.00,0:00:01.00,Default,,0,0,0,,ignored
+Dialogue: 0,0:00:01.50,0:00:03.00,Default,,0,0,0,,{\\an8}Hello, {\\b1}world{\\b0}!\\NSecond line
+Dialogue: 0,0:00:04.00,0:00:05.25,Thoughts,,0,0,0,,I wonder...
+Dialogue: 0,0:00:06.00,0:00:07.00,Default,,0,0,0,,{\\p1}m 0 0 l 10 10{\\p0}
+"""
+
+VTT = """WEBVTT
+Kind: captions
+
+STYLE
+::cue { color: yellow }
+
+NOTE a comment
+spanning lines
+
+intro
+00:01.000 --> 00:02.500 align:start
+<v Bob>Hi <i>there</i> &amp; <c.loud>welcome</c>
+
+01:00:00.000 --> 01:00:01.000
+Last
+"""
+
+
+def test_read_ass_converts_styling_and_skips_drawings():
+    segs = list(read_ass(ASS.splitlines(True)))
+    assert segs == [
+        {"start": 1.5, "end": 3.0, "text": "Hello, <b>world</b>!\nSecond line"},
+        {"start": 4.0, "end": 5.25, "text": "<i>I wonder...</i>"},
+    ]
+
+
+def test_ass_override_tags_stay_balanced():
+    out = ass_text_to_srt(r"{\i1}a{\c&H0000FF&}b{\r}c")
+    assert out == '<i>a<font color="#FF0000">b</font></i>c'
+
+
+def test_read_vtt_keeps_basic_tags_only():
+    segs = list(read_vtt(VTT.splitlines(True)))
+    assert segs == [
+        {"start": 1.0, "end": 2.5, "text": "Hi <i>there</i> & welcome"},
+        {"start": 3600.0, "end": 3601.0, "text": "Last"},
+    ]
+
+
+@pytest.mark.parametrize("fmt", FORMAT_NAMES)
+def test_writers_round_trip(fmt):
+    buf = io.StringIO()
+    assert write_cues(SEGMENTS, buf, fmt) == 2
+    assert list(READERS[fmt](io.StringIO(buf.getvalue()))) == SEGMENTS
+
+
+def test_bulk_timestamps_match_format_timestamp():
+    values = [0, 0.0004, 0.0005, 0.9995, 59.9996, 3599.9995, 3600, 86399.999, 360000.5]
+    assert timestamps(values) == [format_timestamp(v) for v in values]
+
+
+def test_srt_writer_batches_match_single_cues():
+    segments = [
+        {"start": i * 1.0011, "end": i * 1.0011 + 0.5, "text": f"line {i}"}
+        for i in range(5000)
+    ]
+    buf = io.StringIO()
+    assert write_cues(segments, buf, "srt") == 5000
+    expected = "".join(
+        f"{i}\n{format_timestamp(s['start'])} --> {format_timestamp(s['end'])}\n"
+        f"{s['text']}\n\n"
+        for i, s in enumerate(segments, 1)
+    )
+    assert buf.getvalue() == expected
+
+
+def test_read_json_streams_across_chunk_boundaries():
+    buf = io.StringIO()
+    write_cues(SEGMENTS, buf, "json")
+    text = buf.getvalue()
+    chunks = [text[i : i + 7] for i in range(0, len(text), 7)]  # noqa: E203
+    assert list(read_json(chunks)) == SEGMENTS
+
+
+def test_read_json_accepts_whisper_output():
+    doc = '{"text": "x", "segments": [{"id": 0, "start": 0, "end": 1.5, "text": " Hi"}]}'
+    assert list(read_json(io.StringIO(doc))) == [{"start": 0.0, "end": 1.5, "text": "Hi"}]
+
+
+def test_convert_folder_mirrors_tree(runner, tmp_path):
+    src = tmp_path / "in"
+    (src / "season1").mkdir(parents=True)
+    (src / "season1" / "e1.srt").write_text("1\n00:00:01,000 --> 00:00:02,000\nHello\n\n", encoding="utf-8")
+    (src / "notes.txt").write_text("not subtitles", encoding="utf-8")
+    res = runner.invoke(app, ["convert", str(src), "--format", "vtt", "--output", str(tmp_path / "out")])
+    assert res.exit_code == 0, res.output
+    assert (tmp_path / "out" / "season1" / "e1.vtt").read_text() == "WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nHello\n\n"
+    assert not (tmp_path / "out" / "notes.vtt").exists()
+
+
+def test_convert_file_to_stdout(runner, tmp_path):
+    srt = tmp_path / "a.srt"
+    srt.write_text("1\n00:00:01,000 --> 00:00:02,000\nHello\n\n", encoding="utf-8")
+    res = runner.invoke(app, ["convert", str(srt), "--format", "json", "--output", "-"])
+    assert res.exit_code == 0, res.output
+    assert res.stdout == '[\n{"start": 1.0, "end": 2.0, "text": "Hello"}\n]\n'
+
+
+@patch("cli.whisper.load_model")
+def test_transcribe_writes_format_from_suffix(mock_load, runner, tmp_path):
+    mock_load.return_value.transcribe.return_value = {"segments": [{"start": 0, "end": 1, "text": "heard"}]}
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b"")
+    out = tmp_path / "t.ass"
+    res = runner.invoke(app, ["transcribe", str(video), "--output", str(out)])
+    assert res.exit_code == 0, res.output
+    assert out.read_text().endswith("Dialogue: 0,0:00:00.00,0:00:01.00,Default,,0,0,0,,heard\n")
@@ -0,0 +1,207 @@
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import cli as cli_module  # noqa: E402
+from functions.bitmap_subs import (  # noqa: E402
+    PAD,
+    Bitmap,
+    _dvb_field,
+    demux_packets,
+    display_cues,
+    dvb_events,
+    dvd_events,
+    dvd_palette,
+    parse_sections,
+    pgs_events,
+    read_packets,
+    render,
+)
+from functions.ocr import ocr_segments, tesseract_lang  # noqa: E402
+from functions.probe import MediaInfo, SubtitleStream  # noqa: E402
+
+app = cli_module.cli
+WHITE = bytes([255] * 256)
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+@pytest.fixture
+def runner():
+    return CliRunner()
+
+
+def seg(kind, payload):
+    return bytes([kind, len(payload) >> 8, len(payload) & 255]) + payload
+
+
+def pgs_display_set(objects=1):
+    # 4x2 object: row 0 = four pixels of colour 1, row 1 = transparent
+    rle = bytes([0, 0x84, 1, 0, 0]) + bytes([0, 0x04, 0, 0])
+    pcs = bytes([0, 4, 0, 2, 0x10, 0, 1, 0x80, 0, 0, objects])
+    pcs += bytes([0, 0, 0, 0, 0, 5, 0, 7]) * objects
+    pds = bytes([0, 0, 1, 235, 128, 128, 255, 2, 16, 128, 128, 255])
+    ods = bytes([0, 0, 0, 0xC0, 0, 0, len(rle) + 4, 0, 4, 0, 2]) + rle
+    return seg(0x16, pcs) + seg(0x14, pds) + seg(0x15, ods) + seg(0x80, b"")
+
+
+def test_pgs_display_sets_become_timed_bitmaps():
+    events = list(pgs_events([(1.0, None, pgs_display_set()), (3.0, None, pgs_display_set(0))]))
+    assert [(t, len(b)) for t, b, _ in events] == [(1.0, 1), (3.0, 0)]
+    bm = events[0][1][0]
+    assert (bm.width, bm.height, bm.x, bm.y) == (4, 2, 5, 7)
+    width, height, pixels = render(bm)
+    assert (width, height) == (4 + 2 * PAD, 1 + 2 * PAD)
+    assert pixels[PAD * width + PAD : PAD * width + PAD + 4] == bytes(4)
+
+
+def test_dvd_spu_is_decoded_without_a_palette():
+    rle = bytes([0x11, 0x00, 0x00])  # top: 4 px of 1; bottom: run to end, 0
+    first = bytes([0x01, 0x03, 0x00, 0x10, 0x04, 0x00, 0xF0, 0x05, 0, 0, 3, 0, 0, 1, 0x06, 0, 4, 0, 5, 0xFF])
+    ctrl = 4 + len(rle)
+    second = ctrl + 4 + len(first)
+    body = rle + bytes([0, 0, second >> 8, second & 255]) + first + bytes([1, 0, second >> 8, second & 255, 0x02, 0xFF])
+    packet = bytes([0, 4 + len(body), ctrl >> 8, ctrl & 255]) + body
+    [(start, bitmaps, end)] = dvd_events([(10.0, None, packet)])
+    assert start == 10.0 and end == pytest.approx(10.0 + 256 * 1024 / 90000)
+    width, height, pixels = render(bitmaps[0])
+    assert (width, height) == (4 + 2 * PAD, 1 + 2 * PAD)
+
+
+def test_dvb_2bit_string_uses_the_default_map():
+    # two pixels of 1, end of string, end of line
+    assert _dvb_field(bytes([0x10, 0x50, 0x00, 0xF0]), 2, 2) == [bytes([7, 7])]
+
+
+def test_ffprobe_hex_dump_is_parsed():
+    dump = [
+        "[PACKET]\n",
+        "pts_time=1.500000\n",
+        "duration_time=N/A\n",
+        "data=\n",
+        "00000000: 1600 0102 0304 0506 0708 090a 0b0c 0d0e  ................\n",
+        "00000010: 0f                                       .\n",
+        "[/PACKET]\n",
+    ]
+    assert list(read_packets(dump)) == [(1.5, None, bytes([0x16]) + bytes(range(16)))]
+
+
+def fixture_lines(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.readlines()
+
+
+def dvd_extradata():
+    [stream] = parse_sections(fixture_lines("dvd_stream.txt"))
+    return stream["extradata"]
+
+
+# ffprobe dumps of one 12x6 "HI" shown at 1.0s: the PGS display sets are
+# read back identically by ffmpeg's pgssub decoder, and the VobSub and
+# DVB packets are what ffmpeg's dvdsub/dvbsub encoders made of them.
+HI = [
+    "#...#.###",
+    "#...#..#.",
+    "#####..#.",
+    "#...#..#.",
+    "#...#.###",
+]
+
+
+@pytest.mark.parametrize(
+    "name, events, end",
+    [
+        ("pgs_packets.txt", pgs_events, 2.5),
+        ("dvd_packets.txt", dvd_events, 1.0 + 0x83 * 1024 / 90000),
+        ("dvb_packets.txt", dvb_events, 2.5),
+    ],
+)
+def test_encoder_packets_render_the_original_image(name, events, end):
+    extradata = dvd_extradata() if events is dvd_events else b""
+    [(start, stop, (bm,))] = display_cues(events(read_packets(fixture_lines(name)), extradata))
+    assert (start, stop) == (1.0, pytest.approx(end))
+    assert (bm.width, bm.height, bm.x, bm.y) == (12, 6, 100, 256)
+    width, height, pixels = render(bm)
+    rows = [pixels[r * width + PAD : (r + 1) * width - PAD] for r in range(PAD, height - PAD)]
+    assert ["".join("#" if p == 0 else "." for p in row) for row in rows] == HI
+
+
+def test_vobsub_palette_from_extradata():
+    lumas = dvd_palette(dvd_extradata())
+    assert len(lumas) == 16 and lumas[0] == 0 and lumas[7] == 255
+
+
+def test_demux_survives_a_chatty_stderr(monkeypatch):
+    dump = "".join(fixture_lines("pgs_packets.txt"))
+    script = "import sys; sys.stderr.write('w' * (1 << 20)); sys.stdout.write(%r)" % dump
+    monkeypatch.setattr("functions.bitmap_subs.packet_command", lambda *a: [sys.executable, "-c", script])
+    assert len(list(demux_packets("v.mkv", 0))) == 8
+
+
+def test_demux_reports_ffprobe_errors(monkeypatch):
+    script = "import sys; sys.stderr.write('Invalid data'); sys.exit(1)"
+    monkeypatch.setattr("functions.bitmap_subs.packet_command", lambda *a: [sys.executable, "-c", script])
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        list(demux_packets("v.mkv", 0))
+    assert e.value.stderr == "Invalid data"
+
+
+def test_identical_bitmaps_are_recognized_once():
+    a = Bitmap("pgs", 4, 1, b"a", WHITE)
+    b = Bitmap("pgs", 4, 1, b"b", WHITE)
+    moved = Bitmap("pgs", 4, 1, b"a", WHITE, x=99)
+    events = [(0.0, (a,), None), (1.0, (moved,), None), (2.0, (b,), None), (3.0, (), None), (4.0, (a,), 5.0)]
+    seen = []
+
+    def recognize(bm, lang):
+        seen.append(bm.data)
+        return bm.data.decode().upper()
+
+    segs = ocr_segments(events, jobs=1, recognize=recognize)
+    assert sorted(seen) == [b"a", b"b"]
+    assert segs == [
+        {"start": 0.0, "end": 2.0, "text": "A"},
+        {"start": 2.0, "end": 3.0, "text": "B"},
+        {"start": 4.0, "end": 5.0, "text": "A"},
+    ]
+
+
+def test_tesseract_lang_maps_bibliographic_codes():
+    assert tesseract_lang("fre", ["eng", "fra"]) == "fra"
+    assert tesseract_lang("jpn", ["eng"]) == "eng"
+
+
+PGS_INFO = MediaInfo("v.mkv", 60.0, (SubtitleStream(2, 0, "hdmv_pgs_subtitle", "eng"),), ok=True)
+
+
+@patch("cli.ocr_available", return_value=True)
+@patch("cli.ocr_subtitles", return_value=[{"start": 1.0, "end": 2.0, "text": "Read from pixels"}])
+@patch("cli.probe_media", return_value=PGS_INFO)
+def test_extract_ocrs_bitmap_track(mock_probe, mock_ocr, mock_avail, runner, tmp_path):
+    video = tmp_path / "v.mkv"
+    video.write_bytes(b"\x1a\x45\xdf\xa3")
+    out = tmp_path / "v.srt"
+    res = runner.invoke(app, ["extract", str(video), "--output", str(out), "--no-preload", "--ocr-jobs", "2"])
+    assert res.exit_code == 0, res.output
+    mock_ocr.assert_called_once_with(str(video), PGS_INFO.subtitles[0], 2)
+    assert "Read from pixels" in out.read_text()
+
+
+@patch("cli.ocr_available", return_value=False)
+@patch("cli.subprocess.run")
+@patch("cli.whisper.load_model")
+@patch("cli.probe_media", return_value=PGS_INFO)
+def test_extract_without_ocr_falls_back_to_whisper(mock_probe, mock_load, mock_run, mock_avail, runner, tmp_path):
+    mock_load.return_value.transcribe.return_value = {"segments": [{"start": 0, "end": 1, "text": "heard"}]}
+    video = tmp_path / "v.mkv"
+    video.write_bytes(b"\x1a\x45\xdf\xa3")
+    out = tmp_path / "v.srt"
+    res = runner.invoke(app, ["extract", str(video), "--output", str(out), "--no-preload"])
+    assert res.exit_code == 0, res.output
+    assert "need OCR" in res.output
+    mock_run.assert_not_called()
+    assert "heard" in out.read_text()
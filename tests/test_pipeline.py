@@ -0,0 +1,179 @@
+import os
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import cli as cli_module  # noqa: E402
+from functions import pipeline  # noqa: E402
+from functions.probe import MediaInfo, SubtitleStream  # noqa: E402
+from functions.srt import parse_srt  # noqa: E402
+
+app = cli_module.cli
+
+SRT = "1\n00:00:01,000 --> 00:00:02,500\nHello\nthere\n\n2\n00:00:03,000 --> 00:00:04,000\nBye\n"
+INFO = MediaInfo("v.mkv", 5.0, (SubtitleStream(2, 0, "subrip", "eng"),), ok=True)
+
+
+@pytest.fixture
+def runner():
+    return CliRunner()
+
+
+class Upper:
+    def translate(self, text):
+        return text.upper()
+
+
+def test_parse_srt_streams_cues():
+    segs = list(parse_srt(iter(SRT.splitlines(keepends=True))))
+    assert segs == [
+        {"start": 1.0, "end": 2.5, "text": "Hello\nthere"},
+        {"start": 3.0, "end": 4.0, "text": "Bye"},
+    ]
+
+
+def test_parse_srt_tolerates_bom_crlf_and_missing_blank_lines():
+    raw = "\ufeff1\r\n00:00:00,000 --> 00:00:01,000\r\nA\r\n2\r\n00:00:01,000 --> 00:00:02,000\r\nB"
+    segs = list(parse_srt(raw.splitlines(keepends=True)))
+    assert [s["text"] for s in segs] == ["A", "B"]
+
+
+def test_translate_segments_keeps_timing():
+    out = list(pipeline.translate_segments([{"start": 1.0, "end": 2.0, "text": "a\nb"}], Upper()))
+    assert out == [{"start": 1.0, "end": 2.0, "text": "A\nB"}]
+
+
+def test_stream_subtitles_reads_from_a_pipe(monkeypatch):
+    script = "import sys; sys.stdout.write(%r)" % SRT
+    monkeypatch.setattr(pipeline, "subtitle_stream_command", lambda *a: [sys.executable, "-c", script])
+    assert [s["text"] for s in pipeline.stream_subtitles("v.mkv")] == ["Hello\nthere", "Bye"]
+
+
+def test_stream_subtitles_raises_when_ffmpeg_fails(monkeypatch):
+    monkeypatch.setattr(pipeline, "subtitle_stream_command", lambda *a: [sys.executable, "-c", "raise SystemExit(1)"])
+    with pytest.raises(subprocess.CalledProcessError):
+        list(pipeline.stream_subtitles("v.mkv"))
+
+
+def test_stream_subtitles_survives_a_chatty_stderr(monkeypatch):
+    # far more than a pipe buffer of warnings before the first cue
+    script = "import sys; sys.stderr.write('w' * (1 << 20)); sys.stdout.write(%r)" % SRT
+    monkeypatch.setattr(pipeline, "subtitle_stream_command", lambda *a: [sys.executable, "-c", script])
+    assert len(list(pipeline.stream_subtitles("v.mkv"))) == 2
+
+
+def test_stream_subtitles_reports_ffmpeg_errors(monkeypatch):
+    script = "import sys; sys.stderr.write('Invalid data'); sys.exit(3)"
+    monkeypatch.setattr(pipeline, "subtitle_stream_command", lambda *a: [sys.executable, "-c", script])
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        list(pipeline.stream_subtitles("v.mkv"))
+    assert e.value.returncode == 3 and e.value.stderr == "Invalid data"
+
+
+def test_text_codecs_are_stream_copied():
+    ass = pipeline.subtitle_stream_command("v.mkv", 1, "ass")
+    assert ass[ass.index("-c:s") + 1] == "copy" and ass[ass.index("-f") + 1] == "ass"
+    assert {"-vn", "-an", "-dn"} <= set(ass)
+    mov = pipeline.subtitle_stream_command("v.mp4", 0, "mov_text")
+    assert mov[mov.index("-c:s") + 1] == "srt"
+
+
+def test_stream_subtitles_parses_copied_ass(monkeypatch):
+    script = (
+        "print('[Events]');"
+        "print('Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text');"
+        "print(r'Dialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,{\\i1}Hi{\\i0}, you')"
+    )
+    monkeypatch.setattr(pipeline, "subtitle_stream_command", lambda *a: [sys.executable, "-c", script])
+    assert list(pipeline.stream_subtitles("v.mkv", 0, "ass")) == [{"start": 1.0, "end": 2.0, "text": "<i>Hi</i>, you"}]
+
+
+@patch("cli.subprocess.run")
+@patch("cli.stream_subtitles", side_effect=lambda *a: parse_srt(SRT.splitlines(True)))
+@patch("cli.probe_media", return_value=INFO)
+def test_extract_copies_text_track_without_transcoding(mock_probe, mock_stream, mock_run, runner, tmp_path):
+    video = tmp_path / "v.mkv"
+    video.write_bytes(b"\x1a\x45\xdf\xa3")
+    out = tmp_path / "v.srt"
+    res = runner.invoke(app, ["extract", str(video), "--output", str(out), "--no-preload"])
+    assert res.exit_code == 0, res.output
+    mock_stream.assert_called_once_with(str(video), 0, "subrip")
+    mock_run.assert_not_called()
+    assert out.read_text().startswith("1\n00:00:01,000 --> 00:00:02,500\nHello\nthere\n")
+
+
+@patch("cli.clean_srt_file_to_txt", side_effect=AssertionError("re-read"))
+@patch("cli.stream_subtitles", side_effect=lambda *a: parse_srt(SRT.splitlines(True)))
+@patch("cli.probe_media", return_value=INFO)
+def test_extract_clean_writes_srt_and_txt_in_one_pass(mock_probe, mock_stream, mock_clean, runner, tmp_path):
+    video = tmp_path / "v.mkv"
+    video.write_bytes(b"\x1a\x45\xdf\xa3")
+    out = tmp_path / "v.srt"
+    res = runner.invoke(app, ["extract", str(video), "--output", str(out), "--clean", "--no-preload"])
+    assert res.exit_code == 0, res.output
+    assert out.read_text().startswith("1\n00:00:01,000 --> 00:00:02,500\nHello\nthere\n")
+    assert (tmp_path / "v.txt").read_text() == "Hello\nthere\nBye\n"
+
+
+@pytest.mark.parametrize("name", ["out.srt", "out.vtt"])
+@patch("cli.clean_srt_file_to_txt", side_effect=AssertionError("re-read"))
+@patch("cli.make_translator", return_value=Upper())
+def test_translate_clean_writes_txt_alongside(mock_tr, mock_clean, name, runner, tmp_path):
+    src = tmp_path / "in.srt"
+    src.write_text(SRT, encoding="utf-8")
+    out = tmp_path / name
+    res = runner.invoke(app, ["translate", str(src), "--target-lang", "es", "--output", str(out), "--clean"])
+    assert res.exit_code == 0, res.output
+    assert "HELLO\nTHERE" in out.read_text()
+    assert (tmp_path / "out.txt").read_text() == "HELLO\nTHERE\nBYE\n"
+
+
+@patch("cli.make_translator", return_value=Upper())
+@patch("cli.stream_subtitles", side_effect=lambda *a: parse_srt(SRT.splitlines(True)))
+@patch("cli.probe_media", return_value=INFO)
+def test_process_writes_only_final_artifacts(mock_probe, mock_stream, mock_tr, runner, tmp_path):
+    video = tmp_path / "v.mkv"
+    video.write_bytes(b"\x1a\x45\xdf\xa3")
+    out = tmp_path / "final.srt"
+    res = runner.invoke(app, ["process", str(video), "--output", str(out), "--target-lang", "es", "--clean"])
+    assert res.exit_code == 0, res.output
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["final.srt", "final.txt", "v.mkv"]
+    assert "00:00:01,000 --> 00:00:02,500\nHELLO\nTHERE" in out.read_text()
+    assert (tmp_path / "final.txt").read_text() == "HELLO\nTHERE\nBYE\n"
+
+
+@patch("cli.whisper.load_model")
+@patch("cli.stream_subtitles", side_effect=subprocess.CalledProcessError(1, "ffmpeg"))
+@patch("cli.probe_media", return_value=INFO)
+def test_process_falls_back_to_whisper_on_stdout(mock_probe, mock_stream, mock_load, runner, tmp_path):
+    mock_load.return_value.transcribe.return_value = {"segments": [{"start": 0, "end": 1, "text": "heard"}]}
+    video = tmp_path / "v.mkv"
+    video.write_bytes(b"\x1a\x45\xdf\xa3")
+    res = runner.invoke(app, ["process", str(video), "--output", "-"])
+    assert res.exit_code == 0, res.output
+    assert res.stdout == "1\n00:00:00,000 --> 00:00:01,000\nheard\n\n"
+
+
+@patch("cli.GoogleTranslator.translate", side_effect=lambda s: f"X-{s}")
+def test_translate_stdin_to_stdout(mock_translate, runner):
+    res = runner.invoke(app, ["translate", "-", "--target-lang", "fr", "--output", "-"], input=SRT)
+    assert res.exit_code == 0, res.output
+    assert res.stdout.startswith("1\n00:00:01,000 --> 00:00:02,500\nX-Hello\nX-there\n\n2\n")
+
+
+def test_clean_stdin_to_stdout(runner):
+    res = runner.invoke(app, ["clean", "-"], input=SRT)
+    assert res.exit_code == 0, res.output
+    assert res.stdout == "Hello\nthere\nBye\n"
+
+
+def test_clean_flag_rejects_stdout(runner, tmp_path):
+    video = tmp_path / "v.mkv"
+    video.write_bytes(b"\x1a\x45\xdf\xa3")
+    res = runner.invoke(app, ["extract", str(video), "--output", "-", "--clean"])
+    assert res.exit_code != 0
+    assert "--clean needs an output file" in res.output
@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from functions import probe  # noqa: E402
+from functions.has_subtitles import has_subtitles  # noqa: E402
+from functions.probe import (  # noqa: E402
+    MediaInfo,
+    parse_probe,
+    probe_media,
+)
+
+FFPROBE_JSON = {
+    "streams": [
+        {
+            "index": 2,
+            "codec_name": "hdmv_pgs_subtitle",
+            "tags": {"language": "eng"},
+            "disposition": {"default": 0, "forced": 1, "hearing_impaired": 0},
+        },
+        {
+            "index": 3,
+            "codec_name": "ass",
+            "tags": {"language": "jpn", "title": "Signs & Songs"},
+            "disposition": {"default": 1, "forced": 0, "hearing_impaired": 0},
+        },
+        {"index": 4, "codec_name": "subrip"},
+    ],
+    "format": {"duration": "1402.500000"},
+}
+
+
+def test_parse_probe_builds_media_info():
+    info = parse_probe("x.mkv", FFPROBE_JSON)
+    assert info.ok and info.has_subtitles
+    assert info.duration == 1402.5
+    pgs, ass, srt = info.subtitles
+    assert pgs.is_bitmap and pgs.forced and pgs.sub_index == 0
+    assert ass.is_text and ass.title == "Signs & Songs" and ass.sub_index == 1
+    assert srt.language == "und"
+    assert info.default_subtitle() is ass
+
+
+def test_probe_media_narrows_ffprobe_and_probes_once(tmp_path):
+    video = tmp_path / "once.mkv"
+    video.write_bytes(b"\x1a\x45\xdf\xa3")
+    proc = MagicMock(stdout=json.dumps(FFPROBE_JSON), stderr="")
+    with patch("functions.probe.subprocess.run", return_value=proc) as run:
+        first = probe_media(str(video))
+        second = probe_media(str(video))
+    assert first is second
+    run.assert_called_once()
+    cmd = run.call_args[0][0]
+    assert cmd[cmd.index("-select_streams") + 1] == "s"
+    assert "-show_streams" not in cmd
+    assert "stream_disposition" in cmd[cmd.index("-show_entries") + 1]
+
+
+def test_probe_failure_is_not_remembered(tmp_path):
+    video = tmp_path / "broken.mkv"
+    video.write_bytes(b"")
+    with patch("functions.probe.subprocess.run", side_effect=FileNotFoundError):
+        assert probe_media(str(video)) == MediaInfo(str(video))
+    assert not any(k[0] == str(video) for k in probe._probed)
+
+
+def test_probe_warnings_stay_off_stdout(tmp_path, capsys):
+    video = tmp_path / "odd.mkv"
+    video.write_bytes(b"")
+    failed = subprocess.CompletedProcess([], 1, stdout="", stderr="moov atom not found")
+    with patch("functions.probe.subprocess.run", return_value=failed):
+        probe_media(str(video))
+    out = capsys.readouterr()
+    assert out.out == "" and "moov atom not found" in out.err
+
+
+def test_has_subtitles_reuses_media_info():
+    with patch("functions.has_subtitles.probe_media") as pm:
+        assert has_subtitles(None, "x.mkv", info=parse_probe("x.mkv", FFPROBE_JSON))
+        assert not has_subtitles(None, "x.mkv", info=MediaInfo("x.mkv", ok=True))
+    pm.assert_not_called()
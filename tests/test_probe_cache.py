@@ -0,0 +1,77 @@
+import json
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from functions import probe  # noqa: E402
+from functions.probe_cache import (  # noqa: E402
+    ProbeCache,
+    default_cache,
+)
+
+DATA = {"streams": [{"index": 2, "codec_name": "subrip"}], "format": {"duration": "10.0"}}
+
+
+def make_file(tmp_path, name="a.mkv", body=b"x" * 1000):
+    p = tmp_path / name
+    p.write_bytes(body)
+    return str(p)
+
+
+def test_hit_requires_same_size_and_mtime(tmp_path):
+    cache = ProbeCache(tmp_path / "c.sqlite")
+    path = make_file(tmp_path)
+    cache.put(path, os.stat(path), DATA)
+    assert cache.get(path, os.stat(path)) == DATA
+
+    os.utime(path, ns=(0, 1_000_000_000))
+    assert cache.get(path, os.stat(path)) is None
+
+
+def test_ttl_expires_entries(tmp_path):
+    cache = ProbeCache(tmp_path / "c.sqlite", ttl=-1)
+    path = make_file(tmp_path)
+    cache._puts = 1  # skip the eviction pass on this write
+    cache.put(path, os.stat(path), DATA)
+    assert cache.get(path, os.stat(path)) is None
+    assert cache.evict() == 1
+    assert len(cache) == 0
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ProbeCache(tmp_path / "c.sqlite", max_entries=2)
+    paths = [make_file(tmp_path, f"{i}.mkv") for i in range(3)]
+    for i, p in enumerate(paths):
+        cache.put(p, os.stat(p), DATA)
+        cache._db.execute("UPDATE probes SET used = ? WHERE path = ?", (i, p))
+    cache.evict()
+    assert len(cache) == 2
+    assert cache.get(paths[0], os.stat(paths[0])) is None
+
+
+def test_verify_catches_same_size_rewrite(tmp_path):
+    cache = ProbeCache(tmp_path / "c.sqlite", verify=True)
+    path = make_file(tmp_path, body=b"a" * 1000)
+    st = os.stat(path)
+    cache.put(path, st, DATA)
+    with open(path, "r+b") as f:
+        f.write(b"b")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert cache.get(path, os.stat(path)) is None
+
+
+def test_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("APP_PROBE_CACHE", "off")
+    assert default_cache() is None
+
+
+def test_warm_probe_needs_no_ffprobe(tmp_path):
+    path = make_file(tmp_path, "movie.mkv")
+    proc = MagicMock(stdout=json.dumps(DATA), stderr="")
+    with patch("functions.probe.subprocess.run", return_value=proc) as run:
+        cold = probe.probe_media(path)
+        probe._probed.clear()  # a new run starts with an empty memo
+        warm = probe.probe_media(path)
+    run.assert_called_once()
+    assert warm == cold and warm.subtitles[0].codec == "subrip"
@@ -0,0 +1,228 @@
+import os
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import cli as cli_module  # noqa: E402
+from functions.repetition import (  # noqa: E402
+    SAMPLE_RATE,
+    RepetitionMonitor,
+    StopOnLoop,
+    Window,
+    compression_ratio,
+    guarded_transcribe,
+    ngram_repeat_rate,
+    periodic_tail,
+    split_segments,
+)
+
+app = cli_module.cli
+
+
+@pytest.fixture
+def runner():
+    return CliRunner()
+
+
+def test_repeat_measures():
+    assert ngram_repeat_rate("one two three four five") == 0.0
+    assert ngram_repeat_rate("la la la la la la la la") > 0.6
+    assert compression_ratio("thank you " * 50) > 2.4
+    assert compression_ratio("") == 0.0
+
+
+def test_monitor_trips_on_repeated_line():
+    mon = RepetitionMonitor(max_repeats=3)
+    assert not mon.feed("Thank you.")
+    assert not mon.feed("thank  you.")
+    assert mon.feed("Thank you.")
+
+
+def test_monitor_ignores_normal_dialogue():
+    mon = RepetitionMonitor()
+    lines = [
+        "Where were you last night?",
+        "At the station, waiting for the train.",
+        "It never came, did it?",
+        "No. We walked home in the rain instead.",
+        "You should have called me.",
+    ]
+    assert not any(mon.feed(line) for line in lines)
+
+
+def test_monitor_trips_on_alternating_loop():
+    mon = RepetitionMonitor()
+    hits = [mon.feed(t) for t in ["I'm going to go. Okay.", "Okay. I'm going to go."] * 6]
+    assert any(hits)
+
+
+TB = 1000  # first timestamp token of the fake tokenizer
+EOT = 999
+
+
+class Tokenizer:
+    timestamp_begin = TB
+    eot = EOT
+
+    def decode(self, tokens):
+        return " ".join(f"w{t}" for t in tokens if t < TB)
+
+
+def ts(seconds):
+    return TB + round(seconds / 0.02)
+
+
+def test_periodic_tail():
+    assert periodic_tail([1, 2, 3] * 11, 16, 32)
+    assert not periodic_tail(list(range(40)), 16, 32)
+    assert not periodic_tail([7] * 10, 16, 32)
+
+
+def test_split_segments_like_transcribe():
+    tokens = [ts(0), 1, 2, ts(4), ts(4), 3, ts(9), ts(9), 4]
+    segments, advance = split_segments(tokens, Tokenizer(), 30.0)
+    assert segments == [
+        {"start": 0.0, "end": 4.0, "text": "w1 w2"},
+        {"start": 4.0, "end": 9.0, "text": "w3"},
+    ]
+    # the last segment was cut off: the next window starts where it did
+    assert advance == 9.0
+
+    segments, advance = split_segments([ts(0), 1, ts(3)], Tokenizer(), 30.0)
+    assert segments == [{"start": 0.0, "end": 3.0, "text": "w1"}]
+    assert advance == 30.0
+
+
+def sample(stop, tokens):
+    """Feed ``tokens`` to the filter one at a time, as the decoder would;
+    returns the logits after the last one."""
+    logits = np.zeros((1, TB + 1500), dtype=np.float32)
+    for n in range(1, len(tokens) + 1):
+        logits = np.zeros_like(logits)
+        stop.apply(logits, np.array([[50258, *tokens[:n]]]))
+    return logits
+
+
+def test_stop_on_loop_ends_decode_at_repeated_lines():
+    stop = StopOnLoop(Tokenizer(), 1, RepetitionMonitor(max_repeats=3))
+    tokens = [ts(0), 1, 2, ts(2), ts(2), 5, ts(3)]
+    for i in range(3):
+        tokens += [ts(3 + i), 9, ts(4 + i)]
+    logits = sample(stop, tokens)
+    assert (stop.loop, stop.loop_start) == (2, 3.0)
+    assert logits[0, EOT] == 0.0
+    assert np.isneginf(np.delete(logits[0], EOT)).all()
+
+
+def test_stop_on_loop_catches_a_loop_inside_one_segment():
+    stop = StopOnLoop(Tokenizer(), 1, RepetitionMonitor())
+    logits = sample(stop, [ts(0), 1, ts(2), ts(2), 5, ts(6)] + [3, 4] * 16)
+    assert (stop.loop, stop.loop_start) == (2, 6.0)
+    assert np.isneginf(logits[0, 1])
+
+
+def test_stop_on_loop_leaves_normal_decodes_alone():
+    stop = StopOnLoop(Tokenizer(), 1, RepetitionMonitor())
+    logits = sample(stop, [ts(0), 1, 2, ts(2), ts(2), 3, 4, ts(5)])
+    assert stop.loop == -1 and not logits.any()
+
+
+def seg(start, end, text):
+    return {"start": start, "end": end, "text": text}
+
+
+def window(segments, advance=30.0, loop=-1, loop_start=0.0, tokens=24):
+    return Window(segments, advance, loop, loop_start, tokens, 1.0)
+
+
+class ScriptedDecoder:
+    """Returns the next scripted window; records every call."""
+
+    sample_len = 224
+
+    def __init__(self, *windows):
+        self.windows = list(windows)
+        self.calls = []
+
+    def decode(self, start, end, prompt, temperature, monitor):
+        self.calls.append((start, end, prompt, temperature))
+        return self.windows.pop(0)
+
+
+LOOP = [seg(i, i + 1, "Subscribe!") for i in range(4)]
+
+
+def audio(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_guard_windows_end_at_segment_boundaries():
+    decoder = ScriptedDecoder(
+        window([seg(0, 12, "first"), seg(12, 26, "second")], advance=26.0),
+        window([seg(0, 5, "cut off mid-word"), seg(5, 24, "rest")], advance=24.0),
+    )
+    segments, report = guarded_transcribe(None, audio(50), "en", decoder=decoder)
+
+    # the cut segment is decoded again from its start, not from 30 s
+    assert [c[:2] for c in decoder.calls] == [(0.0, 30.0), (26.0, 50.0)]
+    assert decoder.calls[1][2] == "first second"
+    assert [(s["start"], s["text"]) for s in segments] == [
+        (0.0, "first"),
+        (12.0, "second"),
+        (26.0, "cut off mid-word"),
+        (31.0, "rest"),
+    ]
+    assert report.windows == 2 and report.loops == 0
+    assert report.saved_seconds == report.redecode_seconds == 0.0
+
+
+def test_guard_keeps_lines_before_a_loop_and_redecodes_the_rest():
+    decoder = ScriptedDecoder(
+        window([seg(0, 4, "Hello there."), seg(4, 10, "How are you?"), *LOOP], loop=2, loop_start=10.0, tokens=56),
+        window([seg(0, 3, "Fine, thanks.")]),
+    )
+    segments, report = guarded_transcribe(None, audio(30), "en", decoder=decoder)
+
+    # re-decoded right away from the loop, sampling and without a prompt
+    assert decoder.calls[1] == (10.0, 30.0, None, 0.2)
+    assert [(s["start"], s["text"]) for s in segments] == [
+        (0.0, "Hello there."),
+        (4.0, "How are you?"),
+        (10.0, "Fine, thanks."),
+    ]
+    assert report.loops == report.redecoded == 1
+    assert report.dropped_segments == 4
+    assert report.redecode_seconds == 1.0 and report.decode_seconds == 2.0
+    # the loop stopped 168 tokens short of the limit, at 56 tokens/s
+    assert report.saved_seconds == pytest.approx(3.0)
+
+
+def test_guard_tries_every_temperature_then_skips():
+    looping = window(LOOP, loop=0)
+    decoder = ScriptedDecoder(window([seg(0, 2, "window 1")]), *[looping] * 6)
+    segments, report = guarded_transcribe(None, audio(60), "en", decoder=decoder)
+
+    assert [c[3] for c in decoder.calls] == [0.0, 0.0, 0.2, 0.4, 0.6, 0.8, 1.0]
+    assert report.skipped == [(30.0, 60.0)] and report.redecoded == 0
+    assert [s["text"] for s in segments] == ["window 1"]
+
+
+@patch("functions.repetition.WhisperDecoder")
+@patch("cli.whisper")
+def test_transcribe_repetition_guard_reports(mock_whisper, mock_decoder, runner, tmp_path):
+    mock_whisper.load_audio.return_value = audio(45)
+    looping = window(LOOP, loop=0)
+    mock_decoder.return_value = ScriptedDecoder(window([seg(0, 2, "window 1")]), *[looping] * 6)
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b"\x00\x00\x00\x20ftyp")
+    out = tmp_path / "o.srt"
+    res = runner.invoke(app, ["transcribe", str(video), "--output", str(out), "--repetition-guard"])
+    assert res.exit_code == 0, res.output
+    assert "Repetition loops caught: 1" in res.output
+    assert "00:00:30,000 --> 00:00:45,000" in res.output
+    assert "saved about 50.0s" in res.output
+    assert "Subscribe" not in out.read_text()
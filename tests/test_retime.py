@@ -0,0 +1,124 @@
+import os
+import sys
+from fractions import Fraction
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cli as cli_module  # noqa: E402
+from functions.formats import read_segments  # noqa: E402
+from functions.retime import (  # noqa: E402
+    convert_fps,
+    merge_timings,
+    parse_fps,
+    parse_time,
+    stretch_times,
+    to_segments,
+)
+
+app = cli_module.cli
+SRT = (
+    "1\n00:00:01,000 --> 00:00:02,000\nOne\n\n"
+    "2\n00:00:10,000 --> 00:00:12,500\nTwo\n\n"
+)
+
+
+@pytest.fixture
+def runner():
+    return CliRunner()
+
+
+def test_parse_time_and_fps():
+    assert parse_time("1.5") == 1.5
+    assert parse_time("-0:00:01,250") == -1.25
+    assert parse_time("01:02.5") == 62.5
+    assert parse_fps("23.976") == Fraction(24000, 1001)
+    assert parse_fps("pal") == 25
+    assert parse_fps("24") == 24
+
+
+def test_stretch_keeps_anchor():
+    starts, ends = stretch_times(np.array([10.0, 20.0]), np.array([12.0, 22.0]), 2, anchor=10)
+    assert starts.tolist() == [10.0, 30.0]
+    assert ends.tolist() == [14.0, 34.0]
+
+
+def test_fps_conversion_pal_speedup():
+    starts, ends = convert_fps(np.array([25.0]), np.array([50.0]), 25, 24)
+    assert starts.tolist() == [25 * 25 / 24] and ends.tolist() == [50 * 25 / 24]
+
+
+def test_merge_is_time_ordered_and_stable():
+    a = (np.array([1.0, 5.0]), np.array([2.0, 6.0]), ["a1", "a5"])
+    b = (np.array([1.0, 3.0]), np.array([2.0, 4.0]), ["b1", "b3"])
+    _, _, texts = merge_timings([a, b])
+    assert texts == ["a1", "b1", "b3", "a5"]
+
+
+def test_to_segments_drops_and_clips_negative_cues():
+    segs = list(to_segments(np.array([-3.0, -0.5, 1.0]), np.array([-1.0, 0.5, 2.0]), ["x", "y", "z"]))
+    assert segs == [
+        {"start": 0.0, "end": 0.5, "text": "y"},
+        {"start": 1.0, "end": 2.0, "text": "z"},
+    ]
+
+
+def test_shift_rewrites_in_place(tmp_path, runner):
+    src = tmp_path / "movie.srt"
+    src.write_text(SRT, encoding="utf-8")
+    res = runner.invoke(app, ["shift", str(src), "--by", "-1.5"])
+    assert res.exit_code == 0, res.output
+    assert list(read_segments(str(src))) == [
+        {"start": 0.0, "end": 0.5, "text": "One"},
+        {"start": 8.5, "end": 11.0, "text": "Two"},
+    ]
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["shift", "--by", "2"],
+        ["stretch", "--factor", "1.0"],
+        ["fps", "--from", "25", "--to", "25"],
+    ],
+)
+def test_new_format_without_output_keeps_the_source(tmp_path, runner, args):
+    src = tmp_path / "movie.srt"
+    src.write_text(SRT, encoding="utf-8")
+    res = runner.invoke(app, [args[0], str(src), *args[1:], "--format", "vtt"])
+    assert res.exit_code == 0, res.output
+    assert src.read_text(encoding="utf-8") == SRT
+    assert (tmp_path / "movie.vtt").read_text(encoding="utf-8").startswith("WEBVTT")
+
+
+def test_fps_writes_output_format_from_suffix(tmp_path, runner):
+    src = tmp_path / "movie.srt"
+    src.write_text(SRT, encoding="utf-8")
+    out = tmp_path / "movie.vtt"
+    res = runner.invoke(app, ["fps", str(src), "--from", "25", "--to", "50", "--output", str(out)])
+    assert res.exit_code == 0, res.output
+    assert out.read_text(encoding="utf-8").startswith("WEBVTT")
+    assert [s["start"] for s in read_segments(str(out))] == [0.5, 5.0]
+
+
+def test_merge_split_files_with_offset(tmp_path, runner):
+    cd1, cd2 = tmp_path / "cd1.srt", tmp_path / "cd2.srt"
+    cd1.write_text(SRT, encoding="utf-8")
+    cd2.write_text(SRT, encoding="utf-8")
+    out = tmp_path / "full.srt"
+    res = runner.invoke(
+        app, ["merge", str(cd1), str(cd2), "--offset", "0", "--offset", "1:00", "--output", str(out)]
+    )
+    assert res.exit_code == 0, res.output
+    assert [s["start"] for s in read_segments(str(out))] == [1.0, 10.0, 61.0, 70.0]
+
+
+def test_bad_offset_is_rejected(tmp_path, runner):
+    src = tmp_path / "movie.srt"
+    src.write_text(SRT, encoding="utf-8")
+    res = runner.invoke(app, ["shift", str(src), "--by", "soon"])
+    assert res.exit_code != 0
+    assert "Not a time" in res.output
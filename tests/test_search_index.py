@@ -0,0 +1,82 @@
+import os
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cli as cli_module  # noqa: E402
+from functions.search_index import CueIndex, plain_query  # noqa: E402
+
+app = cli_module.cli
+SRT = (
+    "1\n00:00:01,000 --> 00:00:02,500\nWinter is coming.\n\n"
+    "2\n00:01:00,250 --> 00:01:03,000\nThe night is dark\nand full of terrors.\n\n"
+)
+
+
+@pytest.fixture
+def runner():
+    return CliRunner()
+
+
+@pytest.fixture
+def library(tmp_path):
+    lib = tmp_path / "lib"
+    (lib / "s1").mkdir(parents=True)
+    (lib / "s1" / "e01.srt").write_text(SRT, encoding="utf-8")
+    (lib / "s1" / "e02.vtt").write_text(
+        "WEBVTT\n\n00:00:05.000 --> 00:00:06.000\nA Lannister always pays his debts\n",
+        encoding="utf-8",
+    )
+    return lib
+
+
+def test_plain_query_quotes_words():
+    assert plain_query('night "OR" dark-ness wint*') == '"night" "OR" "dark" "ness" "wint"*'
+
+
+def test_index_is_incremental(library, tmp_path):
+    db = CueIndex(tmp_path / "idx.sqlite")
+    files = sorted(library.rglob("*.*"))
+    first = list(db.add(files))
+    assert [count for _, count, _ in first] == [2, 1]
+    again = list(db.add(files))
+    assert [count for _, count, _ in again] == [None, None]
+
+    ep = library / "s1" / "e01.srt"
+    ep.write_text(SRT.replace("Winter", "Summer"), encoding="utf-8")
+    os.utime(ep, ns=(1, 1))
+    assert [count for _, count, _ in db.add(files)] == [2, None]
+    assert db.search("winter") == []
+    (hit,) = db.search("summer")
+    assert (hit.start, hit.end) == (1.0, 2.5)
+    assert db.counts() == (2, 3)
+
+
+def test_index_and_search_commands(library, tmp_path, runner):
+    db = str(tmp_path / "idx.sqlite")
+    res = runner.invoke(app, ["index", str(library), "--db", db])
+    assert res.exit_code == 0, res.output
+    assert "3 cues" in res.output
+
+    res = runner.invoke(app, ["search", "dark", "terrors", "--db", db])
+    assert res.exit_code == 0, res.output
+    path, timing, text = res.stdout.strip().split("\t")
+    assert path.endswith("e01.srt")
+    assert timing == "00:01:00,250 --> 00:01:03,000"
+    assert text == "The night is dark and full of terrors."
+
+    res = runner.invoke(app, ["search", "lannister OR winter", "--raw", "--db", db])
+    assert len(res.stdout.strip().splitlines()) == 2
+
+
+def test_index_forgets_deleted_files(library, tmp_path, runner):
+    db = str(tmp_path / "idx.sqlite")
+    runner.invoke(app, ["index", str(library), "--db", db])
+    (library / "s1" / "e02.vtt").unlink()
+    res = runner.invoke(app, ["index", str(library), "--db", db])
+    assert "1 removed" in res.output
+    res = runner.invoke(app, ["search", "lannister", "--db", db])
+    assert res.stdout == ""
@@ -0,0 +1,128 @@
+import io
+import os
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cli as cli_module  # noqa: E402
+from functions.formats import read_segments  # noqa: E402
+from functions.sync import (  # noqa: E402
+    FRAME,
+    SAMPLE_RATE,
+    best_lag,
+    cue_activity,
+    estimate_sync,
+    frame_energy,
+    media_activity,
+    speech_activity,
+)
+
+app = cli_module.cli
+
+
+@pytest.fixture
+def runner():
+    return CliRunner()
+
+
+def dialogue(n=400, length=2400.0, seed=3):
+    rng = np.random.default_rng(seed)
+    starts = np.sort(rng.uniform(0, length, n))
+    return starts, starts + rng.uniform(0.8, 3.5, n)
+
+
+def srt(starts, ends):
+    from functions.formats import write_cues
+
+    buf = io.StringIO()
+    write_cues(
+        [{"start": s, "end": e, "text": f"line {i}"} for i, (s, e) in enumerate(zip(starts, ends))],
+        buf,
+        "srt",
+    )
+    return buf.getvalue()
+
+
+def test_speech_activity_from_pcm():
+    rate = SAMPLE_RATE
+    t = np.arange(rate * 3) / rate
+    tone = (8000 * np.sin(2 * np.pi * 440 * t)).astype("<i2")
+    tone[: rate] = 0  # 1 s silence, then 2 s of "speech"
+    energy = frame_energy(io.BytesIO(tone.tobytes()))
+    active = speech_activity(energy)
+    assert len(active) == round(3 / FRAME)
+    assert active[:90].sum() == 0 and active[110:].all()
+
+
+def test_cue_activity_marks_frames_on_screen():
+    active = cue_activity(np.array([0.02, 0.1]), np.array([0.05, 0.12]))
+    assert active.tolist() == [0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 1, 1]
+
+
+def test_best_lag_recovers_shift_both_ways():
+    rng = np.random.default_rng(0)
+    sig = (rng.random(5000) > 0.5).astype(np.float32)
+    assert best_lag(np.roll(sig, 37), sig, 100)[0] == 37
+    assert best_lag(np.roll(sig, -21), sig, 100)[0] == -21
+
+
+def test_estimate_sync_finds_offset_and_framerate():
+    starts, ends = dialogue()
+    factor = 25 / (24000 / 1001)
+    speech = cue_activity(starts * factor - 4.25, ends * factor - 4.25)
+    found_factor, offset, score = estimate_sync(speech, starts, ends)
+    assert found_factor == pytest.approx(factor, rel=1e-5)
+    assert offset == pytest.approx(-4.25, abs=0.02)
+    assert score > 0.9
+
+
+def test_estimate_sync_fits_small_drift():
+    starts, ends = dialogue(n=1200, length=6000.0)
+    speech = cue_activity(starts * 1.0005 + 1.5, ends * 1.0005 + 1.5)
+    factor, offset, _ = estimate_sync(speech, starts, ends)
+    assert factor == pytest.approx(1.0005, abs=5e-5)
+    assert offset == pytest.approx(1.5, abs=0.05)
+
+
+def test_sync_against_reference_subtitles(tmp_path, runner):
+    starts, ends = dialogue()
+    ref = tmp_path / "good.srt"
+    ref.write_text(srt(starts + 2.0, ends + 2.0), encoding="utf-8")
+    src = tmp_path / "late.srt"
+    src.write_text(srt(starts, ends), encoding="utf-8")
+
+    res = runner.invoke(app, ["sync", str(src), str(ref), "--no-drift"])
+    assert res.exit_code == 0, res.output
+    assert "+2.000s" in res.output
+    fixed = [s["start"] for s in read_segments(str(src))]
+    assert fixed == pytest.approx((starts + 2.0).tolist(), abs=0.01)
+
+
+@patch("cli.media_activity")
+def test_sync_against_media_audio(mock_activity, tmp_path, runner):
+    starts, ends = dialogue()
+    mock_activity.return_value = cue_activity(starts - 0.75, ends - 0.75)
+    src = tmp_path / "subs.srt"
+    src.write_text(srt(starts, ends), encoding="utf-8")
+    out = tmp_path / "synced.srt"
+    video = tmp_path / "movie.mkv"
+    video.write_bytes(b"")
+
+    res = runner.invoke(app, ["sync", str(src), str(video), "--output", str(out), "--audio-track", "1"])
+    assert res.exit_code == 0, res.output
+    mock_activity.assert_called_once_with(str(video), 1)
+    first = next(read_segments(str(out)))
+    assert first["start"] == pytest.approx(max(starts[0] - 0.75, 0), abs=0.01)
+
+
+def test_media_activity_survives_a_chatty_stderr(monkeypatch):
+    # far more than a pipe buffer of warnings, then a second of silence
+    script = "import sys; sys.stderr.write('w' * (1 << 20)); sys.stdout.buffer.write(bytes(%d))" % (2 * SAMPLE_RATE)
+    monkeypatch.setattr("functions.sync.audio_command", lambda *a: [sys.executable, "-c", script])
+    activity = media_activity("v.mkv")
+    assert len(activity) == round(1 / FRAME) and not activity.any()
@@ -0,0 +1,128 @@
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import cli as cli_module  # noqa: E402
+from functions.probe import MediaInfo, SubtitleStream  # noqa: E402
+from functions.tracks import (  # noqa: E402
+    extract_command,
+    parse_langs,
+    select_tracks,
+    track_outputs,
+)
+
+app = cli_module.cli
+
+STREAMS = [
+    SubtitleStream(2, 0, "subrip", "eng", default=True),
+    SubtitleStream(3, 1, "ass", "jpn"),
+    SubtitleStream(4, 2, "subrip", "eng", hearing_impaired=True),
+    SubtitleStream(5, 3, "subrip", "eng"),
+    SubtitleStream(6, 4, "subrip", "fre", forced=True),
+]
+INFO = MediaInfo("v.mkv", 60.0, tuple(STREAMS), ok=True)
+
+
+@pytest.fixture
+def runner():
+    return CliRunner()
+
+
+def test_parse_and_select_langs():
+    assert parse_langs(" ENG, jpn ,") == ["eng", "jpn"]
+    assert [t.sub_index for t in select_tracks(STREAMS, ["jpn", "fre"])] == [1, 4]
+    assert select_tracks(STREAMS, []) == STREAMS
+
+
+def test_track_outputs_are_unique_and_tagged():
+    names = [os.path.basename(n) for n in track_outputs("out/subs.srt", STREAMS)]
+    assert names == [
+        "subs.eng.srt",
+        "subs.jpn.srt",
+        "subs.eng.sdh.srt",
+        "subs.eng.2.srt",
+        "subs.fre.forced.srt",
+    ]
+
+
+def test_extract_command_maps_every_track_once():
+    cmd = extract_command("in.mkv", STREAMS[:2], ["a.srt", "b.srt"])
+    assert cmd.count("-i") == 1
+    assert cmd[4:] == ["-map", "0:s:0", "-c:s", "srt", "a.srt", "-map", "0:s:1", "-c:s", "srt", "b.srt"]
+
+
+@patch("cli.subprocess.run")
+@patch("cli.probe_media", return_value=INFO)
+def test_extract_track_lang_single_ffmpeg_call(mock_probe, mock_run, runner, tmp_path):
+    video = tmp_path / "v.mkv"
+    video.write_bytes(b"\x1a\x45\xdf\xa3")
+    out = tmp_path / "subs.srt"
+    res = runner.invoke(app, ["extract", str(video), "--output", str(out), "--track-lang", "jpn,fre", "--no-preload"])
+    assert res.exit_code == 0, res.output
+    mock_run.assert_called_once()
+    cmd = mock_run.call_args[0][0]
+    assert cmd.count("-map") == 2
+    assert "subs.jpn.srt" in res.output and "subs.fre.forced.srt" in res.output
+
+
+@patch("cli.clean_srt_file_to_txt", side_effect=AssertionError("re-read"))
+@patch("cli.stream_subtitles", side_effect=lambda *a: iter([{"start": 1.0, "end": 2.0, "text": "Hi"}]))
+@patch("cli.subprocess.run")
+@patch("cli.probe_media", return_value=INFO)
+def test_extract_tracks_with_clean_are_streamed(mock_probe, mock_run, mock_stream, mock_clean, runner, tmp_path):
+    video = tmp_path / "v.mkv"
+    video.write_bytes(b"\x1a\x45\xdf\xa3")
+    out = tmp_path / "subs.srt"
+    res = runner.invoke(
+        app, ["extract", str(video), "--output", str(out), "--track-lang", "jpn,fre", "--clean", "--no-preload"]
+    )
+    assert res.exit_code == 0, res.output
+    mock_run.assert_not_called()
+    assert [c.args[1:] for c in mock_stream.call_args_list] == [(1, "ass"), (4, "subrip")]
+    for name in ("subs.jpn", "subs.fre.forced"):
+        assert (tmp_path / f"{name}.srt").read_text().startswith("1\n00:00:01,000")
+        assert (tmp_path / f"{name}.txt").read_text() == "Hi\n"
+
+
+@patch("cli.whisper.load_model")
+@patch("cli.subprocess.run")
+@patch("cli.probe_media", return_value=INFO)
+def test_extract_track_lang_without_match_fails(mock_probe, mock_run, mock_load, runner, tmp_path):
+    video = tmp_path / "v.mkv"
+    video.write_bytes(b"\x1a\x45\xdf\xa3")
+    out = tmp_path / "subs.srt"
+    res = runner.invoke(app, ["extract", str(video), "--output", str(out), "--track-lang", "kor", "--no-preload"])
+    assert res.exit_code == 1
+    assert "No subtitle track matches --track-lang kor. Available: eng, fre, jpn" in res.output
+    assert not mock_run.called and not mock_load.called
+    assert not out.exists()
+
+
+@patch("cli.stream_subtitles", return_value=iter([]))
+@patch("cli.probe_media", return_value=MediaInfo("v.mkv", 60.0, (STREAMS[4], STREAMS[1]), ok=True))
+def test_extract_picks_first_unforced_track_by_default(mock_probe, mock_stream, runner, tmp_path):
+    video = tmp_path / "v.mkv"
+    video.write_bytes(b"\x1a\x45\xdf\xa3")
+    res = runner.invoke(app, ["extract", str(video), "--output", str(tmp_path / "s.srt"), "--no-preload"])
+    assert res.exit_code == 0, res.output
+    mock_probe.assert_called_once_with(str(video))
+    mock_stream.assert_called_once_with(str(video), 1, "ass")
+
+
+@patch("cli.stream_subtitles", side_effect=lambda *a: iter([{"start": 1.0, "end": 2.0, "text": "Hi"}]))
+@patch("cli.subprocess.run")
+@patch("cli.probe_media", return_value=INFO)
+def test_extract_single_matching_track_uses_tagged_name(mock_probe, mock_run, mock_stream, runner, tmp_path):
+    video = tmp_path / "v.mkv"
+    video.write_bytes(b"\x1a\x45\xdf\xa3")
+    out = tmp_path / "subs.srt"
+    res = runner.invoke(app, ["extract", str(video), "--output", str(out), "--track-lang", "jpn", "--no-preload"])
+    assert res.exit_code == 0, res.output
+    mock_run.assert_not_called()
+    assert "Subtitles saved to subs.jpn.srt" in res.output
+    assert (tmp_path / "subs.jpn.srt").read_text().startswith("1\n00:00:01,000")
+    assert not out.exists()